@@ -14,6 +14,7 @@ import os
 from pathlib import Path
 import environ
 import socket
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,6 +28,9 @@ environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
 # Configuración de DEBUG
 DEBUG = env("DEBUG")
 
+# Ejecución de la batería de pruebas (manage.py test)
+TESTING = sys.argv[1:2] == ["test"]
+
 
 # Configuración del correo con Mailpit
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -43,6 +47,24 @@ SUPPORT_AI_TIMEOUT = env.int("SUPPORT_AI_TIMEOUT", default=20)
 
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="")
 
+# Caché compartida entre procesos (por ejemplo redis://redis:6379/1). Guarda los contadores de
+# notificaciones sin leer y la lista del staff, así que solo puede ser la memoria de cada
+# proceso con DEBUG o en las pruebas
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Canal pub/sub para enviar notificaciones al navegador en tiempo real (por ejemplo
+# redis://redis:6379/2). Es obligatorio salvo con DEBUG o en las pruebas, donde si está
+# vacío solo se entregan eventos del mismo proceso
+REALTIME_REDIS_URL = env("REALTIME_REDIS_URL", default="")
+# Duración máxima de una conexión Server-Sent Events y de una consulta larga (segundos)
+NOTIFICATION_STREAM_SECONDS = env.int("NOTIFICATION_STREAM_SECONDS", default=300)
+NOTIFICATION_LONG_POLL_SECONDS = env.int("NOTIFICATION_LONG_POLL_SECONDS", default=25)
+
+# Clasificación de jugadores por MMR en un conjunto ordenado de Redis (por ejemplo
+# redis://redis:6379/3). Es obligatoria salvo con DEBUG o en las pruebas, donde si está
+# vacía la clasificación se calcula con consultas a la base de datos
+LEADERBOARD_REDIS_URL = env("LEADERBOARD_REDIS_URL", default="")
+
 
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
@@ -51,6 +73,46 @@ CELERY_TIMEZONE = "Europe/Madrid"  # o tu zona
 # Opcional, para controlar la periodicidad desde el admin
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
+# Máximo de partidos por grupo que procesa cada ejecución de check_teams_ready_for_match
+MATCH_READY_BATCH_SIZE = env.int("MATCH_READY_BATCH_SIZE", default=500)
+
+# Estrategia de emparejamiento de la primera ronda de los torneos (adjacent o snake)
+TOURNAMENT_SEEDING_STRATEGY = env.str("TOURNAMENT_SEEDING_STRATEGY", default="adjacent")
+
+# Notificaciones procesadas por ejecución de process_notification_queue y número de
+# conexiones SMTP simultáneas con las que se envían
+NOTIFICATION_BATCH_SIZE = env.int("NOTIFICATION_BATCH_SIZE", default=200)
+NOTIFICATION_SEND_CONCURRENCY = env.int("NOTIFICATION_SEND_CONCURRENCY", default=4)
+
+# Espera base y máxima (en segundos) entre reintentos de envío de una notificación
+NOTIFICATION_RETRY_BASE_SECONDS = env.int("NOTIFICATION_RETRY_BASE_SECONDS", default=60)
+NOTIFICATION_RETRY_MAX_SECONDS = env.int("NOTIFICATION_RETRY_MAX_SECONDS", default=3600)
+
+# Duración (en segundos) de la reserva de una notificación por un worker; si vence sin
+# completarse el envío, otro worker puede volver a reservarla
+NOTIFICATION_LEASE_SECONDS = env.int("NOTIFICATION_LEASE_SECONDS", default=300)
+
+# Retención de notificaciones: las leídas y enviadas con más de NOTIFICATION_RETENTION_DAYS
+# días se mueven a NotificationArchive (o se borran si NOTIFICATION_RETENTION_ARCHIVE es
+# False) en lotes de NOTIFICATION_RETENTION_BATCH_SIZE filas, con un máximo de
+# NOTIFICATION_RETENTION_MAX_BATCHES lotes por ejecución
+NOTIFICATION_RETENTION_DAYS = env.int("NOTIFICATION_RETENTION_DAYS", default=30)
+NOTIFICATION_RETENTION_ARCHIVE = env.bool("NOTIFICATION_RETENTION_ARCHIVE", default=True)
+NOTIFICATION_RETENTION_BATCH_SIZE = env.int("NOTIFICATION_RETENTION_BATCH_SIZE", default=1000)
+NOTIFICATION_RETENTION_MAX_BATCHES = env.int("NOTIFICATION_RETENTION_MAX_BATCHES", default=50)
+
+# Historial de MMR: días que se conservan las entradas por partido antes de quedar solo
+# sus resúmenes diarios, y filas procesadas por lote al compactarlo
+RATING_HISTORY_RETENTION_DAYS = env.int("RATING_HISTORY_RETENTION_DAYS", default=30)
+RATING_HISTORY_BATCH_SIZE = env.int("RATING_HISTORY_BATCH_SIZE", default=5000)
+
+# Motor de valoración de los partidos (ver web/rating.py): "elo", "glicko2" o "fixed"
+# (+10 / -5 sin tener en cuenta al rival). RATING_ELO_K_FACTOR es el cambio máximo de MMR
+# por partido con Elo y RATING_GLICKO_TAU limita el cambio de la volatilidad con Glicko-2
+RATING_ENGINE = env("RATING_ENGINE", default="elo")
+RATING_ELO_K_FACTOR = env.float("RATING_ELO_K_FACTOR", default=20.0)
+RATING_GLICKO_TAU = env.float("RATING_GLICKO_TAU", default=0.5)
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
 
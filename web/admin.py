@@ -264,6 +264,28 @@ class MatchAdmin(admin.ModelAdmin):
     list_filter = ("status", "tournament")  # Filtro por estado del partido  # Filtro por torneo
 
 
+# Configuración del administrador para el modelo BracketSlot
+@admin.register(BracketSlot)
+class BracketSlotAdmin(admin.ModelAdmin):
+    """Configuración del panel de administración para el modelo BracketSlot.
+
+    Permite revisar el cuadro de eliminatorias precalculado de cada torneo.
+    """
+
+    list_display = (
+        "tournament",  # Torneo asociado
+        "round",  # Ronda del cuadro
+        "position",  # Posición dentro de la ronda
+        "team1",  # Primer equipo
+        "team2",  # Segundo equipo
+        "match",  # Partido asociado
+    )
+
+    list_select_related = ("tournament", "team1", "team2", "match")
+
+    list_filter = ("tournament", "round")  # Filtro por torneo  # Filtro por ronda
+
+
 # Configuración del administrador para el modelo MatchResult
 @admin.register(MatchResult)
 class MatchResultAdmin(admin.ModelAdmin):
@@ -300,7 +322,8 @@ class MatchLogAdmin(admin.ModelAdmin):
         "match",  # Partido relacionado
         "team",  # Equipo involucrado (opcional)
         "player",  # Jugador involucrado (opcional)
-        "event",  # Descripción del evento
+        "event_type",  # Tipo de evento
+        "text",  # Descripción del evento, generada a partir de sus datos
         "created_at",  # Fecha del registro
     )
 
@@ -310,7 +333,12 @@ class MatchLogAdmin(admin.ModelAdmin):
         "player__user__username",  # Búsqueda por nombre de usuario del jugador
     )
 
-    list_filter = ("created_at",)  # Filtro por fecha de creación del registro
+    list_filter = (
+        "event_type",  # Filtro por tipo de evento
+        "created_at",  # Filtro por fecha de creación del registro
+    )
+
+    list_select_related = ("match__team1", "match__team2", "team", "player__user")
 
 
 # Configuración del administrador para el modelo Reward
@@ -388,6 +416,8 @@ class NotificationAdmin(admin.ModelAdmin):
         "title",  # Título de la notificación
         "status",  # Estado (pendiente/procesando/enviado/fallido)
         "urgency",  # Nivel de urgencia (1-4)
+        "retries",  # Reintentos de envío realizados
+        "next_attempt_at",  # Próximo intento de envío
         "created_at",  # Fecha de creación
         "read_at",  # Fecha de lectura
     )
@@ -409,3 +439,35 @@ class NotificationAdmin(admin.ModelAdmin):
     )
 
     filter_horizontal = ("recipient_users",)  # Interfaz mejorada para ManyToMany
+
+
+# Configuración del administrador para el modelo NotificationArchive
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    """Configuración del panel de administración para el modelo NotificationArchive.
+
+    Las notificaciones archivadas solo se consultan: no se crean ni se editan a mano.
+    """
+
+    list_display = (
+        "user",  # Usuario propietario de la notificación
+        "title",  # Título de la notificación
+        "status",  # Estado final del envío
+        "created_at",  # Fecha de creación de la notificación original
+        "archived_at",  # Fecha de archivado
+    )
+
+    list_filter = ("status", "archived_at")  # Filtro por estado y fecha de archivado
+
+    search_fields = (
+        "title",  # Búsqueda por título de notificación
+        "user__username",  # Búsqueda por nombre de usuario
+    )
+
+    def has_add_permission(self, request):
+        """Las notificaciones archivadas solo las crea la tarea de retención."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Las notificaciones archivadas son de solo lectura."""
+        return False
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class WebConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "web"
+
+    def ready(self):
+        """Comprueba la configuración y registra las señales de la aplicación."""
+        from . import signals  # noqa: F401
+        from .functions import check_cache_settings
+        from .leaderboard import check_leaderboard_settings
+        from .realtime import check_realtime_settings
+
+        check_cache_settings()
+        check_leaderboard_settings()
+        check_realtime_settings()
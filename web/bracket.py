@@ -0,0 +1,196 @@
+from django.db import transaction
+from django.utils import timezone
+from .models import BracketSlot, Match, MatchLog
+
+
+def bracket_size(num_teams):
+    """
+    Calcula el tamaño del cuadro de eliminatorias para un número de equipos.
+
+    Args:
+        num_teams (int): Número de equipos inscritos.
+
+    Returns:
+        int: Menor potencia de dos mayor o igual que `num_teams`.
+    """
+    size = 1
+    while size < num_teams:
+        size *= 2
+    return size
+
+
+def bracket_order(size):
+    """
+    Calcula el orden estándar de las cabezas de serie en un cuadro de `size` posiciones.
+
+    La cabeza de serie 1 y la 2 quedan en mitades opuestas del cuadro, la 1 y la 4 en
+    cuartos opuestos, etc., de forma que los mejores solo se cruzan en las últimas rondas.
+
+    Args:
+        size (int): Número de posiciones (potencia de dos).
+
+    Returns:
+        list: Índices de cabeza de serie (empezando en 0) en orden de posición.
+              Por ejemplo, para 8: [0, 7, 3, 4, 1, 6, 2, 5].
+    """
+    order = [0]
+    while len(order) < size:
+        length = len(order) * 2
+        order = [seed for index in order for seed in (index, length - 1 - index)]
+    return order
+
+
+def create_matches(matches):
+    """
+    Inserta en bloque los partidos de una ronda junto con su log "Ronda creada".
+
+    Se ejecuta en una transacción, por lo que una ronda nunca queda creada a medias
+    aunque el worker se detenga. El número de consultas no depende del número de partidos.
+
+    Args:
+        matches (list): Instancias de Match sin guardar.
+
+    Returns:
+        list: Partidos creados, con su clave primaria.
+    """
+    if not matches:
+        return []
+
+    with transaction.atomic():
+        matches = Match.objects.bulk_create(matches)
+        MatchLog.objects.bulk_create(
+            [
+                MatchLog(
+                    match=match,
+                    event_type=MatchLog.ROUND_CREATED,
+                    payload={"round": match.round},
+                )
+                for match in matches
+            ]
+        )
+    return matches
+
+
+def create_slot_matches(slots):
+    """
+    Crea en bloque los partidos de las casillas que ya tienen ambos equipos.
+
+    Args:
+        slots (list): Casillas con team1 y team2 asignados y sin partido.
+
+    Returns:
+        list: Partidos creados.
+    """
+    scheduled_at = timezone.now() + timezone.timedelta(minutes=2)
+    matches = create_matches(
+        [
+            Match(
+                tournament_id=slot.tournament_id,
+                round=slot.round,
+                team1_id=slot.team1_id,
+                team2_id=slot.team2_id,
+                scheduled_at=scheduled_at,
+            )
+            for slot in slots
+        ]
+    )
+    for slot, match in zip(slots, matches):
+        slot.match = match
+    BracketSlot.objects.bulk_update(slots, ["match"])
+    return matches
+
+
+def build_bracket(tournament, pairs):
+    """
+    Genera el cuadro completo de eliminatorias de un torneo.
+
+    Crea todas las casillas de todas las rondas (una inserción por ronda, de la final
+    hacia atrás para poder enlazar cada casilla con la siguiente), coloca a los equipos
+    con pase directo en la segunda ronda y crea los partidos de las casillas que ya
+    tienen ambos equipos.
+
+    Args:
+        tournament (Tournament): Torneo para el que se genera el cuadro.
+        pairs (list): Tuplas (team1, team2) de la primera ronda en orden de posición,
+                      como las devuelve `seeding.seed_pairs`. Su número debe ser potencia de dos.
+
+    Returns:
+        list: Partidos creados.
+    """
+    rounds = bracket_size(len(pairs)).bit_length()
+
+    # Equipos de cada casilla, calculados en memoria antes de insertar nada
+    teams = {1: [[team1, team2] for team1, team2 in pairs]}
+    for round_number in range(2, rounds + 1):
+        teams[round_number] = [[None, None] for _ in range(len(teams[round_number - 1]) // 2)]
+
+    # Los equipos con pase directo pasan a la casilla siguiente
+    if rounds > 1:
+        for position, (team1, team2) in enumerate(pairs):
+            if team2 is None:
+                teams[2][position // 2][position % 2] = team1
+
+    with transaction.atomic():
+        slots = []
+        next_round = []
+        for round_number in range(rounds, 0, -1):
+            round_slots = BracketSlot.objects.bulk_create(
+                [
+                    BracketSlot(
+                        tournament=tournament,
+                        round=round_number,
+                        position=position,
+                        team1=team1,
+                        team2=team2,
+                        next_slot=next_round[position // 2] if next_round else None,
+                    )
+                    for position, (team1, team2) in enumerate(teams[round_number])
+                ]
+            )
+            slots += round_slots
+            next_round = round_slots
+
+        ready = [slot for slot in slots if slot.team1_id and slot.team2_id]
+        return create_slot_matches(ready)
+
+
+def fill_next_slots(matches):
+    """
+    Coloca a los ganadores de los partidos indicados en la casilla siguiente del cuadro.
+
+    Para cada partido se actualiza solo el lado de la casilla siguiente que le
+    corresponde, por lo que dos partidos hermanos registrados a la vez no se pisan.
+    Las casillas que quedan con ambos equipos reciben su partido. Los partidos que no
+    pertenecen a un cuadro precalculado o que son la final se ignoran.
+
+    Args:
+        matches (list): Partidos completados con `winner` asignado.
+
+    Returns:
+        list: Partidos creados para la siguiente ronda.
+    """
+    winners = {match.id: match.winner_id for match in matches}
+    slots = BracketSlot.objects.filter(match_id__in=winners, next_slot__isnull=False).only(
+        "id", "position", "match", "next_slot"
+    )
+
+    with transaction.atomic():
+        parent_ids = set()
+        for slot in slots:
+            BracketSlot.objects.filter(pk=slot.next_slot_id).update(
+                **{f"{slot.next_side}_id": winners[slot.match_id]}
+            )
+            parent_ids.add(slot.next_slot_id)
+
+        if not parent_ids:
+            return []
+
+        ready = list(
+            BracketSlot.objects.select_for_update().filter(
+                pk__in=parent_ids,
+                match__isnull=True,
+                team1__isnull=False,
+                team2__isnull=False,
+            )
+        )
+        return create_slot_matches(ready)
@@ -1,4 +1,4 @@
-from .models import Notification
+from .functions import get_unread_count
 
 
 def notification_counts(request):
@@ -6,7 +6,7 @@ def notification_counts(request):
     unread = 0
     try:
         if request.user and request.user.is_authenticated:
-            unread = Notification.objects.filter(user=request.user, read_at__isnull=True).count()
+            unread = get_unread_count(request.user.pk)
     except Exception:
         unread = 0
     return {"notification_unread_count": unread}
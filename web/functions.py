@@ -1,80 +1,249 @@
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
 from django.utils import timezone
 from .models import *
+from .bracket import build_bracket, create_matches, fill_next_slots
+from .leaderboard import player_ranks, update_player_scores
+from .rating import rate_match
+from .realtime import publish_notifications
+from .seeding import annotate_team_mmr, seed_pairs
 from django.db import transaction
-from itertools import zip_longest
+from django.db.models import Case, Count, F, PositiveIntegerField, Q, QuerySet, When
+from django.db.models.functions import Greatest, Least
+from collections import Counter, defaultdict
+import logging
+import random
 
+logger = logging.getLogger(__name__)
 
-def update_winrate(player):
+
+def update_match_stats(winner, loser, match=None):
     """
-    Actualiza el porcentaje de victorias (winrate) de un jugador basado en sus estadísticas.
+    Actualiza las estadísticas de los jugadores de los dos equipos de un partido.
 
-    Calcula el winrate como (games_won / games_played) * 100 y guarda el resultado.
-    Si no hay partidas jugadas, establece el winrate a 0.0.
+    Es el caso de un solo partido de `update_matches_stats`.
 
     Args:
-        player: Instancia del modelo Player que debe contener:
-            - games_played (int): Número total de partidas jugadas
-            - games_won (int): Número de partidas ganadas
-            - winrate (float): Atributo que será actualizado
-            - save(): Método para guardar los cambios en la base de datos
+        winner (Team): Equipo ganador.
+        loser (Team): Equipo perdedor.
+        match (Match, optional): Partido disputado. Si se indica, se registra en sus logs
+                                 el aumento de renombre de los ganadores.
 
     Returns:
-        None: La función no retorna nada, pero modifica y guarda el objeto player
+        int: Número de jugadores actualizados.
+    """
+    return update_matches_stats([(match, winner, loser)])
+
+
+# Campos de Player que modifica `update_matches_stats`
+MATCH_STATS_FIELDS = [
+    "games_played",
+    "games_won",
+    "winrate",
+    "mmr",
+    "rating_deviation",
+    "rating_volatility",
+    "renombre",
+]
+
+
+def update_matches_stats(results, penalties=()):
+    """
+    Actualiza en bloque las estadísticas de los jugadores de varios partidos.
+
+    El nuevo MMR de cada jugador lo calcula el motor de valoración configurado
+    (`settings.RATING_ENGINE`, ver `web.rating`) a partir de las valoraciones de ambas
+    plantillas, por lo que ganar a un rival más fuerte suma más que ganar a uno más débil.
+    Además se actualizan los contadores de partidas, el winrate, la desviación y la
+    volatilidad de la valoración, y el renombre de los ganadores (+5, máximo 100).
+    Después se aplican los ajustes de renombre de `penalties` (siempre en [1, 100]).
+
+    Las plantillas de todos los partidos se bloquean y leen con una sola consulta, los
+    partidos se aplican en memoria en orden y todos los cambios se guardan con una única
+    actualización en bloque, dentro de una transacción, por lo que el número de consultas
+    no depende del número de partidos. Después se publican en las clasificaciones de
+    jugadores (`leaderboard`): la global, la del país y la del juego de cada partido, y se
+    anotan en el historial de MMR (`record_rating_history`).
+
+    Args:
+        results (list): Tuplas (match, winner, loser). `match` puede ser None; si se
+            indica, se registra en sus logs el aumento de renombre de los ganadores.
+        penalties (iterable, optional): Tuplas (match, teams, amount, reason) con ajustes
+            de renombre para los jugadores de esos equipos, registrados en los logs del
+            partido si se indica un motivo.
+
+    Returns:
+        int: Número de jugadores actualizados.
+    """
+    team_ids = {team.pk for _, winner, loser in results for team in (winner, loser)}
+    with transaction.atomic():
+        players = list(Player.objects.select_for_update().filter(team__in=team_ids).order_by("pk"))
+        if not players:
+            return 0
+        rosters = defaultdict(list)
+        for player in players:
+            rosters[player.team_id].append(player)
+
+        logs = []
+        history = []
+        players_by_game = defaultdict(set)
+        for match, winner, loser in results:
+            winners, losers = rosters[winner.pk], rosters[loser.pk]
+            new_winners, new_losers = rate_match(winners, losers)
+            for roster, ratings, won in ((winners, new_winners, 1), (losers, new_losers, 0)):
+                for player, mmr, deviation, volatility in zip(roster, *ratings):
+                    player.games_played += 1
+                    player.games_won += won
+                    player.winrate = player.games_won * 100.0 / player.games_played
+                    player.mmr = int(mmr)
+                    player.rating_deviation = float(deviation)
+                    player.rating_volatility = float(volatility)
+                    if won:
+                        player.renombre = min(player.renombre + 5, 100)
+                    history.append((player.pk, player.mmr, match))
+
+            game_id = match.tournament.game_id if match is not None else None
+            players_by_game[game_id].update(player.pk for player in winners + losers)
+            if match is not None:
+                logs += [
+                    build_match_log(
+                        match,
+                        MatchLog.RENOMBRE,
+                        team=player.team_id,
+                        player=player.pk,
+                        amount=5,
+                        reason="Victoria en partido oficial",
+                    )
+                    for player in winners
+                ]
+
+        for match, teams, amount, reason in penalties:
+            for team in teams:
+                for player in rosters[team.pk]:
+                    player.renombre = max(min(player.renombre + amount, 100), 1)
+                    if reason and match is not None:
+                        logs.append(
+                            build_match_log(
+                                match,
+                                MatchLog.RENOMBRE,
+                                team=player.team_id,
+                                player=player.pk,
+                                amount=amount,
+                                reason=reason,
+                            )
+                        )
+
+        Player.objects.bulk_update(players, MATCH_STATS_FIELDS)
+        create_match_logs_bulk(logs)
+
+        # Se publica el MMR final de cada jugador, aunque haya jugado varios partidos
+        by_pk = {player.pk: player for player in players}
+        scores = [
+            (
+                {pk: by_pk[pk].mmr for pk in player_ids},
+                {pk: by_pk[pk].country for pk in player_ids},
+                game_id,
+            )
+            for game_id, player_ids in players_by_game.items()
+        ]
+        transaction.on_commit(lambda: match_stats_committed(scores, history))
+
+    return len(players)
+
+
+def match_stats_committed(scores, history):
     """
+    Acciones posteriores a la actualización de estadísticas, ya confirmada en la base de datos.
 
-    if player.games_played > 0:
-        player.winrate = (player.games_won / player.games_played) * 100
-    else:
-        player.winrate = 0.0
-    player.save()
+    Publica el MMR en las clasificaciones y después anota el historial con la posición ya
+    actualizada. Se hace tras el commit para que Redis nunca refleje un MMR que la base de
+    datos ha descartado.
 
+    Args:
+        scores (list): Tuplas (scores, countries, game_id) con los argumentos de
+            `update_player_scores` para cada juego.
+        history (list): Entradas de `record_rating_history`.
+    """
+    for game_scores, countries, game_id in scores:
+        update_player_scores(game_scores, countries=countries, game_id=game_id)
+    record_rating_history(history)
 
-def update_players_stats(team, is_winner=False):
+
+def record_rating_history(entries):
     """
-    Actualiza las estadísticas de todos los jugadores de un equipo tras un partido.
+    Anota en bloque en el historial el MMR y la posición actuales de varios jugadores.
 
-    Esta función modifica múltiples métricas de los jugadores incluyendo:
-    - Contadores de partidas jugadas y ganadas
-    - Winrate (porcentaje de victorias)
-    - MMR (Match Making Rating)
-    - Renombre (reputación del jugador)
+    La posición se toma de la clasificación global, ya actualizada, en una sola consulta.
 
     Args:
-        team (Team): Instancia del modelo Team que contiene los jugadores a actualizar.
-                     Debe tener un método player_set.all() para acceder a sus jugadores.
-        is_winner (bool, optional): Indica si el equipo ganó el partido. Por defecto False.
+        entries (list): Tuplas (player_id, mmr, match); `match` puede ser None.
 
     Returns:
-        None: La función no retorna nada pero modifica y guarda todos los jugadores del equipo.
+        list: Entradas de RatingHistory creadas.
     """
-    # Recorre todos los jugadores del equipo
-    for player in team.player_set.all():
+    ranks = player_ranks({player_id for player_id, _, _ in entries})
+    return RatingHistory.objects.bulk_create(
+        [
+            RatingHistory(player_id=player_id, match=match, mmr=mmr, rank=ranks.get(player_id))
+            for player_id, mmr, match in entries
+        ]
+    )
 
-        # Incrementa el contador de juegos jugados para cada jugador
-        player.games_played += 1
 
-        # Si el equipo ganó el partido, incrementa los juegos ganados
-        if is_winner:
-            player.games_won += 1
+def update_teams_renombre(teams, amount, reason=None, match=None):
+    """
+    Ajusta el renombre de todos los jugadores de uno o varios equipos con una única sentencia.
 
-        # Actualiza el winrate del jugador
-        update_winrate(player)
+    El renombre resultante se mantiene siempre en el rango [1, 100].
 
-        # Actualiza el MMR del jugador. Si el jugador ganó, aumenta su MMR en 10,
-        # de lo contrario lo disminuye en 5, pero no puede bajar de 10
-        if is_winner:
-            player.mmr += 10
-        else:
-            player.mmr = max(10, player.mmr - 5)
+    Args:
+        teams (iterable): Equipos cuyos jugadores se actualizan.
+        amount (int): Cantidad a sumar (positiva) o restar (negativa).
+        reason (str, optional): Motivo del cambio, se registra en los logs del partido.
+        match (Match, optional): Partido en el que registrar el log del cambio.
+
+    Returns:
+        int: Número de jugadores actualizados.
+    """
+    players = Player.objects.filter(team__in=teams)
 
-        # Si el jugador ganó, incrementa su renombre en 5 unidades
-        if is_winner:
-            increase_player_renombre(player, amount=5, reason="Victoria en partido oficial")
+    with transaction.atomic():
+        updated = players.update(renombre=Greatest(Least(F("renombre") + amount, 100), 1))
+        if updated and reason and match is not None:
+            create_renombre_logs(match, players, amount, reason)
 
-        # Guarda los cambios realizados en el jugador
-        player.save()
+    return updated
+
+
+def create_renombre_logs(match, players, amount, reason):
+    """
+    Registra en bloque el mismo cambio de renombre para un conjunto de jugadores.
+
+    Args:
+        match (Match): Partido al que se asocian los logs.
+        players (QuerySet | list): Jugadores afectados, o pares (player_id, team_id) ya leídos.
+        amount (int): Cambio de renombre (negativo si se reduce).
+        reason (str): Motivo del cambio.
+
+    Returns:
+        list: Logs creados.
+    """
+    if isinstance(players, QuerySet):
+        players = players.values_list("id", "team_id")
+    return create_match_logs_bulk(
+        [
+            build_match_log(
+                match,
+                MatchLog.RENOMBRE,
+                team=team_id,
+                player=player_id,
+                amount=amount,
+                reason=reason,
+            )
+            for player_id, team_id in players
+        ]
+    )
 
 
 def generate_matches_by_mmr(tournament_id, round=1, tournament_teams=None):
@@ -82,11 +251,16 @@ def generate_matches_by_mmr(tournament_id, round=1, tournament_teams=None):
     Genera los partidos de un torneo basándose en el MMR promedio de los equipos participantes.
 
     Esta función realiza las siguientes operaciones:
-    1. Verifica que el número de equipos sea válido (2, 4 u 8)
+    1. Verifica que el número de equipos sea válido (entre 2 y MAX_BRACKET_TEAMS)
     2. Valida que todos los equipos tengan el número correcto de jugadores
-    3. Cancela el torneo con notificaciones si no se cumplen las condiciones
-    4. Ordena los equipos por MMR promedio y los empareja
-    5. Crea los partidos correspondientes en la base de datos
+    3. Cancela el torneo si no se cumplen las condiciones, encolando los avisos (`cancel_tournament`)
+    4. Calcula el MMR promedio de todos los equipos con una única consulta agregada
+       y los empareja según `settings.TOURNAMENT_SEEDING_STRATEGY` (ver `seeding.py`)
+    5. En la primera ronda genera el cuadro completo de eliminatorias (`build_bracket`),
+       con pases directos si el número de equipos no es potencia de dos. En rondas
+       posteriores (torneos sin cuadro precalculado) crea los partidos de la ronda.
+    6. Inserta los partidos y sus logs "Ronda creada" en bloque, en la misma transacción
+       que marca el torneo con `matches_generated`
 
     Args:
         tournament_id (int): ID del torneo en la base de datos. Debe existir un objeto Tournament con este ID.
@@ -120,75 +294,92 @@ def generate_matches_by_mmr(tournament_id, round=1, tournament_teams=None):
         tournament.delete()
         return
 
-    # Si el número es diferente a 2, 4 u 8, cancelamos el torneo
-    if num_teams != 2 and num_teams != 4 and num_teams != 8:
-        # Enviar correo a todos los jugadores del torneo notificando la cancelación
-        players = Player.objects.filter(team__tournamentteam__tournament=tournament).select_related(
-            "team"
+    # Si el número no cabe en un cuadro de eliminatorias, cancelamos el torneo
+    if not 2 <= num_teams <= MAX_BRACKET_TEAMS:
+        # Notificar a todos los jugadores del torneo y eliminar el torneo cancelado
+        cancel_tournament(
+            tournament,
+            Player.objects.filter(team__tournamentteam__tournament=tournament),
+            "el número de equipos inscritos no es válido para el formato de eliminatorias",
         )
-        for player in players:
-            send_mail(
-                subject="Torneo Cancelado",  # Asunto del correo
-                message=f"Hola {player.user.username},\n\nLamentablemente, el torneo {tournament.name} ha sido cancelado debido a un número impar de equipos.",
-                from_email=settings.DEFAULT_FROM_EMAIL,  # Remitente
-                recipient_list=[player.user.email],  # Correo del jugador
-                fail_silently=False,  # Si ocurre un error, lanzar una excepción
-            )
-
-        # Eliminar el torneo cancelado
-        tournament.delete()
         return
 
+    # MMR medio y número de jugadores de todos los equipos en una sola consulta
+    seeded_teams = list(annotate_team_mmr(tournament_teams))
+
     # Verificar que todos los equipos tengan la cantidad exacta de jugadores
-    invalid_teams = []
-    for team in Team.objects.filter(tournamentteam__tournament=tournament):
-        if team.player_set.count() != tournament.max_player_per_team:
-            invalid_teams.append(team)
+    invalid_teams = [
+        tt.team for tt in seeded_teams if tt.num_players != tournament.max_player_per_team
+    ]
 
     if invalid_teams:
-        players = Player.objects.filter(team__in=invalid_teams)
-        for player in players:
-            send_mail(
-                subject="Torneo Cancelado",
-                message=f"Hola {player.user.username},\n\nLamentablemente, el torneo {tournament.name} ha sido cancelado porque algunos equipos no tienen el número correcto de jugadores.",
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[player.user.email],
-                fail_silently=False,
-            )
-
-        tournament.delete()
+        cancel_tournament(
+            tournament,
+            Player.objects.filter(team__in=invalid_teams),
+            "algunos equipos no tienen el número correcto de jugadores",
+        )
         return
 
-    # Si el número de equipos es par, procedemos a generar los partidos
-    team_mmr_pairs = []
-    for tt in tournament_teams:
-        # Obtener el MMR promedio del equipo
-        avg_mmr = tt.team.get_avg_mmr()  # 'get_avg_mmr' devuelve el MMR promedio del equipo
-        team_mmr_pairs.append((tt, avg_mmr))
-
-    # Ordenar los equipos por su MMR (de menor a mayor)
-    team_mmr_pairs.sort(key=lambda x: x[1])
-
-    # Emparejar los equipos basados en el MMR, haciendo parejas entre los equipos
-    pairings = list(zip_longest(team_mmr_pairs[::2], team_mmr_pairs[1::2]))
-
-    # Crear los partidos en la base de datos
-    for pair in pairings:
-        if pair[0] and pair[1]:
-            team1 = pair[0][0]  # Primer equipo de la pareja
-            team2 = pair[1][0]  # Segundo equipo de la pareja
-            Match.objects.create(
-                tournament=tournament,
-                round=round,
-                scheduled_at=timezone.now()
-                + timezone.timedelta(minutes=2),  # Programar el partido para dentro de 2 minutos
-                team1=team1.team,  # Asignar el primer equipo
-                team2=team2.team,  # Asignar el segundo equipo
+    # Los partidos, sus logs y la marca de partidos generados se guardan juntos
+    with transaction.atomic():
+        if round == 1:
+            # En la primera ronda se genera el cuadro completo; los mejores MMR reciben los pases
+            build_bracket(tournament, seed_pairs([tt.team for tt in seeded_teams]))
+        else:
+            # Ordenar los equipos por su MMR (de menor a mayor) y emparejarlos de dos en dos
+            ordered_teams = [tt.team for tt in reversed(seeded_teams)]
+            scheduled_at = timezone.now() + timezone.timedelta(minutes=2)
+            create_matches(
+                [
+                    Match(
+                        tournament=tournament,
+                        round=round,
+                        scheduled_at=scheduled_at,  # Programar el partido para dentro de 2 minutos
+                        team1=team1,
+                        team2=team2,
+                    )
+                    for team1, team2 in zip(ordered_teams[::2], ordered_teams[1::2])
+                ]
             )
 
-    # Marcar que los partidos han sido generados y guardar el estado del torneo
-    tournament.matches_generated = True
-    tournament.save()
+        # Marcar que los partidos han sido generados
+        tournament.matches_generated = True
+        tournament.save(update_fields=["matches_generated"])
+
+
+def cancel_tournament(tournament, players, reason):
+    """
+    Cancela un torneo notificando a los jugadores afectados.
+
+    Los avisos se encolan con una única inserción en bloque en la cola de
+    notificaciones (`send_email=True`), de modo que los correos los envía
+    `process_notification_queue` reutilizando la conexión SMTP y un error de
+    correo no puede dejar la cancelación a medias. Las notificaciones no se
+    asocian al torneo porque se eliminarían en cascada junto con él.
+
+    Args:
+        tournament (Tournament): Torneo a cancelar.
+        players (QuerySet): Jugadores a notificar.
+        reason (str): Motivo de la cancelación, incluido en el mensaje.
+    """
+    with transaction.atomic():
+        create_notifications_bulk(
+            [
+                {
+                    "user": player.user,
+                    "title": "Torneo Cancelado",
+                    "message": (
+                        f"Hola {player.user.username},\n\n"
+                        f"Lamentablemente, el torneo {tournament.name} ha sido cancelado "
+                        f"porque {reason}."
+                    ),
+                    "urgency": 3,
+                    "send_email": True,
+                }
+                for player in players.select_related("user")
+            ]
+        )
+        tournament.delete()
 
 
 def record_match_result(match, winner, team1_score, team2_score):
@@ -198,8 +389,7 @@ def record_match_result(match, winner, team1_score, team2_score):
     Esta función realiza las siguientes operaciones:
     1. Crea un registro de resultado en la base de datos (MatchResult)
     2. Actualiza el estado del partido a 'completed'
-    3. Envía notificaciones por correo electrónico a todos los jugadores de ambos equipos
-    4. Muestra el resultado en la consola para propósitos de depuración
+    3. Encola una notificación por correo para todos los jugadores de ambos equipos
 
     Args:
         match (Match): Instancia del modelo Match que representa el partido a registrar.
@@ -210,129 +400,258 @@ def record_match_result(match, winner, team1_score, team2_score):
         team2_score (int): Puntuación numérica obtenida por el equipo 2.
 
     Returns:
-        None: La función no retorna ningún valor, pero tiene varios efectos secundarios.
+        MatchResult: El resultado creado.
+    """
+    return record_match_results([(match, winner, team1_score, team2_score)])[0]
+
+
+def record_match_results(results):
+    """
+    Registra en bloque los resultados de varios partidos.
+
+    Crea todos los MatchResult con una única inserción, marca los partidos como
+    'completed' con una única actualización y encola las notificaciones de
+    "partida finalizada" para los jugadores de ambos equipos en lugar de enviar
+    un correo síncrono por jugador.
+
+    Args:
+        results (list): Tuplas (match, winner, team1_score, team2_score).
+
+    Returns:
+        list: Objetos MatchResult creados, en el mismo orden que `results`.
     """
+    if not results:
+        return []
 
-    # Registrar el resultado del partido en la base de datos
-    result = MatchResult.objects.create(
-        match=match,  # Relacionar con el partido
-        winner=winner,  # Registrar al equipo ganador
-        team1_score=team1_score,  # Registrar la puntuación del primer equipo
-        team2_score=team2_score,  # Registrar la puntuación del segundo equipo
+    matches = [match for match, _, _, _ in results]
+    players_by_team = get_players_by_team(
+        [team_id for match in matches for team_id in (match.team1_id, match.team2_id)]
     )
 
-    # Actualizar el estado del partido a 'completed' (finalizado)
-    match.status = "completed"
-    match.save()  # Guardar el estado actualizado del partido
-
-    # Enviar correos electrónicos a los jugadores del equipo 1
-    for player in match.team1.player_set.all():
-        send_mail(
-            subject="✅ ¡Partida finalizada!",  # Asunto del correo
-            message=(
-                f"Hola {player.user.username},\n\n"  # Saludo al jugador
-                "La partida ha finalizado correctamente.\n\n"
-                f"Resultado del partido {match}: {team1_score}-{team2_score}\n\n"  # Resultado del partido
-                "- El equipo de ArenaGG"  # Firma
-            ),
-            from_email=settings.DEFAULT_FROM_EMAIL,  # Remitente
-            recipient_list=[player.user.email],  # Lista de destinatarios
-            fail_silently=False,  # Si ocurre un error, se lanza una excepción
-        )
+    notifications = []
+    for match, winner, team1_score, team2_score in results:
+        match.winner = winner
+        match.status = "completed"
+        for team_id in (match.team1_id, match.team2_id):
+            for player in players_by_team.get(team_id, []):
+                notifications.append(
+                    {
+                        "user": player.user,
+                        "title": "✅ ¡Partida finalizada!",
+                        "message": (
+                            f"Hola {player.user.username},\n\n"
+                            "La partida ha finalizado correctamente.\n\n"
+                            f"Resultado del partido {match}: {team1_score}-{team2_score}\n\n"
+                            "- El equipo de ArenaGG"
+                        ),
+                        "urgency": 3,
+                        "send_email": True,
+                        "match": match,
+                    }
+                )
 
-    # Enviar correos electrónicos a los jugadores del equipo 2
-    for player in match.team2.player_set.all():
-        send_mail(
-            subject="✅ ¡Partida finalizada!",  # Asunto del correo
-            message=(
-                f"Hola {player.user.username},\n\n"  # Saludo al jugador
-                "La partida ha finalizado correctamente.\n\n"
-                f"Resultado del partido {match}: {team1_score}-{team2_score}\n\n"  # Resultado del partido
-                "- El equipo de ArenaGG"  # Firma
-            ),
-            from_email=settings.DEFAULT_FROM_EMAIL,  # Remitente
-            recipient_list=[player.user.email],  # Lista de destinatarios
-            fail_silently=False,  # Si ocurre un error, se lanza una excepción
+    with transaction.atomic():
+        match_results = MatchResult.objects.bulk_create(
+            [
+                MatchResult(
+                    match=match, winner=winner, team1_score=team1_score, team2_score=team2_score
+                )
+                for match, winner, team1_score, team2_score in results
+            ]
         )
+        Match.objects.bulk_update(matches, ["winner", "status"])
+        create_notifications_bulk(notifications)
+
+        # Los ganadores pasan directamente a su casilla del cuadro
+        fill_next_slots(matches)
+
+        # Avanza el cuadro de cada torneo afectado en cuanto se confirme la transacción
+        for tournament_id in {match.tournament_id for match in matches}:
+            schedule_tournament_advance(tournament_id)
+
+    return match_results
 
 
-def create_match_log(match, event, team=None, player=None):
+def start_ready_matches(matches):
     """
-    Crea un registro (log) de evento en una partida.
+    Inicia en bloque los partidos en los que ambos equipos están listos.
+
+    Solo se inician (y se anuncian) los partidos que siguen pendientes: uno que otro
+    proceso ya ha resuelto, por ejemplo por incomparecencia, no vuelve a 'ongoing'.
 
     Args:
-        match (Match): Instancia del partido.
-        event (str): Descripción del evento.
-        team (Team, optional): Instancia del equipo relacionado al evento.
-        player (Player, optional): Instancia del jugador relacionado al evento.
+        matches (list): Partidos pendientes con ambos equipos listos.
+    """
+    if not matches:
+        return
 
-    Returns:
-        MatchLog: El registro creado.
+    pending = Match.objects.filter(id__in=[match.id for match in matches], status="pending")
+    pending_ids = set(pending.select_for_update().values_list("id", flat=True))
+    matches = [match for match in matches if match.id in pending_ids]
+    if not matches:
+        return
+
+    pending.filter(id__in=pending_ids).update(status="ongoing")
+    create_match_logs_bulk([build_match_log(match, MatchLog.MATCH_STARTED) for match in matches])
+
+    # Notifica a cada jugador de ambos equipos mediante el sistema de notificaciones
+    players_by_team = get_players_by_team(
+        [team_id for match in matches for team_id in (match.team1_id, match.team2_id)]
+    )
+    notifications = []
+    for match in matches:
+        for team_id in (match.team1_id, match.team2_id):
+            for player in players_by_team.get(team_id, []):
+                notifications.append(
+                    {
+                        "user": player.user,
+                        "title": "✅ ¡Partida Comenzada!",
+                        "message": (
+                            f"Hola {player.user},\n\n"
+                            "La partida ha comenzado correctamente.\n\n"
+                            "- El equipo de ArenaGG"
+                        ),
+                        "sender_email": settings.DEFAULT_FROM_EMAIL,
+                        "urgency": 3,
+                        "send_email": True,
+                        "match": match,
+                    }
+                )
+    create_notifications_bulk(notifications)
+
+
+def resolve_forfeited_matches(matches):
     """
-    log = MatchLog.objects.create(match=match, event=event, team=team, player=player)
-    return log
+    Finaliza en bloque los partidos a los que algún equipo no se ha presentado.
 
+    Las estadísticas de todos los partidos y la penalización de renombre de los equipos
+    ausentes se aplican con `update_matches_stats` (una lectura y una actualización en
+    bloque de los jugadores) y los resultados con `record_match_results`, por lo que el
+    número de consultas no depende del número de partidos.
 
-def decrease_player_renombre(player, amount, reason=None):
+    Args:
+        matches (list): Partidos pendientes cuya hora programada ya ha pasado.
     """
-    Disminuye el renombre de un jugador y crea un log del evento,
-    salvo que ya tenga 1 o menos de renombre.
+    stats = []
+    penalties = []
+    results = []
+    logs = []
+    for match in matches:
+        # Subcaso: solo el equipo 1 está listo
+        if match.team1_ready and not match.team2_ready:
+            winner, loser = match.team1, match.team2
+            absent_teams = [match.team2]
+
+        # Subcaso: solo el equipo 2 está listo
+        elif match.team2_ready and not match.team1_ready:
+            winner, loser = match.team2, match.team1
+            absent_teams = [match.team1]
+
+        # Subcaso: ningún equipo está listo → se elige un ganador aleatoriamente
+        else:
+            winner = random.choice([match.team1, match.team2])
+            loser = match.team2 if winner == match.team1 else match.team1
+            absent_teams = [match.team1, match.team2]
+
+        team1_score, team2_score = (1, 0) if winner == match.team1 else (0, 1)
+
+        # Estadísticas y penalización de los jugadores ausentes, aplicadas al final en bloque
+        stats.append((match, winner, loser))
+        penalties.append((match, absent_teams, -5, "No se ha presentado"))
+
+        results.append((match, winner, team1_score, team2_score))
+        logs.append(
+            build_match_log(
+                match,
+                MatchLog.FORFEIT,
+                winner_id=winner.pk,
+                absent=[team.pk for team in absent_teams],
+                team1_score=team1_score,
+                team2_score=team2_score,
+            )
+        )
+
+    # Guarda las estadísticas, los resultados y los logs de todos los partidos
+    update_matches_stats(stats, penalties)
+    record_match_results(results)
+    create_match_logs_bulk(logs)
+
+
+def get_players_by_team(teams):
+    """
+    Obtiene los jugadores (con su usuario) de varios equipos con una sola consulta.
 
     Args:
-        player (Player): Instancia del jugador.
-        amount (int): Cantidad de renombre a disminuir.
-        reason (str, optional): Razón del castigo o pérdida de renombre.
+        teams (iterable): Equipos o IDs de equipo.
 
     Returns:
-        Player: El jugador actualizado (o sin cambios si no se aplicó reducción).
+        dict: {team_id: [Player, ...]}
     """
+    players_by_team = defaultdict(list)
+    for player in Player.objects.filter(team__in=teams).select_related("user"):
+        players_by_team[player.team_id].append(player)
+    return players_by_team
 
-    original_renombre = player.renombre
-    player.renombre = max(1, player.renombre - amount)
-    player.save()
 
-    # Crear log asociado si se proporciona razón
-    if reason and hasattr(player, "match_set"):
-        last_match = player.match_set.order_by("-scheduled_at").first()
-        if last_match:
-            create_match_log(
-                match=last_match,
-                event=f"Renombre reducido en {amount} por: {reason}",
-                player=player,
-            )
+def build_match_log(match, event_type, team=None, player=None, event="", **payload):
+    """
+    Prepara, sin guardarlo, un registro (log) de evento en una partida.
 
-    return player
+    El texto del evento no se guarda: se genera al mostrarlo a partir del tipo y los
+    datos (`MatchLog.text`). Solo los eventos libres (MatchLog.CUSTOM) guardan `event`.
 
+    Args:
+        match (Match): Instancia del partido.
+        event_type (str): Tipo de evento (constantes de MatchLog).
+        team (Team | int, optional): Equipo relacionado al evento, o su ID.
+        player (Player | int, optional): Jugador relacionado al evento, o su ID.
+        event (str, optional): Descripción del evento, solo para eventos CUSTOM.
+        **payload: Datos del evento (marcador, IDs de equipos, cantidades...).
 
-def increase_player_renombre(player, amount, reason=None):
+    Returns:
+        MatchLog: El registro sin guardar.
     """
-    Aumenta el renombre de un jugador y crea un log del evento,
-    salvo que ya tenga 100 o más de renombre.
+    return MatchLog(
+        match=match,
+        team_id=getattr(team, "pk", team),
+        player_id=getattr(player, "pk", player),
+        event_type=event_type,
+        payload=payload,
+        event=event,
+    )
+
+
+def create_match_log(match, event_type, team=None, player=None, event="", **payload):
+    """
+    Crea un registro (log) de evento en una partida.
 
     Args:
-        player (Player): Instancia del jugador.
-        amount (int): Cantidad de renombre a aumentar.
-        reason (str, optional): Razón del reconocimiento o aumento de renombre.
+        match (Match): Instancia del partido.
+        event_type (str): Tipo de evento (constantes de MatchLog).
+        team (Team, optional): Instancia del equipo relacionado al evento.
+        player (Player, optional): Instancia del jugador relacionado al evento.
+        event (str, optional): Descripción del evento, solo para eventos CUSTOM.
+        **payload: Datos del evento.
 
     Returns:
-        Player: El jugador actualizado (o sin cambios si no se aplicó aumento).
+        MatchLog: El registro creado.
     """
+    log = build_match_log(match, event_type, team=team, player=player, event=event, **payload)
+    log.save()
+    return log
 
-    original_renombre = player.renombre
-    player.renombre = min(100, player.renombre + amount)
-    player.save()
 
-    # Crear log asociado si se proporciona razón
-    if reason and hasattr(player, "match_set"):
-        last_match = player.match_set.order_by("-scheduled_at").first()
-        if last_match:
-            create_match_log(
-                match=last_match,
-                event=f"Renombre incrementado en {amount} por: {reason}",
-                player=player,
-            )
+def create_match_logs_bulk(logs):
+    """
+    Crea varios registros de eventos de partida con una única inserción.
+
+    Args:
+        logs (list): Registros preparados con `build_match_log`.
 
-    return player
+    Returns:
+        list: Registros MatchLog creados.
+    """
+    return MatchLog.objects.bulk_create(logs)
 
 
 def process_final_match(tournament, completed_matches_queryset):
@@ -359,12 +678,12 @@ def process_final_match(tournament, completed_matches_queryset):
             tournament.save()  # Guardar los cambios en el torneo
 
             # Obtener a todos los jugadores del equipo ganador
-            players = winner.player_set.all()
+            players = list(winner.player_set.select_related("user"))
 
             # Si el torneo tiene un premio en efectivo, distribuirlo entre los jugadores
-            if players.exists() and tournament.prize_pool:
-                reward_per_player = (
-                    tournament.prize_pool / players.count()
+            if players and tournament.prize_pool:
+                reward_per_player = tournament.prize_pool / len(
+                    players
                 )  # Dividir el pool de premios entre los jugadores
                 for player in players:
                     # Si el jugador es Premium, recibe el doble de recompensa
@@ -374,22 +693,27 @@ def process_final_match(tournament, completed_matches_queryset):
                         player.coins += (
                             reward_per_player  # Jugador regular recibe la recompensa normal
                         )
-                    player.save()  # Guardar los cambios en el jugador
-
-            # Enviar correos electrónicos a los jugadores del equipo ganador
-            for player in players:
-                send_mail(
-                    subject="✅ ¡Torneo finalizado!",  # Asunto del correo
-                    message=(
-                        f"Hola {player.user.username},\n\n"  # Saludo al jugador
-                        "El torneo ha finalizado correctamente.\n\n"
-                        f"Enhorabuena por ganar el torneo!!\n\n"  # Felicitaciones por ganar
-                        "- El equipo de ArenaGG"  # Firma
-                    ),
-                    from_email=settings.DEFAULT_FROM_EMAIL,  # Remitente
-                    recipient_list=[player.user.email],  # Correo del jugador
-                    fail_silently=False,  # Si ocurre un error, lanzará una excepción
-                )
+                Player.objects.bulk_update(players, ["coins"])  # Guardar todos en una consulta
+
+            # Encolar el correo de enhorabuena para los jugadores del equipo ganador
+            create_notifications_bulk(
+                [
+                    {
+                        "user": player.user,
+                        "title": "✅ ¡Torneo finalizado!",
+                        "message": (
+                            f"Hola {player.user.username},\n\n"  # Saludo al jugador
+                            "El torneo ha finalizado correctamente.\n\n"
+                            f"Enhorabuena por ganar el torneo!!\n\n"  # Felicitaciones por ganar
+                            "- El equipo de ArenaGG"  # Firma
+                        ),
+                        "urgency": 3,
+                        "send_email": True,
+                        "tournament": tournament,
+                    }
+                    for player in players
+                ]
+            )
 
 
 def process_round(tournament, round_number):
@@ -426,6 +750,88 @@ def process_round(tournament, round_number):
         )
 
 
+def advance_tournament(tournament):
+    """
+    Hace avanzar el cuadro de un torneo en curso a partir del estado de su última ronda.
+
+    Si el torneo tiene un cuadro precalculado (`BracketSlot`), las rondas ya avanzan
+    al registrar cada resultado y solo queda cerrar el torneo cuando se completa la
+    final. En torneos sin cuadro, si todos los partidos de la última ronda están completados:
+    - Si la ronda tenía un único partido (final), se procesa el final del torneo.
+    - En otro caso, se generan los partidos de la siguiente ronda con los ganadores.
+
+    El torneo se bloquea durante la operación, de modo que el avance disparado por un
+    evento y el barrido periódico de reconciliación pueden coincidir sin duplicar rondas.
+
+    Args:
+        tournament (Tournament): Torneo a procesar.
+
+    Returns:
+        str | None: "final" si se ha cerrado el torneo, "round" si se ha generado una ronda
+                    nueva, o None si no había nada que hacer.
+    """
+    with transaction.atomic():
+        tournament = Tournament.objects.select_for_update().get(pk=tournament.pk)
+        if tournament.status != "ongoing":
+            return None
+
+        # Torneos con cuadro precalculado: la final es la casilla sin casilla siguiente
+        final_slot = (
+            BracketSlot.objects.filter(tournament=tournament, next_slot__isnull=True)
+            .select_related("match")
+            .first()
+        )
+        if final_slot is not None:
+            if final_slot.match and final_slot.match.status == "completed":
+                process_final_match(tournament, Match.objects.filter(pk=final_slot.match_id))
+                return "final"
+            return None
+
+        # Métricas de la última ronda en una sola consulta agregada
+        last_round = (
+            Match.objects.filter(tournament=tournament)
+            .values("round")
+            .annotate(total=Count("id"), completed=Count("id", filter=Q(status="completed")))
+            .order_by("-round")
+            .first()
+        )
+        if not last_round or last_round["completed"] < last_round["total"]:
+            return None
+
+        if last_round["total"] == 1:
+            process_final_match(
+                tournament,
+                Match.objects.filter(
+                    tournament=tournament, round=last_round["round"], status="completed"
+                ),
+            )
+            return "final"
+
+        process_round(tournament, round_number=last_round["round"] + 1)
+        return "round"
+
+
+def schedule_tournament_advance(tournament_id):
+    """
+    Encola el avance del cuadro de un torneo cuando se confirme la transacción actual.
+
+    Si el broker de Celery no está disponible el error solo se registra: la tarea
+    periódica `check_tournament_match_progress` reconciliará el torneo más tarde.
+
+    Args:
+        tournament_id (int): ID del torneo a avanzar.
+    """
+    from .tasks import advance_tournament_bracket
+
+    def enqueue():
+        try:
+            advance_tournament_bracket.delay(tournament_id)
+        except Exception as exc:
+            logger.warning("No se pudo encolar el avance del torneo %s: %s", tournament_id, exc)
+
+    transaction.on_commit(enqueue)
+
+
 def create_notification(
     user,
     title="",
@@ -440,6 +846,9 @@ def create_notification(
     """
     Crea una notificación en el sistema.
 
+    Es un atajo para una sola notificación sobre `create_notifications_bulk`, que crea
+    la notificación y todos sus destinatarios con inserciones en bloque.
+
     Args:
         user: Usuario propietario/principal de la notificación (requerido)
         title: Título de la notificación
@@ -455,29 +864,343 @@ def create_notification(
     Returns:
         Notification: Objeto de notificación creado
     """
-    # Determinar lista de destinatarios
-    if recipient_users:
-        recipients = list(recipient_users)
-        # Asegurar que user esté en la lista si no está
+    return create_notifications_bulk(
+        [
+            {
+                "user": user,
+                "title": title,
+                "message": message,
+                "urgency": urgency,
+                "send_email": send_email,
+                "sender_email": sender_email,
+                "recipient_users": recipient_users,
+                "tournament": tournament,
+                "match": match,
+            }
+        ]
+    )[0]
+
+
+def fan_out_notification(users, **fields):
+    """
+    Crea la misma notificación para cada uno de los usuarios indicados.
+
+    Cada usuario recibe su propia notificación (y la ve en su bandeja), pero todas
+    se insertan con `create_notifications_bulk` en un número fijo de consultas.
+
+    Args:
+        users (iterable): Usuarios destinatarios.
+        **fields: Resto de argumentos de `create_notification` (title, message, urgency...).
+
+    Returns:
+        list: Objetos Notification creados.
+    """
+    return create_notifications_bulk([{"user": user, **fields} for user in users])
+
+
+STAFF_RECIPIENTS_CACHE_KEY = "web:staff_recipient_ids"
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def check_cache_settings():
+    """
+    Comprueba al arrancar que la caché por defecto es compartida entre procesos.
+
+    Los contadores de notificaciones sin leer y la lista de miembros del staff se
+    actualizan o invalidan desde cualquier proceso (web o Celery); con una caché local
+    de cada proceso los demás seguirían leyendo valores viejos.
+
+    Raises:
+        ImproperlyConfigured: Si la caché es local del proceso fuera de DEBUG y de las
+                              pruebas.
+    """
+    if settings.DEBUG or settings.TESTING:
+        return
+    if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            "CACHE_URL debe apuntar a una caché compartida (Redis, Memcached...) en producción"
+        )
+
+
+def get_staff_recipients():
+    """
+    Obtiene los usuarios del staff que reciben las alertas internas.
+
+    Los IDs se guardan en caché y solo se consultan en la base de datos cuando la
+    caché está vacía; las señales de `web.signals` la invalidan al guardar o eliminar
+    un usuario.
+
+    Returns:
+        list: Instancias de User (solo con su clave primaria) de los miembros del staff.
+    """
+    staff_ids = cache.get(STAFF_RECIPIENTS_CACHE_KEY)
+    if staff_ids is None:
+        staff_ids = list(User.objects.filter(is_staff=True).values_list("pk", flat=True))
+        cache.set(STAFF_RECIPIENTS_CACHE_KEY, staff_ids, timeout=60 * 60)
+    return [User(pk=pk) for pk in staff_ids]
+
+
+def invalidate_staff_recipients():
+    """Elimina de la caché la lista de miembros del staff."""
+    cache.delete(STAFF_RECIPIENTS_CACHE_KEY)
+
+
+def notify_staff(**fields):
+    """
+    Envía una alerta a todos los miembros del staff.
+
+    Args:
+        **fields: Argumentos de `create_notification` (title, message, urgency...).
+
+    Returns:
+        list: Objetos Notification creados, uno por miembro del staff.
+    """
+    return fan_out_notification(get_staff_recipients(), **fields)
+
+
+UNREAD_COUNT_CACHE_KEY = "web:unread_notifications:{user_id}"
+UNREAD_COUNT_CACHE_TIMEOUT = 60 * 60
+
+
+def get_unread_count(user_id):
+    """
+    Obtiene el número de notificaciones sin leer de un usuario.
+
+    El contador se mantiene en caché y se actualiza con incrementos atómicos al
+    crear notificaciones y al marcarlas como leídas (`adjust_unread_count`). Solo se
+    recalcula con un COUNT cuando no está en caché (primera lectura o caducidad),
+    lo que además acota cualquier desviación a `UNREAD_COUNT_CACHE_TIMEOUT`.
+
+    El recuento se guarda con `cache.add`, que no pisa el contador si otro proceso lo
+    ha sembrado mientras tanto; en ese caso se devuelve el valor ya guardado. Nunca se
+    crea la clave antes del COUNT: un incremento que llegara en ese hueco se contaría
+    dos veces, porque el COUNT ya incluye su notificación.
+
+    Args:
+        user_id (int): ID del usuario.
+
+    Returns:
+        int: Notificaciones sin leer.
+    """
+    key = UNREAD_COUNT_CACHE_KEY.format(user_id=user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, read_at__isnull=True).count()
+        if not cache.add(key, count, timeout=UNREAD_COUNT_CACHE_TIMEOUT):
+            # Otro proceso ha sembrado el contador mientras se contaba
+            count = cache.get(key, count)
+    return max(count, 0)
+
+
+def adjust_unread_count(user_id, delta):
+    """
+    Suma `delta` (positivo o negativo) al contador de notificaciones sin leer.
+
+    Se llama después de confirmar el cambio en la base de datos. Si el contador no está
+    en caché no hay nada que ajustar: la siguiente lectura lo recalcula con un COUNT que
+    ya incluye el cambio.
+
+    Args:
+        user_id (int): ID del usuario.
+        delta (int): Variación del contador.
+    """
+    if not delta:
+        return
+    key = UNREAD_COUNT_CACHE_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # `incr` falla si la clave no existe; crearla aquí dejaría un contador parcial
+        logger.debug("Contador de no leídas sin sembrar para el usuario %s", user_id)
+
+
+def create_notifications_bulk(notifications):
+    """
+    Crea varias notificaciones y sus destinatarios con inserciones en bloque.
+
+    Cada elemento de `notifications` es un diccionario con los mismos argumentos
+    que acepta `create_notification` (user, title, message, urgency, send_email,
+    sender_email, recipient_users, tournament, match).
+
+    Al confirmarse la transacción se publica un evento por notificación en el canal
+    de tiempo real (`web.realtime`), que reenvía a los navegadores conectados.
+
+    Args:
+        notifications (list): Diccionarios con los datos de cada notificación.
+
+    Returns:
+        list: Objetos Notification creados, en el mismo orden de entrada.
+    """
+    if not notifications:
+        return []
+
+    objects = []
+    recipients_per_notification = []
+    for data in notifications:
+        user = data["user"]
+        recipients = list(data.get("recipient_users") or [])
         if user not in recipients:
             recipients.insert(0, user)
-    else:
-        recipients = [user]
-
-    sender_email = sender_email or settings.DEFAULT_FROM_EMAIL
-
-    # Crear una única notificación con el user como propietario
-    notification = Notification.objects.create(
-        user=user,
-        title=title,
-        message=message,
-        urgency=urgency,
-        send_email=send_email,
-        sender_email=sender_email,
-        tournament=tournament,
-        match=match,
+        recipients_per_notification.append(recipients)
+
+        objects.append(
+            Notification(
+                user=user,
+                title=data.get("title", ""),
+                message=data.get("message", ""),
+                urgency=data.get("urgency", 2),
+                send_email=data.get("send_email", False),
+                sender_email=data.get("sender_email") or settings.DEFAULT_FROM_EMAIL,
+                tournament=data.get("tournament"),
+                match=data.get("match"),
+            )
+        )
+
+    Recipient = Notification.recipient_users.through
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(objects)
+        Recipient.objects.bulk_create(
+            [
+                Recipient(notification_id=notification.pk, user_id=user.pk)
+                for notification, recipients in zip(created, recipients_per_notification)
+                for user in recipients
+            ]
+        )
+        # Actualizar los contadores y avisar a los navegadores conectados cuando las
+        # notificaciones sean visibles
+        transaction.on_commit(lambda: notifications_created(created))
+
+    return created
+
+
+def claim_notifications(batch_size, lease_seconds=None):
+    """
+    Reserva un lote de notificaciones pendientes de envío para el worker actual.
+
+    Las filas se seleccionan con `SELECT ... FOR UPDATE SKIP LOCKED` y se pasan a
+    'processing' en la misma transacción, con `next_attempt_at` como fin de la reserva.
+    Así varios workers pueden vaciar la cola en paralelo sin enviar dos veces la misma
+    notificación. Si un worker muere sin terminar, sus notificaciones vuelven a poder
+    reservarse cuando vence la reserva. Retomar una reserva vencida cuenta como un
+    intento fallido: al llegar a `max_retries` la notificación pasa a 'failed' y no se
+    reserva, para que una notificación que tumba al worker no se reintente sin fin.
+
+    Args:
+        batch_size (int): Máximo de notificaciones a reservar.
+        lease_seconds (int, optional): Duración de la reserva. Por defecto
+                                       `settings.NOTIFICATION_LEASE_SECONDS`.
+
+    Returns:
+        list: Notificaciones reservadas, con usuario y destinatarios precargados.
+    """
+    now = timezone.now()
+    lease = timezone.timedelta(seconds=lease_seconds or settings.NOTIFICATION_LEASE_SECONDS)
+
+    with transaction.atomic():
+        rows = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(
+                send_email=True,
+                status__in=["pending", "processing"],
+                next_attempt_at__lte=now,
+            )
+            .order_by("-urgency", "next_attempt_at")
+            .values_list("pk", "status", "retries", "max_retries")[:batch_size]
+        )
+        # Las reservas vencidas ('processing') suman un intento
+        exhausted = [
+            pk
+            for pk, status, retries, max_retries in rows
+            if status == "processing" and retries + 1 >= max_retries
+        ]
+        ids = [pk for pk, *_ in rows if pk not in exhausted]
+        Notification.objects.filter(pk__in=exhausted).update(
+            status="failed", retries=F("retries") + 1, updated_at=now
+        )
+        Notification.objects.filter(pk__in=ids).update(
+            status="processing",
+            retries=Case(
+                When(status="processing", then=F("retries") + 1),
+                default=F("retries"),
+                output_field=PositiveIntegerField(),
+            ),
+            next_attempt_at=now + lease,
+            updated_at=now,
+        )
+
+    return list(
+        Notification.objects.filter(pk__in=ids)
+        .select_related("user")
+        .prefetch_related("recipient_users")
+        .order_by("-urgency", "created_at")
     )
-    # Asignar todos los destinatarios al ManyToMany
-    notification.recipient_users.set(recipients)
 
-    return notification
+
+def retention_candidates(cutoff):
+    """
+    Notificaciones que pueden retirarse de la tabla activa.
+
+    Son las creadas antes de `cutoff`, ya leídas y cuyo envío por correo ha terminado
+    (enviadas, fallidas definitivamente o sin correo). Las pendientes de envío o sin leer
+    nunca se retiran, por lo que el contador de no leídas no cambia.
+
+    Args:
+        cutoff (datetime): Fecha límite de creación.
+
+    Returns:
+        QuerySet: Notificaciones retirables.
+    """
+    return Notification.objects.filter(created_at__lt=cutoff, read_at__isnull=False).filter(
+        Q(send_email=False) | Q(status__in=["sent", "failed"])
+    )
+
+
+def archive_notifications(cutoff, batch_size, archive=True):
+    """
+    Retira de la tabla activa un lote de notificaciones antiguas.
+
+    El lote se bloquea con `SELECT ... FOR UPDATE SKIP LOCKED`, se copia a
+    `NotificationArchive` con una única inserción (si `archive` es True) y se borra, todo
+    en la misma transacción, de modo que cada lote mantiene los bloqueos poco tiempo.
+
+    Args:
+        cutoff (datetime): Fecha límite de creación (ver `retention_candidates`).
+        batch_size (int): Máximo de notificaciones del lote.
+        archive (bool, optional): Si es False las notificaciones se borran sin archivarlas.
+
+    Returns:
+        int: Número de notificaciones retiradas.
+    """
+    with transaction.atomic():
+        notifications = list(
+            retention_candidates(cutoff)
+            .select_for_update(skip_locked=True)
+            .order_by("pk")[:batch_size]
+        )
+        if not notifications:
+            return 0
+        if archive:
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive.from_notification(n) for n in notifications],
+                ignore_conflicts=True,
+            )
+        Notification.objects.filter(pk__in=[n.pk for n in notifications]).delete()
+    return len(notifications)
+
+
+def notifications_created(notifications):
+    """
+    Acciones posteriores a la creación de notificaciones, ya confirmadas en la base de datos.
+
+    Incrementa el contador de no leídas de cada usuario (un incremento por usuario,
+    no por notificación) y publica los eventos de tiempo real.
+
+    Args:
+        notifications (list): Objetos Notification creados.
+    """
+    for user_id, count in Counter(n.user_id for n in notifications).items():
+        adjust_unread_count(user_id, count)
+    publish_notifications(notifications)
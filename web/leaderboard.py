@@ -0,0 +1,563 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Case, Count, IntegerField, Q, When
+import logging
+import threading
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis es opcional en local
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "web:leaderboard"
+GLOBAL_BOARD = "mmr"
+REBUILD_CHUNK_SIZE = 2000
+
+
+MEMBER_DIGITS = 12
+
+
+def board_key(name):
+    """
+    Clave del conjunto ordenado de una clasificación.
+
+    Incluye la versión del formato de los miembros (`encode_member`): al cambiarlo, las
+    claves nuevas empiezan vacías y `ensure_leaderboard` las reconstruye.
+    """
+    return f"{KEY_PREFIX}:v2:{name}"
+
+
+def encode_member(member):
+    """
+    ID de jugador rellenado con ceros, tal como se guarda en los ZSET.
+
+    Redis desempata las puntuaciones iguales por orden lexicográfico del miembro; con
+    ceros a la izquierda ese orden coincide con el numérico ("000000000010" va antes
+    que "000000000009" en orden descendente, igual que 10 antes que 9).
+    """
+    return f"{int(member):0{MEMBER_DIGITS}d}"
+
+
+def decode_member(member):
+    """ID de jugador (como texto, sin ceros) de un miembro leído de un ZSET."""
+    return str(int(member))
+
+
+class DatabaseLeaderboard:
+    """
+    Clasificación calculada con consultas a la base de datos (`ORDER BY mmr`).
+
+    Se usa con DEBUG y en las pruebas cuando no hay Redis. No guarda nada en el proceso,
+    así que todos los procesos (web y Celery) ven el mismo orden. Es el mismo orden que
+    `RedisLeaderboard`: mayor MMR primero y, en los empates, mayor ID primero. Las
+    escrituras no hacen nada porque el MMR ya está en la base de datos.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def players(self):
+        """Jugadores que forman la clasificación, según su nombre."""
+        from .models import Match, Player
+
+        kind, _, value = self.name.partition(":")
+        players = Player.objects.all()
+        if kind == "country":
+            return players.filter(country=value)
+        if kind == "game":
+            completed = Match.objects.filter(status="completed", tournament__game_id=value)
+            return players.filter(
+                Q(team__in=completed.values("team1")) | Q(team__in=completed.values("team2"))
+            )
+        return players
+
+    def update(self, scores):
+        """No hace nada: la puntuación es el MMR guardado."""
+
+    def remove(self, *members):
+        """No hace nada: los jugadores borrados ya no aparecen en las consultas."""
+
+    def replace(self, scores):
+        """No hace nada: la clasificación siempre se calcula desde la base de datos."""
+
+    def count(self):
+        """Número de miembros."""
+        return self.players().count()
+
+    def rank(self, member):
+        """Posición (desde 0, de mayor a menor puntuación) del miembro, o None si no está."""
+        return self.ranks([member])[member]
+
+    def score(self, member):
+        """Puntuación del miembro, o None si no está."""
+        return self.players().filter(pk=member).values_list("mmr", flat=True).first()
+
+    def ranks(self, members):
+        """Posición de varios miembros ({member: posición o None}) con dos consultas."""
+        members = list(members)
+        players = self.players()
+        scores = dict(
+            players.filter(pk__in=[int(member) for member in members]).values_list("pk", "mmr")
+        )
+        # Por delante van los de más MMR y, con el mismo MMR, los de ID mayor
+        ahead = (
+            players.aggregate(
+                **{
+                    str(pk): Count("pk", filter=Q(mmr__gt=mmr) | Q(mmr=mmr, pk__gt=pk))
+                    for pk, mmr in scores.items()
+                }
+            )
+            if scores
+            else {}
+        )
+        return {member: ahead.get(str(int(member))) for member in members}
+
+    def page(self, start, stop):
+        """Pares (member, score) de las posiciones `start` a `stop` (sin incluir)."""
+        if stop <= start:
+            return []
+        rows = self.players().order_by("-mmr", "-pk").values_list("pk", "mmr")[start:stop]
+        return [(str(pk), mmr) for pk, mmr in rows]
+
+
+class RedisLeaderboard:
+    """
+    Clasificación sobre un ZSET de Redis, compartida por todos los procesos.
+
+    Consultar la posición de un miembro o una página cuesta O(log n), sin importar lo
+    lejos que esté la página del principio.
+    """
+
+    def __init__(self, name, client):
+        self.name = name
+        self._client = client
+        self._key = board_key(name)
+
+    def update(self, scores):
+        """Añade o actualiza las puntuaciones de `scores` ({member: score})."""
+        if scores:
+            self._client.zadd(
+                self._key, {encode_member(member): score for member, score in scores.items()}
+            )
+
+    def remove(self, *members):
+        """Elimina los miembros indicados."""
+        if members:
+            self._client.zrem(self._key, *[encode_member(member) for member in members])
+
+    def replace(self, scores):
+        """
+        Sustituye todo el contenido por `scores` (iterable de pares (member, score)).
+
+        Se rellena una clave temporal que después se renombra, de modo que los lectores
+        nunca ven la clasificación a medio construir.
+        """
+        tmp_key = f"{self._key}:rebuild"
+        pipe = self._client.pipeline(transaction=False)
+        pipe.delete(tmp_key)
+        chunk = {}
+        for member, score in scores:
+            chunk[encode_member(member)] = score
+            if len(chunk) >= REBUILD_CHUNK_SIZE:
+                pipe.zadd(tmp_key, chunk)
+                chunk = {}
+        if chunk:
+            pipe.zadd(tmp_key, chunk)
+        pipe.execute()
+        if self._client.exists(tmp_key):
+            self._client.rename(tmp_key, self._key)
+        else:
+            self._client.delete(self._key)
+
+    def count(self):
+        """Número de miembros."""
+        return self._client.zcard(self._key)
+
+    def rank(self, member):
+        """Posición (desde 0, de mayor a menor puntuación) del miembro, o None si no está."""
+        return self._client.zrevrank(self._key, encode_member(member))
+
+    def score(self, member):
+        """Puntuación del miembro, o None si no está."""
+        return self._client.zscore(self._key, encode_member(member))
+
+    def ranks(self, members):
+        """Posición de varios miembros ({member: posición o None}) con un único viaje a Redis."""
+        members = list(members)
+        pipe = self._client.pipeline(transaction=False)
+        for member in members:
+            pipe.zrevrank(self._key, encode_member(member))
+        return dict(zip(members, pipe.execute()))
+
+    def page(self, start, stop):
+        """Pares (member, score) de las posiciones `start` a `stop` (sin incluir)."""
+        if stop <= start:
+            return []
+        return [
+            (decode_member(member), score)
+            for member, score in self._client.zrevrange(self._key, start, stop - 1, withscores=True)
+        ]
+
+
+class RedisMemberships:
+    """Índice de clasificaciones por jugador guardado en un SET de Redis por jugador."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def _key(self, player_id):
+        return f"{KEY_PREFIX}:member:{player_id}"
+
+    def get_many(self, player_ids):
+        """Clasificaciones de cada jugador ({player_id: set(nombres)})."""
+        player_ids = list(player_ids)
+        pipe = self._client.pipeline(transaction=False)
+        for pk in player_ids:
+            pipe.smembers(self._key(pk))
+        return {
+            pk: {name.decode() for name in names} for pk, names in zip(player_ids, pipe.execute())
+        }
+
+    def set_many(self, memberships):
+        """Sustituye las clasificaciones de cada jugador ({player_id: set(nombres)})."""
+        pipe = self._client.pipeline(transaction=False)
+        for pk, names in memberships.items():
+            pipe.delete(self._key(pk))
+            if names:
+                pipe.sadd(self._key(pk), *names)
+        pipe.execute()
+
+    def delete(self, *player_ids):
+        """Olvida las clasificaciones de los jugadores indicados."""
+        if player_ids:
+            self._client.delete(*[self._key(pk) for pk in player_ids])
+
+    def clear(self):
+        """Olvida las clasificaciones de todos los jugadores."""
+        keys = list(self._client.scan_iter(match=self._key("*"), count=1000))
+        for i in range(0, len(keys), 1000):
+            self._client.delete(*keys[i : i + 1000])
+
+
+_boards = {}
+_memberships = None
+_store_lock = threading.Lock()
+_redis_client = None
+
+
+def check_leaderboard_settings():
+    """
+    Comprueba al arrancar que las clasificaciones se guardan en Redis.
+
+    Sin Redis las clasificaciones se calculan con `ORDER BY mmr ... OFFSET`, que solo es
+    aceptable en desarrollo y en las pruebas.
+
+    Raises:
+        ImproperlyConfigured: Si falta `LEADERBOARD_REDIS_URL` (o la librería redis) fuera
+                              de DEBUG y de las pruebas.
+    """
+    if settings.DEBUG or settings.TESTING:
+        return
+    if not settings.LEADERBOARD_REDIS_URL:
+        raise ImproperlyConfigured("LEADERBOARD_REDIS_URL es obligatorio en producción")
+    if redis is None:
+        raise ImproperlyConfigured("LEADERBOARD_REDIS_URL requiere la librería redis")
+
+
+def _redis():
+    """Cliente de Redis de las clasificaciones, o None si se calculan en la base de datos."""
+    global _redis_client
+    url = getattr(settings, "LEADERBOARD_REDIS_URL", "")
+    if not url or redis is None:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(url)
+    return _redis_client
+
+
+def get_leaderboard(name=GLOBAL_BOARD):
+    """
+    Obtiene una clasificación por su nombre.
+
+    Usa Redis si `settings.LEADERBOARD_REDIS_URL` está configurado y la librería está
+    instalada; en otro caso (solo con DEBUG o en las pruebas), la base de datos.
+
+    Args:
+        name (str, optional): Nombre de la clasificación (`GLOBAL_BOARD`, `game_board(...)`
+                              o `country_board(...)`). Por defecto la global por MMR.
+
+    Returns:
+        DatabaseLeaderboard | RedisLeaderboard: Clasificación compartida por el proceso.
+    """
+    with _store_lock:
+        if name not in _boards:
+            client = _redis()
+            _boards[name] = (
+                RedisLeaderboard(name, client) if client is not None else DatabaseLeaderboard(name)
+            )
+        return _boards[name]
+
+
+def get_memberships():
+    """
+    Obtiene el índice de clasificaciones por jugador.
+
+    Solo existe con Redis: sin él, `DatabaseLeaderboard` deduce de la base de datos qué
+    jugadores forman cada clasificación.
+
+    Returns:
+        RedisMemberships | None: Índice compartido por el proceso, o None sin Redis.
+    """
+    global _memberships
+    with _store_lock:
+        if _memberships is None:
+            client = _redis()
+            if client is None:
+                return None
+            _memberships = RedisMemberships(client)
+        return _memberships
+
+
+def game_board(game_id):
+    """Nombre de la clasificación de un juego."""
+    return f"game:{game_id}"
+
+
+def country_board(country):
+    """Nombre de la clasificación de un país."""
+    return f"country:{country}"
+
+
+def _sync_players(scores, countries=None, game_id=None):
+    memberships = get_memberships()
+    current = memberships.get_many(scores)
+
+    updates = defaultdict(dict)
+    removals = defaultdict(list)
+    changed = {}
+    for player_id, mmr in scores.items():
+        names = set(current[player_id])
+        new = {GLOBAL_BOARD}
+        if countries and player_id in countries:
+            # Al cambiar de país el jugador sale de la clasificación del país anterior
+            country = country_board(countries[player_id])
+            for name in {n for n in names if n.startswith("country:") and n != country}:
+                names.discard(name)
+                removals[name].append(player_id)
+            new.add(country)
+        if game_id is not None:
+            new.add(game_board(game_id))
+
+        for name in names | new:
+            updates[name][player_id] = mmr
+        if names | new != current[player_id]:
+            changed[player_id] = names | new
+
+    for name, player_ids in removals.items():
+        get_leaderboard(name).remove(*player_ids)
+    for name, board_scores in updates.items():
+        get_leaderboard(name).update(board_scores)
+    if changed:
+        memberships.set_many(changed)
+
+
+def update_player_scores(scores, countries=None, game_id=None):
+    """
+    Actualiza el MMR de varios jugadores en todas sus clasificaciones.
+
+    Cada jugador se actualiza en la clasificación global, en la de su país y en la de
+    cada juego en el que ha competido (según `get_memberships`). Si se indica `game_id`,
+    además se incorpora a la clasificación de ese juego.
+
+    Sin Redis no hace nada, porque las clasificaciones se calculan con el MMR guardado.
+    Los errores de Redis se registran y no se propagan: las clasificaciones son una copia
+    del MMR de la base de datos y `RankedPlayers` corrige las entradas desfasadas.
+
+    Args:
+        scores (dict): MMR actual de cada jugador ({player_id: mmr}).
+        countries (dict, optional): País actual de cada jugador ({player_id: país}).
+        game_id (int, optional): Juego del partido que acaba de disputarse.
+    """
+    if not scores or _redis() is None:
+        return
+    try:
+        _sync_players(scores, countries, game_id)
+    except Exception as exc:
+        logger.warning("No se pudo actualizar la clasificación: %s", exc)
+
+
+def player_ranks(player_ids, name=GLOBAL_BOARD):
+    """
+    Posición (desde 1) de varios jugadores en una clasificación, sin propagar errores de Redis.
+
+    Args:
+        player_ids (iterable): IDs de los jugadores.
+        name (str, optional): Nombre de la clasificación. Por defecto la global.
+
+    Returns:
+        dict: {player_id: posición}; los jugadores que no aparecen se omiten.
+    """
+    try:
+        ranks = get_leaderboard(name).ranks(player_ids)
+    except Exception as exc:
+        logger.warning("No se pudo consultar la clasificación: %s", exc)
+        return {}
+    return {player_id: rank + 1 for player_id, rank in ranks.items() if rank is not None}
+
+
+def remove_players(*player_ids):
+    """
+    Quita jugadores de todas sus clasificaciones sin propagar errores de Redis. Sin Redis
+    no hace nada.
+
+    Args:
+        *player_ids (int): IDs de los jugadores.
+    """
+    if _redis() is None:
+        return
+    try:
+        memberships = get_memberships()
+        boards = defaultdict(list)
+        for player_id, names in memberships.get_many(player_ids).items():
+            for name in names | {GLOBAL_BOARD}:
+                boards[name].append(player_id)
+        for name, ids in boards.items():
+            get_leaderboard(name).remove(*ids)
+        memberships.delete(*player_ids)
+    except Exception as exc:
+        logger.warning("No se pudo actualizar la clasificación: %s", exc)
+
+
+def team_games():
+    """
+    Juegos en los que ha competido cada equipo, según los partidos completados.
+
+    Returns:
+        dict: {team_id: set(game_id)}.
+    """
+    from .models import Match
+
+    games = defaultdict(set)
+    completed = Match.objects.filter(status="completed")
+    for side in ("team1_id", "team2_id"):
+        for game_id, team_id in completed.values_list("tournament__game_id", side).distinct():
+            games[team_id].add(game_id)
+    return games
+
+
+def rebuild_leaderboard():
+    """
+    Reconstruye desde la base de datos todas las clasificaciones: la global, la de cada
+    país y la de cada juego.
+
+    Un jugador entra en la clasificación de un juego si su equipo ha completado algún
+    partido de un torneo de ese juego. Sin Redis no hay nada que reconstruir.
+
+    Returns:
+        int: Número de jugadores en la clasificación global.
+    """
+    from .models import Player
+
+    if _redis() is None:
+        return get_leaderboard().count()
+
+    games_by_team = team_games()
+    boards = defaultdict(list)
+    memberships = {}
+    rows = Player.objects.values_list("pk", "mmr", "country", "team_id")
+    for player_id, mmr, country, team_id in rows.iterator(chunk_size=REBUILD_CHUNK_SIZE):
+        names = {GLOBAL_BOARD, country_board(country)}
+        names |= {game_board(game_id) for game_id in games_by_team.get(team_id, ())}
+        for name in names:
+            boards[name].append((player_id, mmr))
+        memberships[player_id] = names
+
+    # Las clasificaciones conocidas por este proceso que han quedado sin jugadores se vacían
+    with _store_lock:
+        stale = set(_boards) - set(boards)
+    for name in stale:
+        get_leaderboard(name).replace([])
+    for name, scores in boards.items():
+        get_leaderboard(name).replace(scores)
+
+    store = get_memberships()
+    store.clear()
+    store.set_many(memberships)
+    return get_leaderboard().count()
+
+
+def ensure_leaderboard(name=GLOBAL_BOARD):
+    """
+    Devuelve una clasificación, reconstruyéndolas todas si la global aún está vacía
+    (primer arranque, Redis vaciado...).
+
+    Args:
+        name (str, optional): Nombre de la clasificación. Por defecto la global.
+
+    Returns:
+        DatabaseLeaderboard | RedisLeaderboard: Clasificación pedida.
+    """
+    if not get_leaderboard().count():
+        rebuild_leaderboard()
+    return get_leaderboard(name)
+
+
+class RankedPlayers:
+    """
+    Secuencia perezosa de jugadores en el orden de la clasificación, para `Paginator`.
+
+    El total sale de la clasificación y cada página se carga con una consulta por clave
+    primaria, en lugar de `ORDER BY mmr ... OFFSET`, cuyo coste crece con cada página.
+    Los jugadores de la página se contrastan con la base de datos: si la clasificación
+    tiene un jugador que ya no existe o con un MMR desfasado, se corrige y se vuelve a
+    leer la página. Por eso `queryset` debe incluir a todos los jugadores de la clasificación.
+    """
+
+    MAX_REPAIRS = 3
+
+    def __init__(self, board, queryset):
+        self.board = board
+        self.queryset = queryset
+
+    def count(self):
+        """Número total de jugadores clasificados."""
+        return self.board.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("RankedPlayers solo admite slices")
+        start, stop = index.start or 0, index.stop
+
+        for _ in range(self.MAX_REPAIRS):
+            entries = self.board.page(start, stop)
+            ids = [int(member) for member, _ in entries]
+            current = dict(self.queryset.filter(pk__in=ids).values_list("pk", "mmr"))
+
+            stale = {
+                pk: current[pk]
+                for pk, (_, score) in zip(ids, entries)
+                if pk in current and current[pk] != score
+            }
+            missing = [pk for pk in ids if pk not in current]
+            if not stale and not missing:
+                break
+            logger.info(
+                "Clasificación desfasada: %s jugadores corregidos, %s eliminados",
+                len(stale),
+                len(missing),
+            )
+            self.board.update(stale)
+            self.board.remove(*missing)
+
+        if not ids:
+            return self.queryset.none()
+        order = Case(
+            *[When(pk=pk, then=pos) for pos, pk in enumerate(ids)], output_field=IntegerField()
+        )
+        return self.queryset.filter(pk__in=ids).order_by(order)
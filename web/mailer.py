@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+
+def get_notification_recipients(notification):
+    """
+    Obtiene los correos de destino de una notificación.
+
+    Usa los destinatarios ya precargados (`prefetch_related("recipient_users")`), por lo
+    que no lanza consultas adicionales. Si no tiene destinatarios se usa el propietario.
+
+    Args:
+        notification (Notification): Notificación a enviar.
+
+    Returns:
+        list: Correos electrónicos de destino (puede estar vacía).
+    """
+    recipients = list(notification.recipient_users.all())
+    if recipients:
+        return [user.email for user in recipients if user.email]
+    return [notification.user.email] if notification.user and notification.user.email else []
+
+
+def build_notification_email(notification, recipient_emails):
+    """
+    Construye el correo de una notificación.
+
+    Args:
+        notification (Notification): Notificación a enviar.
+        recipient_emails (list): Correos de destino.
+
+    Returns:
+        EmailMessage: Mensaje listo para enviar.
+    """
+    return EmailMessage(
+        subject=notification.title,
+        body=notification.message,
+        from_email=notification.sender_email or settings.DEFAULT_FROM_EMAIL,
+        to=recipient_emails,
+    )
+
+
+def retry_delay(retries):
+    """
+    Calcula la espera antes del siguiente intento de envío de una notificación.
+
+    La espera crece de forma exponencial con el número de reintentos, hasta
+    `settings.NOTIFICATION_RETRY_MAX_SECONDS`, y se le aplica un factor aleatorio
+    (jitter) para que las notificaciones que fallaron juntas no se reintenten a la vez.
+
+    Args:
+        retries (int): Número de reintentos ya realizados (1 tras el primer fallo).
+
+    Returns:
+        timedelta: Tiempo a esperar antes del siguiente intento.
+    """
+    delay = min(
+        settings.NOTIFICATION_RETRY_MAX_SECONDS,
+        settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** max(retries - 1, 0),
+    )
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def _send_chunk(chunk):
+    """
+    Envía un grupo de mensajes reutilizando una única conexión SMTP.
+
+    Cada mensaje se envía por separado sobre la misma conexión para conocer el
+    resultado individual: un fallo solo afecta a su notificación.
+
+    Args:
+        chunk (list): Tuplas (notification, EmailMessage).
+
+    Returns:
+        list: Tuplas (notification, bool) con el resultado de cada envío.
+    """
+    results = []
+    try:
+        with get_connection() as connection:
+            for notification, email in chunk:
+                try:
+                    results.append((notification, bool(connection.send_messages([email]))))
+                except Exception as exc:
+                    logger.warning("Error enviando la notificación %s: %s", notification.pk, exc)
+                    results.append((notification, False))
+    except Exception as exc:
+        # No se pudo abrir la conexión: todo el grupo queda pendiente de reintento
+        logger.warning("No se pudo abrir la conexión SMTP: %s", exc)
+        done = {notification.pk for notification, _ in results}
+        results += [
+            (notification, False) for notification, _ in chunk if notification.pk not in done
+        ]
+    return results
+
+
+def send_notification_emails(messages, concurrency=None):
+    """
+    Envía en paralelo los correos de varias notificaciones.
+
+    Los mensajes se reparten en `concurrency` grupos y cada grupo se envía desde un
+    hilo con su propia conexión SMTP, de modo que el coste de establecer la conexión
+    se paga una vez por grupo y no una vez por notificación.
+
+    Args:
+        messages (list): Tuplas (notification, EmailMessage).
+        concurrency (int, optional): Número de conexiones simultáneas. Por defecto
+                                     `settings.NOTIFICATION_SEND_CONCURRENCY`.
+
+    Returns:
+        list: Tuplas (notification, bool) con el resultado de cada envío.
+    """
+    if not messages:
+        return []
+
+    concurrency = max(1, min(concurrency or settings.NOTIFICATION_SEND_CONCURRENCY, len(messages)))
+    if concurrency == 1:
+        return _send_chunk(messages)
+
+    chunks = [messages[i::concurrency] for i in range(concurrency)]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return [result for chunk in executor.map(_send_chunk, chunks) for result in chunk]
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from web.leaderboard import rebuild_leaderboard
+from web.rating import RATING_ENGINES, RECOMPUTE_CHUNK_SIZE, recompute_ratings
+import time
+
+
+class Command(BaseCommand):
+    """
+    Recalcula las estadísticas de todos los jugadores reproduciendo el historial de
+    resultados, por ejemplo tras cambiar las reglas o el motor de valoración.
+
+    Uso:
+        python manage.py replay_ratings [--engine elo] [--renombre] [--chunk-size 2000]
+    """
+
+    help = (
+        "Recalcula MMR, partidas jugadas, partidas ganadas y winrate de todos los jugadores "
+        "a partir del historial de resultados y reconstruye las clasificaciones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--engine",
+            choices=sorted(RATING_ENGINES),
+            help="Motor de valoración. Por defecto settings.RATING_ENGINE.",
+        )
+        parser.add_argument(
+            "--renombre",
+            action="store_true",
+            help=(
+                "Recalcula también el renombre con las reglas de los partidos. Se pierden "
+                "los cambios de renombre que no vienen de partidos (reportes, administración)."
+            ),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=RECOMPUTE_CHUNK_SIZE,
+            help="Filas leídas y escritas por lote.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size debe ser mayor que 0")
+
+        started = time.monotonic()
+        applied = recompute_ratings(
+            engine=options["engine"],
+            renombre=options["renombre"],
+            chunk_size=options["chunk_size"],
+        )
+        players = rebuild_leaderboard()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{applied} resultados aplicados a {players} jugadores "
+                f"en {time.monotonic() - started:.1f} s"
+            )
+        )
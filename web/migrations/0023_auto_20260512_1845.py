@@ -11,8 +11,6 @@ from django_celery_beat.models import PeriodicTask, IntervalSchedule
 
 import json
 
-from web.functions import update_winrate
-
 
 def eliminar_datos(apps, schema_editor):
     # Obtener los modelos de la aplicación 'web'
@@ -213,7 +211,10 @@ def poblar_datos(apps, schema_editor):
     players[27].save()
 
     for player in players:
-        update_winrate(player)
+        if player.games_played > 0:
+            player.winrate = (player.games_won / player.games_played) * 100
+        else:
+            player.winrate = 0.0
         player.save()
 
     for team in teams:
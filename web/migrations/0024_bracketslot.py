@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0023_auto_20260512_1845"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BracketSlot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("round", models.IntegerField()),
+                ("position", models.IntegerField()),
+                (
+                    "match",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="bracket_slot",
+                        to="web.match",
+                    ),
+                ),
+                (
+                    "next_slot",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="previous_slots",
+                        to="web.bracketslot",
+                    ),
+                ),
+                (
+                    "team1",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="web.team",
+                    ),
+                ),
+                (
+                    "team2",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="web.team",
+                    ),
+                ),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="web.tournament"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["round", "position"],
+                "unique_together": {("tournament", "round", "position")},
+            },
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import json
+
+RETENTION_TASK_NAME = "Archivar notificaciones antiguas cada día"
+
+
+def crear_tarea_retencion(apps, schema_editor):
+    """Programa la tarea de retención de notificaciones una vez al día."""
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+
+    schedule, _ = IntervalSchedule.objects.get_or_create(every=1, period="days")
+    PeriodicTask.objects.get_or_create(
+        name=RETENTION_TASK_NAME,
+        defaults={
+            "interval": schedule,
+            "task": "web.tasks.archive_old_notifications",
+            "args": json.dumps([]),
+        },
+    )
+
+
+def eliminar_tarea_retencion(apps, schema_editor):
+    """Elimina la tarea de retención de notificaciones."""
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(name=RETENTION_TASK_NAME).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0026_notification_user_indexes"),
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("notification_id", models.PositiveBigIntegerField(unique=True)),
+                (
+                    "urgency",
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, "Low"), (2, "Normal"), (3, "High"), (4, "Critical")]
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("message", models.TextField()),
+                ("send_email", models.BooleanField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("sent", "Sent"),
+                            ("failed", "Failed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("retries", models.PositiveIntegerField(default=0)),
+                ("email_sent_at", models.DateTimeField(blank=True, null=True)),
+                ("tournament_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("match_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField()),
+                ("read_at", models.DateTimeField(blank=True, null=True)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_notifications",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-created_at"], name="web_notific_user_id_323088_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(crear_tarea_retencion, reverse_code=eliminar_tarea_retencion),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+import json
+
+COMPACTION_TASK_NAME = "Compactar historial de MMR cada día"
+
+
+def crear_tarea_compactacion(apps, schema_editor):
+    """Programa la compactación del historial de MMR una vez al día."""
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+
+    schedule, _ = IntervalSchedule.objects.get_or_create(every=1, period="days")
+    PeriodicTask.objects.get_or_create(
+        name=COMPACTION_TASK_NAME,
+        defaults={
+            "interval": schedule,
+            "task": "web.tasks.compact_rating_history",
+            "args": json.dumps([]),
+        },
+    )
+
+
+def eliminar_tarea_compactacion(apps, schema_editor):
+    """Elimina la tarea de compactación del historial de MMR."""
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(name=COMPACTION_TASK_NAME).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0027_notificationarchive"),
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RatingHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("mmr", models.IntegerField()),
+                ("rank", models.PositiveIntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "match",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="web.match",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rating_history",
+                        to="web.player",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["created_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["player", "created_at"], name="web_ratingh_player__e7147e_idx"
+                    ),
+                    models.Index(fields=["created_at"], name="web_ratingh_created_8dc89f_idx"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RatingSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("mmr_open", models.IntegerField()),
+                ("mmr_close", models.IntegerField()),
+                ("mmr_min", models.IntegerField()),
+                ("mmr_max", models.IntegerField()),
+                ("rank", models.PositiveIntegerField(blank=True, null=True)),
+                ("matches", models.PositiveIntegerField(default=0)),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rating_snapshots",
+                        to="web.player",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "unique_together": {("player", "date")},
+            },
+        ),
+        migrations.RunPython(crear_tarea_compactacion, reverse_code=eliminar_tarea_compactacion),
+    ]
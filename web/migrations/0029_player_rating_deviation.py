@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0028_rating_history"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="rating_deviation",
+            field=models.FloatField(default=350.0),
+        ),
+        migrations.AddField(
+            model_name="player",
+            name="rating_volatility",
+            field=models.FloatField(default=0.06),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0029_player_rating_deviation"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="matchlog",
+            index=models.Index(
+                fields=["match", "created_at", "id"], name="web_matchlo_match_i_6f553c_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0030_matchlog_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="matchlog",
+            name="event_type",
+            field=models.CharField(
+                choices=[
+                    ("custom", "Custom"),
+                    ("round_created", "Round created"),
+                    ("match_started", "Match started"),
+                    ("result_confirmed", "Result confirmed"),
+                    ("match_completed", "Match completed"),
+                    ("forfeit", "Forfeit"),
+                    ("renombre", "Renombre"),
+                ],
+                default="custom",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="matchlog",
+            name="payload",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name="matchlog",
+            name="event",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddIndex(
+            model_name="matchlog",
+            index=models.Index(
+                fields=["event_type", "created_at"], name="web_matchlo_event_t_c80d2f_idx"
+            ),
+        ),
+    ]
@@ -7,6 +7,7 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Coalesce
 
 
 class Game(models.Model):
@@ -31,6 +32,78 @@ class Game(models.Model):
         return self.name
 
 
+# Máximo de equipos de un cuadro de eliminatorias (potencia de dos)
+MAX_BRACKET_TEAMS = 256
+
+# Desviación y volatilidad iniciales de la valoración de un jugador (Glicko-2)
+DEFAULT_RATING_DEVIATION = 350.0
+DEFAULT_RATING_VOLATILITY = 0.06
+
+
+class TournamentQuerySet(models.QuerySet):
+    """QuerySet de torneos con utilidades de agregación del progreso."""
+
+    def with_progress(self):
+        """
+        Anota cada torneo con sus contadores de progreso en una sola consulta agrupada.
+
+        Anotaciones añadidas:
+            total_matches: Número total de partidos generados
+            ongoing_matches: Partidos en curso
+            completed_matches: Partidos completados
+            registered_teams: Equipos inscritos
+            registered_players: Jugadores de los equipos inscritos
+
+        Returns:
+            QuerySet: Torneos anotados, encadenable con filtros adicionales
+        """
+        registered_teams = (
+            TournamentTeam.objects.filter(tournament=models.OuterRef("pk"))
+            .order_by()
+            .values("tournament")
+            .annotate(total=models.Count("id"))
+            .values("total")
+        )
+        registered_players = (
+            Player.objects.filter(team__tournamentteam__tournament=models.OuterRef("pk"))
+            .order_by()
+            .values("team__tournamentteam__tournament")
+            .annotate(total=models.Count("id", distinct=True))
+            .values("total")
+        )
+        return self.annotate(
+            total_matches=models.Count("match"),
+            ongoing_matches=models.Count("match", filter=models.Q(match__status="ongoing")),
+            completed_matches=models.Count("match", filter=models.Q(match__status="completed")),
+            registered_teams=Coalesce(
+                models.Subquery(registered_teams, output_field=models.IntegerField()), 0
+            ),
+            registered_players=Coalesce(
+                models.Subquery(registered_players, output_field=models.IntegerField()), 0
+            ),
+        )
+
+    def progress(self):
+        """
+        Devuelve los contadores de progreso de los torneos del QuerySet.
+
+        Returns:
+            dict: {tournament_id: {"total_matches", "ongoing_matches", "completed_matches",
+                   "registered_teams", "registered_players"}}
+        """
+        fields = [
+            "total_matches",
+            "ongoing_matches",
+            "completed_matches",
+            "registered_teams",
+            "registered_players",
+        ]
+        return {
+            row["pk"]: {field: row[field] for field in fields}
+            for row in self.with_progress().values("pk", *fields)
+        }
+
+
 class Tournament(models.Model):
     """
     Modelo que representa un torneo de videojuegos en el sistema.
@@ -65,6 +138,8 @@ class Tournament(models.Model):
     matches_generated = models.BooleanField(default=False)
     winner = models.ForeignKey("Team", on_delete=models.SET_NULL, null=True, blank=True)
 
+    objects = TournamentQuerySet.as_manager()
+
     def __str__(self):
         """Representación legible del torneo (nombre + estado)"""
         return f"{self.name} ({self.get_status_display()})"
@@ -73,9 +148,15 @@ class Tournament(models.Model):
         """
         Calcula el número total de jugadores registrados en el torneo.
 
+        Si el torneo se obtuvo con `Tournament.objects.with_progress()` se reutiliza
+        el valor ya anotado en lugar de lanzar una consulta nueva.
+
         Returns:
             int: Cantidad de jugadores únicos registrados
         """
+        if hasattr(self, "registered_players"):
+            return self.registered_players
+
         from django.db.models import Count
 
         return (
@@ -115,15 +196,16 @@ class Tournament(models.Model):
     def clean(self):
         """
         Validaciones adicionales del modelo:
-        - Verifica que max_teams sea 2, 4 u 8
+        - Verifica que max_teams esté entre 2 y MAX_BRACKET_TEAMS (los números que no
+          son potencia de dos se completan con pases directos en la primera ronda)
         - Comprueba que start_date no sea en el pasado
         """
         super().clean()
 
-        if self.max_teams not in {2, 4, 8}:
+        if not 2 <= self.max_teams <= MAX_BRACKET_TEAMS:
             raise ValidationError(
                 {
-                    "max_teams": "El número de equipos debe ser (2, 4 u 8) para el formato de eliminatorias."
+                    "max_teams": f"El número de equipos debe estar entre 2 y {MAX_BRACKET_TEAMS} para el formato de eliminatorias."
                 }
             )
 
@@ -180,6 +262,8 @@ class Player(models.Model):
         coins: Monedas virtuales del jugador
         renombre: Puntuación de reputación (1-100)
         mmr: Match Making Rating (valor mínimo 10)
+        rating_deviation: Incertidumbre del MMR (desviación de Glicko-2)
+        rating_volatility: Volatilidad del MMR (Glicko-2)
         games_played: Total de partidas jugadas
         games_won: Total de partidas ganadas
         winrate: Porcentaje de victorias
@@ -224,6 +308,8 @@ class Player(models.Model):
         default=50, validators=[MinValueValidator(1), MaxValueValidator(100)]
     )
     mmr = models.IntegerField(default=50, validators=[MinValueValidator(10)])
+    rating_deviation = models.FloatField(default=DEFAULT_RATING_DEVIATION)
+    rating_volatility = models.FloatField(default=DEFAULT_RATING_VOLATILITY)
 
     games_played = models.IntegerField(default=0)
     games_won = models.IntegerField(default=0)
@@ -298,6 +384,53 @@ class Match(models.Model):
         return f"Partido {self.round}: {self.team1.name} vs {self.team2.name} - {self.get_status_display()}"
 
 
+class BracketSlot(models.Model):
+    """Modelo que representa una casilla del cuadro de eliminatorias de un torneo.
+
+    El cuadro completo se genera al comenzar el torneo: cada casilla es un partido
+    (jugado o por jugar) y apunta a la casilla de la ronda siguiente a la que pasa su
+    ganador, de modo que avanzar el cuadro no requiere reconstruir la ronda.
+
+    Atributos:
+        tournament (ForeignKey): Torneo al que pertenece la casilla
+        round (IntegerField): Ronda de la casilla (1 es la primera ronda)
+        position (IntegerField): Posición de la casilla dentro de la ronda
+        team1 (ForeignKey): Primer equipo (vacío hasta que se conozca)
+        team2 (ForeignKey): Segundo equipo (vacío hasta que se conozca o si es un pase directo)
+        match (OneToOneField): Partido creado cuando ambos equipos se conocen
+        next_slot (ForeignKey): Casilla a la que pasa el ganador (vacía en la final)
+    """
+
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE)
+    round = models.IntegerField()
+    position = models.IntegerField()
+    team1 = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    team2 = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    match = models.OneToOneField(
+        Match, on_delete=models.SET_NULL, null=True, blank=True, related_name="bracket_slot"
+    )
+    next_slot = models.ForeignKey(
+        "self", on_delete=models.CASCADE, null=True, blank=True, related_name="previous_slots"
+    )
+
+    class Meta:
+        unique_together = ("tournament", "round", "position")
+        ordering = ["round", "position"]
+
+    def __str__(self):
+        """Representación: 'Casilla [ronda]-[posición] de [torneo]'"""
+        return f"Casilla {self.round}-{self.position} de {self.tournament.name}"
+
+    @property
+    def next_side(self):
+        """Campo de la casilla siguiente que ocupa el ganador ('team1' o 'team2')."""
+        return "team1" if self.position % 2 == 0 else "team2"
+
+
 class MatchResult(models.Model):
     """Modelo que almacena los resultados de un partido.
 
@@ -323,25 +456,165 @@ class MatchResult(models.Model):
 class MatchLog(models.Model):
     """Modelo que registra eventos ocurridos durante una partida.
 
+    Cada evento se guarda como un tipo (`event_type`) y unos pocos datos (`payload`:
+    marcador, IDs de equipos, cantidades), y su texto se genera al mostrarlo (`text`).
+    Los eventos libres (CUSTOM) y los registros anteriores guardan el texto en `event`.
+
     Atributos:
         match (ForeignKey): Partida asociada al evento
         team (ForeignKey): Equipo relacionado (opcional)
         player (ForeignKey): Jugador relacionado (opcional)
-        event (TextField): Descripción del evento registrado
+        event_type (CharField): Tipo de evento
+        payload (JSONField): Datos del evento usados para generar su texto
+        event (TextField): Descripción libre del evento (solo eventos CUSTOM)
         created_at (DateTimeField): Fecha de creación del registro
     """
 
+    CUSTOM = "custom"
+    ROUND_CREATED = "round_created"
+    MATCH_STARTED = "match_started"
+    RESULT_CONFIRMED = "result_confirmed"
+    MATCH_COMPLETED = "match_completed"
+    FORFEIT = "forfeit"
+    RENOMBRE = "renombre"
+
+    EVENT_TYPE_CHOICES = [
+        (CUSTOM, "Custom"),
+        (ROUND_CREATED, "Round created"),
+        (MATCH_STARTED, "Match started"),
+        (RESULT_CONFIRMED, "Result confirmed"),
+        (MATCH_COMPLETED, "Match completed"),
+        (FORFEIT, "Forfeit"),
+        (RENOMBRE, "Renombre"),
+    ]
+
+    # Plantillas del texto de cada tipo de evento (ver `text`)
+    EVENT_MESSAGES = {
+        ROUND_CREATED: "Ronda {round} creada",
+        MATCH_STARTED: "Ambos equipos listos. El partido ha comenzado.",
+        RESULT_CONFIRMED: (
+            "Equipo {slot} ({team}) ha confirmado el resultado. ({team1_score} - {team2_score})"
+        ),
+        MATCH_COMPLETED: (
+            "El partido ha sido completado. Ganador: {winner}. ({team1_score} - {team2_score})"
+        ),
+        FORFEIT: "Partido finalizado automáticamente. Ganador: {winner} ({reason}).",
+        RENOMBRE: "Renombre {action} en {amount} por: {reason}",
+    }
+
     match = models.ForeignKey(Match, on_delete=models.CASCADE)
     team = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, blank=True, default=None)
     player = models.ForeignKey(
         Player, on_delete=models.SET_NULL, null=True, blank=True, default=None
     )
-    event = models.TextField()
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES, default=CUSTOM)
+    payload = models.JSONField(default=dict, blank=True)
+    event = models.TextField(blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Paginación por cursor del visor de logs de un torneo
+            models.Index(fields=["match", "created_at", "id"]),
+            # Consultas por tipo de evento (por ejemplo, todas las incomparecencias)
+            models.Index(fields=["event_type", "created_at"]),
+        ]
+
     def __str__(self):
         """Representación: 'Log [partida]: - [evento]'"""
-        return f"Log {self.match}: - {self.event}"
+        return f"Log {self.match}: - {self.text}"
+
+    def _team_name(self, team_id):
+        """Nombre de uno de los equipos del partido, sin consultas si el partido ya está cargado."""
+        return self.match.team1.name if team_id == self.match.team1_id else self.match.team2.name
+
+    @property
+    def text(self):
+        """Texto del evento, generado a partir de su tipo y sus datos."""
+        if self.event_type not in self.EVENT_MESSAGES:
+            return self.event
+
+        context = dict(self.payload)
+        if self.event_type == self.RESULT_CONFIRMED:
+            context["slot"] = 1 if self.team_id == self.match.team1_id else 2
+            context["team"] = self._team_name(self.team_id)
+        elif self.event_type in (self.MATCH_COMPLETED, self.FORFEIT):
+            context["winner"] = self._team_name(context["winner_id"])
+        if self.event_type == self.FORFEIT:
+            absent = context.get("absent", [])
+            context["reason"] = (
+                f"{self._team_name(absent[0])} no se ha presentado"
+                if len(absent) == 1
+                else "ningún equipo estaba listo, ganador aleatorio"
+            )
+        elif self.event_type == self.RENOMBRE:
+            context["action"] = "incrementado" if context["amount"] >= 0 else "reducido"
+            context["amount"] = abs(context["amount"])
+        return self.EVENT_MESSAGES[self.event_type].format(**context)
+
+
+class RatingHistory(models.Model):
+    """Modelo que registra, de forma acumulativa, el MMR y la posición de un jugador tras cada partido.
+
+    Las filas solo se insertan (en bloque, tras confirmarse `update_matches_stats`); la tarea
+    `compact_rating_history` las resume por día en RatingSnapshot y borra las antiguas.
+
+    Atributos:
+        player (ForeignKey): Jugador
+        match (ForeignKey): Partido que produjo el cambio (opcional)
+        mmr (IntegerField): MMR tras el partido
+        rank (PositiveIntegerField): Posición en la clasificación global tras el partido (desde 1)
+        created_at (DateTimeField): Fecha del cambio
+    """
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="rating_history")
+    match = models.ForeignKey(Match, on_delete=models.SET_NULL, null=True, blank=True)
+    mmr = models.IntegerField()
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["player", "created_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self):
+        """Representación: '[jugador]: [mmr] MMR (#[posición])'"""
+        return f"{self.player.user.username}: {self.mmr} MMR (#{self.rank})"
+
+
+class RatingSnapshot(models.Model):
+    """Modelo que resume por día la evolución del MMR y la posición de un jugador.
+
+    Atributos:
+        player (ForeignKey): Jugador
+        date (DateField): Día resumido
+        mmr_open (IntegerField): MMR tras el primer partido del día
+        mmr_close (IntegerField): MMR tras el último partido del día
+        mmr_min (IntegerField): MMR mínimo del día
+        mmr_max (IntegerField): MMR máximo del día
+        rank (PositiveIntegerField): Posición tras el último partido del día
+        matches (PositiveIntegerField): Partidos disputados en el día
+    """
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="rating_snapshots")
+    date = models.DateField()
+    mmr_open = models.IntegerField()
+    mmr_close = models.IntegerField()
+    mmr_min = models.IntegerField()
+    mmr_max = models.IntegerField()
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    matches = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["date"]
+        unique_together = ("player", "date")
+
+    def __str__(self):
+        """Representación: '[jugador] [día]: [mmr] MMR'"""
+        return f"{self.player.user.username} {self.date}: {self.mmr_close} MMR"
 
 
 class Reward(models.Model):
@@ -407,6 +680,7 @@ class Notification(models.Model):
         retries (PositiveIntegerField): Número de reintentos realizados
         max_retries (PositiveIntegerField): Máximo número de reintentos permitidos
         email_sent_at (DateTimeField): Fecha y hora de envío del correo
+        next_attempt_at (DateTimeField): Fecha a partir de la cual se puede (re)intentar el envío
         tournament (ForeignKey): Torneo relacionado con la notificación
         match (ForeignKey): Partido relacionado con la notificación
         created_at (DateTimeField): Fecha de creación automática
@@ -462,6 +736,7 @@ class Notification(models.Model):
     max_retries = models.PositiveIntegerField(default=3)
 
     email_sent_at = models.DateTimeField(null=True, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
 
     tournament = models.ForeignKey(
         Tournament,
@@ -487,6 +762,9 @@ class Notification(models.Model):
             models.Index(fields=["status"]),
             models.Index(fields=["urgency"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["status", "next_attempt_at"]),
+            models.Index(fields=["user", "-created_at"]),
+            models.Index(fields=["user", "read_at"]),
         ]
 
     def __str__(self):
@@ -497,3 +775,77 @@ class Notification(models.Model):
     def is_read(self):
         """Indica si la notificación ya fue leída."""
         return self.read_at is not None
+
+
+class NotificationArchive(models.Model):
+    """Modelo que conserva las notificaciones antiguas retiradas de la tabla Notification.
+
+    Las filas se mueven aquí desde la tarea `archive_old_notifications` para que la tabla
+    de notificaciones activas se mantenga pequeña.
+
+    Atributos:
+        notification_id (PositiveBigIntegerField): ID original de la notificación
+        user (ForeignKey): Usuario propietario de la notificación
+        urgency (PositiveSmallIntegerField): Nivel de urgencia de la notificación
+        title (CharField): Título de la notificación
+        message (TextField): Contenido del mensaje
+        send_email (BooleanField): Indica si debía enviarse por correo electrónico
+        status (CharField): Estado final del envío
+        retries (PositiveIntegerField): Número de reintentos realizados
+        email_sent_at (DateTimeField): Fecha y hora de envío del correo
+        tournament_id (PositiveBigIntegerField): ID del torneo relacionado, si lo había
+        match_id (PositiveBigIntegerField): ID del partido relacionado, si lo había
+        created_at (DateTimeField): Fecha de creación de la notificación original
+        read_at (DateTimeField): Fecha en la que la notificación fue leída
+        archived_at (DateTimeField): Fecha de archivado
+    """
+
+    notification_id = models.PositiveBigIntegerField(unique=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+    )
+    urgency = models.PositiveSmallIntegerField(choices=Notification.URGENCY_CHOICES)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    send_email = models.BooleanField()
+    status = models.CharField(max_length=20, choices=Notification.STATUS_CHOICES)
+    retries = models.PositiveIntegerField(default=0)
+    email_sent_at = models.DateTimeField(null=True, blank=True)
+    # Se guardan los IDs y no claves foráneas: el archivo no debe impedir ni depender
+    # del borrado de torneos y partidos antiguos
+    tournament_id = models.PositiveBigIntegerField(null=True, blank=True)
+    match_id = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"]),
+        ]
+
+    def __str__(self):
+        """Representación: '[usuario] - [título] (archivada)'"""
+        return f"{self.user.username} - {self.title} (archivada)"
+
+    @classmethod
+    def from_notification(cls, notification):
+        """Crea (sin guardar) la copia archivada de una notificación."""
+        return cls(
+            notification_id=notification.pk,
+            user_id=notification.user_id,
+            urgency=notification.urgency,
+            title=notification.title,
+            message=notification.message,
+            send_email=notification.send_email,
+            status=notification.status,
+            retries=notification.retries,
+            email_sent_at=notification.email_sent_at,
+            tournament_id=notification.tournament_id,
+            match_id=notification.match_id,
+            created_at=notification.created_at,
+            read_at=notification.read_at,
+        )
@@ -0,0 +1,350 @@
+from collections import namedtuple
+from django.conf import settings
+from django.db import transaction
+from itertools import islice
+import math
+import numpy as np
+from .models import DEFAULT_RATING_DEVIATION, DEFAULT_RATING_VOLATILITY, MatchResult, Player
+
+# Valor mínimo del MMR (ver el validador de Player.mmr)
+MIN_MMR = 10
+
+# Desviación mínima de Glicko-2: evita que la valoración de un jugador quede congelada
+MIN_DEVIATION = 30.0
+
+# Conversión entre la escala de MMR y la escala interna de Glicko-2
+GLICKO_SCALE = 173.7178
+GLICKO_EPSILON = 1e-6
+GLICKO_MAX_ITERATIONS = 100
+
+# Filas procesadas por lote en el recálculo completo
+RECOMPUTE_CHUNK_SIZE = 2000
+
+Ratings = namedtuple("Ratings", ["mmr", "deviation", "volatility"])
+Ratings.__doc__ = """
+Valoraciones de una plantilla como arrays de NumPy (un elemento por jugador).
+
+Atributos:
+    mmr (ndarray): Valoración de cada jugador, en la escala del MMR
+    deviation (ndarray): Desviación de la valoración (RD de Glicko), en la escala del MMR
+    volatility (ndarray): Volatilidad de la valoración (σ de Glicko-2)
+"""
+
+
+def roster_ratings(players):
+    """
+    Convierte una plantilla de jugadores en arrays de valoraciones.
+
+    Args:
+        players (list): Objetos Player, o tuplas (mmr, deviation, volatility).
+
+    Returns:
+        Ratings: Valoraciones de la plantilla.
+    """
+    values = [
+        (p.mmr, p.rating_deviation, p.rating_volatility) if isinstance(p, Player) else p
+        for p in players
+    ]
+    mmr, deviation, volatility = np.array(values, dtype=float).reshape(-1, 3).T
+    return Ratings(mmr, deviation, volatility)
+
+
+def _clamp_mmr(mmr):
+    """Redondea el MMR y aplica el mínimo permitido."""
+    return np.maximum(np.rint(mmr), MIN_MMR)
+
+
+def rate_fixed(winners, losers):
+    """
+    Cambios fijos: los ganadores suman 10 de MMR y los perdedores restan 5, sin bajar
+    nunca de MIN_MMR. No tiene en cuenta la fuerza del rival.
+
+    Args:
+        winners (Ratings): Valoraciones del equipo ganador.
+        losers (Ratings): Valoraciones del equipo perdedor.
+
+    Returns:
+        tuple: Nuevas valoraciones (Ratings) de ganadores y perdedores.
+    """
+    return (
+        winners._replace(mmr=_clamp_mmr(winners.mmr + 10)),
+        losers._replace(mmr=_clamp_mmr(losers.mmr - 5)),
+    )
+
+
+def _elo_update(team, opponents, score, k_factor):
+    # Puntuación esperada de cada jugador frente al MMR medio del equipo rival
+    expected = 1.0 / (1.0 + 10.0 ** ((opponents.mmr.mean() - team.mmr) / 400.0))
+    return team._replace(mmr=_clamp_mmr(team.mmr + k_factor * (score - expected)))
+
+
+def rate_elo(winners, losers):
+    """
+    Elo por equipos: cada jugador se compara con el MMR medio del equipo rival y su MMR
+    cambia en `settings.RATING_ELO_K_FACTOR` veces la diferencia entre el resultado y la
+    puntuación esperada. Ganar a un rival más fuerte suma más que ganar a uno más débil.
+
+    Args:
+        winners (Ratings): Valoraciones del equipo ganador.
+        losers (Ratings): Valoraciones del equipo perdedor.
+
+    Returns:
+        tuple: Nuevas valoraciones (Ratings) de ganadores y perdedores.
+    """
+    k_factor = settings.RATING_ELO_K_FACTOR
+    return (
+        _elo_update(winners, losers, 1.0, k_factor),
+        _elo_update(losers, winners, 0.0, k_factor),
+    )
+
+
+def _glicko2_volatility(delta, phi, v, sigma, tau):
+    """
+    Nueva volatilidad de Glicko-2 (paso 5 del algoritmo, método de Illinois), calculada a
+    la vez para todos los jugadores de la plantilla.
+    """
+    a = np.log(sigma**2)
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (delta**2 - phi**2 - v - ex) / (2.0 * (phi**2 + v + ex) ** 2) - (x - a) / tau**2
+
+    A = a.copy()
+    big = delta**2 > phi**2 + v
+    B = np.where(big, np.log(np.maximum(delta**2 - phi**2 - v, GLICKO_EPSILON)), a - tau)
+    pending = ~big & (f(B) < 0)
+    for _ in range(GLICKO_MAX_ITERATIONS):
+        if not pending.any():
+            break
+        B = np.where(pending, B - tau, B)
+        pending &= f(B) < 0
+
+    fA, fB = f(A), f(B)
+    for _ in range(GLICKO_MAX_ITERATIONS):
+        active = np.abs(B - A) > GLICKO_EPSILON
+        if not active.any():
+            break
+        C = A + (A - B) * fA / np.where(active, fB - fA, 1.0)
+        fC = f(C)
+        swap = active & (fC * fB <= 0)
+        halve = active & ~swap
+        A = np.where(swap, B, A)
+        fA = np.where(swap, fB, np.where(halve, fA / 2.0, fA))
+        B = np.where(active, C, B)
+        fB = np.where(active, fC, fB)
+
+    return np.exp(A / 2.0)
+
+
+def _glicko2_update(team, opponents, score, tau):
+    mu = team.mmr / GLICKO_SCALE
+    phi = team.deviation / GLICKO_SCALE
+
+    # El equipo rival actúa como un único oponente: su valoración media y su desviación
+    # cuadrática media
+    mu_j = opponents.mmr.mean() / GLICKO_SCALE
+    phi_j = math.sqrt(np.mean(opponents.deviation**2)) / GLICKO_SCALE
+
+    g = 1.0 / math.sqrt(1.0 + 3.0 * phi_j**2 / math.pi**2)
+    expected = 1.0 / (1.0 + np.exp(-g * (mu - mu_j)))
+    v = 1.0 / (g**2 * expected * (1.0 - expected))
+    delta = v * g * (score - expected)
+
+    sigma = _glicko2_volatility(delta, phi, v, team.volatility, tau)
+    phi_star = np.sqrt(phi**2 + sigma**2)
+    phi_new = 1.0 / np.sqrt(1.0 / phi_star**2 + 1.0 / v)
+    mu_new = mu + phi_new**2 * g * (score - expected)
+
+    return Ratings(
+        _clamp_mmr(mu_new * GLICKO_SCALE),
+        np.clip(phi_new * GLICKO_SCALE, MIN_DEVIATION, DEFAULT_RATING_DEVIATION),
+        sigma,
+    )
+
+
+def rate_glicko2(winners, losers):
+    """
+    Glicko-2 por equipos: además del MMR, cada jugador tiene una desviación (incertidumbre
+    de su valoración) y una volatilidad. Los jugadores con poca historia (desviación alta)
+    se mueven más deprisa hacia su nivel real, y los asentados cambian menos.
+
+    Cada partido es un periodo de valoración en el que el equipo rival cuenta como un
+    único oponente. `settings.RATING_GLICKO_TAU` limita el cambio de la volatilidad.
+
+    Args:
+        winners (Ratings): Valoraciones del equipo ganador.
+        losers (Ratings): Valoraciones del equipo perdedor.
+
+    Returns:
+        tuple: Nuevas valoraciones (Ratings) de ganadores y perdedores.
+    """
+    tau = settings.RATING_GLICKO_TAU
+    return (
+        _glicko2_update(winners, losers, 1.0, tau),
+        _glicko2_update(losers, winners, 0.0, tau),
+    )
+
+
+RATING_ENGINES = {
+    "fixed": rate_fixed,
+    "elo": rate_elo,
+    "glicko2": rate_glicko2,
+}
+
+
+def get_rating_engine(name=None):
+    """
+    Obtiene un motor de valoración por su nombre.
+
+    Args:
+        name (str, optional): Clave de `RATING_ENGINES`. Por defecto `settings.RATING_ENGINE`.
+
+    Returns:
+        callable: Función (winners, losers) -> (winners, losers) sobre Ratings.
+
+    Raises:
+        ValueError: Si el motor no existe.
+    """
+    name = name or settings.RATING_ENGINE
+    if name not in RATING_ENGINES:
+        raise ValueError(f"Motor de valoración desconocido: {name}")
+    return RATING_ENGINES[name]
+
+
+def rate_match(winners, losers, engine=None):
+    """
+    Calcula las nuevas valoraciones de las plantillas de un partido.
+
+    Si alguna plantilla está vacía no hay rival con el que comparar y se aplican los
+    cambios fijos (`rate_fixed`).
+
+    Args:
+        winners (list): Jugadores del equipo ganador (Player o tuplas de valoraciones).
+        losers (list): Jugadores del equipo perdedor.
+        engine (str, optional): Motor de valoración. Por defecto `settings.RATING_ENGINE`.
+
+    Returns:
+        tuple: Nuevas valoraciones (Ratings) de ganadores y perdedores.
+    """
+    rate = get_rating_engine(engine) if winners and losers else rate_fixed
+    return rate(roster_ratings(winners), roster_ratings(losers))
+
+
+def _replay_renombre(renombre, won, played, absent):
+    """
+    Renombre tras un partido: +5 por la victoria, +5 por participar en un partido
+    confirmado por ambos equipos y -5 por no presentarse, siempre en el rango [1, 100].
+    """
+    if won:
+        renombre = min(renombre + 5, 100)
+    if played:
+        renombre = min(renombre + 5, 100)
+    if absent:
+        renombre = max(renombre - 5, 1)
+    return renombre
+
+
+def recompute_ratings(engine=None, renombre=False, chunk_size=RECOMPUTE_CHUNK_SIZE):
+    """
+    Recalcula desde cero las estadísticas de todos los jugadores a partir del historial
+    de resultados (modo por lotes, fuera de línea).
+
+    Todos los jugadores parten de los valores por defecto y los resultados se leen en
+    orden cronológico con `iterator(chunk_size)` y se aplican en memoria con el motor
+    indicado, igual que en `update_match_stats`: MMR, desviación, volatilidad, partidas
+    jugadas y ganadas y winrate. La memoria depende del número de jugadores, no del de
+    resultados. Al final todo se guarda con actualizaciones en bloque de `chunk_size`
+    filas dentro de una transacción.
+
+    Las plantillas de cada partido son las actuales de cada equipo, ya que no se guarda
+    la plantilla histórica.
+
+    Args:
+        engine (str, optional): Motor de valoración. Por defecto `settings.RATING_ENGINE`.
+        renombre (bool, optional): Recalcula también el renombre con las reglas de los
+            partidos (victoria, participación y ausencia). Por defecto False, ya que
+            también cambia por otros motivos (reportes, ediciones del administrador) que
+            no quedan en el historial de resultados.
+        chunk_size (int, optional): Filas leídas y escritas por lote.
+
+    Returns:
+        int: Número de resultados aplicados.
+    """
+    rating_fields = ("mmr", "rating_deviation", "rating_volatility")
+    default = tuple(Player._meta.get_field(field).default for field in rating_fields)
+    default_renombre = Player._meta.get_field("renombre").default
+
+    # Estado de cada jugador: [mmr, desviación, volatilidad, jugadas, ganadas, renombre]
+    stats = {}
+    rosters = {}
+    for player_id, team_id in Player.objects.values_list("pk", "team_id").iterator(
+        chunk_size=chunk_size
+    ):
+        stats[player_id] = [*default, 0, 0, default_renombre]
+        if team_id is not None:
+            rosters.setdefault(team_id, []).append(player_id)
+
+    results = (
+        MatchResult.objects.filter(winner__isnull=False)
+        .order_by("completed_at", "pk")
+        .values_list(
+            "winner_id",
+            "match__team1_id",
+            "match__team2_id",
+            "match__team1_confirmed",
+            "match__team2_confirmed",
+            "match__team1_ready",
+            "match__team2_ready",
+        )
+    )
+    applied = 0
+    for row in results.iterator(chunk_size=chunk_size):
+        winner_id, team1_id, team2_id, confirmed1, confirmed2, ready1, ready2 = row
+        loser_id = team2_id if winner_id == team1_id else team1_id
+        # Un partido sin la confirmación de ambos equipos se resolvió por incomparecencia
+        played = confirmed1 and confirmed2
+        absent = (
+            set() if played else {t for t, r in ((team1_id, ready1), (team2_id, ready2)) if not r}
+        )
+
+        winners = rosters.get(winner_id, [])
+        losers = rosters.get(loser_id, [])
+        new_winners, new_losers = rate_match(
+            [stats[pk][:3] for pk in winners], [stats[pk][:3] for pk in losers], engine
+        )
+        for team_id, ids, new, won in (
+            (winner_id, winners, new_winners, 1),
+            (loser_id, losers, new_losers, 0),
+        ):
+            for pk, values in zip(ids, zip(*new)):
+                player = stats[pk]
+                player[:3] = [float(value) for value in values]
+                player[3] += 1
+                player[4] += won
+                if renombre:
+                    player[5] = _replay_renombre(player[5], won, played, team_id in absent)
+        applied += 1
+
+    fields = [*rating_fields, "games_played", "games_won", "winrate"]
+    if renombre:
+        fields.append("renombre")
+    items = iter(stats.items())
+    with transaction.atomic():
+        while chunk := list(islice(items, chunk_size)):
+            Player.objects.bulk_update(
+                [
+                    Player(
+                        pk=pk,
+                        mmr=int(mmr),
+                        rating_deviation=deviation,
+                        rating_volatility=volatility,
+                        games_played=played,
+                        games_won=won,
+                        winrate=won * 100.0 / played if played else 0.0,
+                        renombre=value,
+                    )
+                    for pk, (mmr, deviation, volatility, played, won, value) in chunk
+                ],
+                fields,
+            )
+    return applied
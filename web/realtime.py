@@ -0,0 +1,288 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+import asyncio
+import json
+import logging
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis es opcional en local
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "web:notifications"
+
+
+def user_channel(user_id):
+    """Nombre del canal de eventos de un usuario."""
+    return f"{CHANNEL_PREFIX}:{user_id}"
+
+
+class LocalBroker:
+    """
+    Canal de eventos en memoria del proceso.
+
+    Solo entrega eventos publicados desde el mismo proceso, por lo que sirve para
+    desarrollo (runserver) y pruebas. En producción se usa `RedisBroker`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, user_id, event):
+        """Entrega `event` a todas las suscripciones abiertas del usuario."""
+        self._deliver(user_id, event)
+
+    def _deliver(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    @contextmanager
+    def subscribe(self, user_id):
+        """
+        Abre una suscripción a los eventos del usuario mientras dure el bloque.
+
+        Debe abrirse dentro del bucle de eventos (vista asíncrona) que la va a leer.
+        """
+        subscription = _Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(subscription)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+
+
+class _Subscription:
+    """Cola de eventos de una conexión, leída desde su bucle de eventos."""
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+
+    def put(self, event):
+        """Encola `event` desde cualquier hilo (vistas síncronas, Celery, el suscriptor de Redis)."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._queue.put_nowait(event)
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        except RuntimeError:
+            pass  # La conexión ya se cerró
+
+    async def get(self, timeout):
+        """Espera hasta `timeout` segundos un evento; devuelve None si no llega ninguno."""
+        if timeout <= 0:
+            try:
+                return self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBroker(LocalBroker):
+    """
+    Canal de eventos sobre Redis pub/sub.
+
+    Los eventos publicados desde cualquier proceso (web o worker de Celery) llegan a
+    las conexiones abiertas en cualquier otro proceso. Cada proceso mantiene una única
+    conexión suscrita a los canales de todos los usuarios, en un hilo que reparte los
+    mensajes entre las suscripciones locales; así el número de conexiones a Redis no
+    crece con el de navegadores conectados.
+    """
+
+    RECONNECT_SECONDS = 1
+
+    def __init__(self, client):
+        super().__init__()
+        self._client = client
+        self._listener = None
+
+    def publish(self, user_id, event):
+        """Publica `event` en el canal del usuario."""
+        self._client.publish(user_channel(user_id), json.dumps(event))
+
+    @contextmanager
+    def subscribe(self, user_id):
+        """Abre una suscripción al canal del usuario mientras dure el bloque."""
+        self._ensure_listener()
+        with super().subscribe(user_id) as subscription:
+            yield subscription
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, name="realtime-redis", daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                self._consume()
+            except Exception as exc:
+                logger.warning("Suscripción a Redis interrumpida: %s", exc)
+            time.sleep(self.RECONNECT_SECONDS)
+
+    def _consume(self):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.psubscribe(f"{CHANNEL_PREFIX}:*")
+            for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                user_id = int(message["channel"].rsplit(b":", 1)[1])
+                self._deliver(user_id, json.loads(message["data"]))
+        finally:
+            pubsub.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def check_realtime_settings():
+    """
+    Comprueba al arrancar que los eventos en tiempo real viajan por Redis.
+
+    Con el canal en memoria los eventos publicados desde Celery o desde otro worker no
+    llegan a las conexiones abiertas, algo solo aceptable en desarrollo y en las pruebas.
+
+    Raises:
+        ImproperlyConfigured: Si falta `REALTIME_REDIS_URL` (o la librería redis) fuera
+                              de DEBUG y de las pruebas.
+    """
+    if settings.DEBUG or settings.TESTING:
+        return
+    if not settings.REALTIME_REDIS_URL:
+        raise ImproperlyConfigured("REALTIME_REDIS_URL es obligatorio en producción")
+    if redis is None:
+        raise ImproperlyConfigured("REALTIME_REDIS_URL requiere la librería redis")
+
+
+def get_broker():
+    """
+    Obtiene el canal de eventos del proceso.
+
+    Usa Redis si `settings.REALTIME_REDIS_URL` está configurado y la librería está
+    instalada; en otro caso (solo con DEBUG o en las pruebas), un canal en memoria.
+
+    Returns:
+        LocalBroker | RedisBroker: Canal de eventos compartido por el proceso.
+    """
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            url = getattr(settings, "REALTIME_REDIS_URL", "")
+            _broker = (
+                RedisBroker(redis.Redis.from_url(url))
+                if url and redis is not None
+                else LocalBroker()
+            )
+        return _broker
+
+
+def publish_event(user_id, event):
+    """
+    Publica un evento para un usuario sin propagar errores del canal.
+
+    Args:
+        user_id (int): ID del usuario destinatario.
+        event (dict): Evento serializable a JSON con, al menos, la clave "type".
+    """
+    try:
+        get_broker().publish(user_id, event)
+    except Exception as exc:
+        logger.warning("No se pudo publicar el evento para el usuario %s: %s", user_id, exc)
+
+
+def publish_notifications(notifications):
+    """
+    Publica un evento "notification" por cada notificación creada.
+
+    Args:
+        notifications (list): Objetos Notification ya guardados.
+    """
+    for notification in notifications:
+        publish_event(
+            notification.user_id,
+            {
+                "type": "notification",
+                "id": notification.pk,
+                "title": notification.title,
+                "urgency": notification.urgency,
+                "created_at": notification.created_at.isoformat(),
+            },
+        )
+
+
+async def stream_events(user_id, duration=None, heartbeat=15):
+    """
+    Genera de forma asíncrona el flujo Server-Sent Events de un usuario.
+
+    Envía cada evento recibido y un comentario de latido cada `heartbeat` segundos
+    para que los proxies no corten la conexión. Tras `duration` segundos el flujo se
+    cierra y el navegador (EventSource) se reconecta solo.
+
+    Args:
+        user_id (int): ID del usuario.
+        duration (int, optional): Duración máxima de la conexión. Por defecto
+                                  `settings.NOTIFICATION_STREAM_SECONDS`.
+        heartbeat (int, optional): Segundos entre latidos.
+
+    Yields:
+        str: Fragmentos del flujo text/event-stream.
+    """
+    deadline = time.monotonic() + (duration or settings.NOTIFICATION_STREAM_SECONDS)
+    yield "retry: 3000\n\n"
+    with get_broker().subscribe(user_id) as subscription:
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = await subscription.get(timeout=min(heartbeat, remaining))
+            if event is None:
+                yield ": ping\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def wait_for_events(user_id, timeout=None):
+    """
+    Espera eventos de un usuario para el modo de consulta larga (long polling).
+
+    Devuelve en cuanto llega el primer evento (junto con los que ya estén en cola)
+    o, si no llega ninguno, al cumplirse `timeout`.
+
+    Args:
+        user_id (int): ID del usuario.
+        timeout (int, optional): Espera máxima en segundos. Por defecto
+                                 `settings.NOTIFICATION_LONG_POLL_SECONDS`.
+
+    Returns:
+        list: Eventos recibidos (vacía si se agota la espera).
+    """
+    timeout = timeout if timeout is not None else settings.NOTIFICATION_LONG_POLL_SECONDS
+    with get_broker().subscribe(user_id) as subscription:
+        event = await subscription.get(timeout=timeout)
+        events = []
+        while event is not None:
+            events.append(event)
+            event = await subscription.get(timeout=0)
+    return events
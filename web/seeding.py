@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.db.models import Avg, Count, FloatField, Value
+from django.db.models.functions import Coalesce
+from .bracket import bracket_order, bracket_size
+
+
+def annotate_team_mmr(tournament_teams):
+    """
+    Anota los equipos de un torneo con su MMR medio y su número de jugadores.
+
+    Ambos valores se calculan en la base de datos con una única consulta agregada,
+    en lugar de una consulta por equipo con `Team.get_avg_mmr`.
+
+    Args:
+        tournament_teams (QuerySet): Conjunto de TournamentTeam.
+
+    Returns:
+        QuerySet: TournamentTeam con `avg_mmr` y `num_players`, ordenados de mayor a menor MMR.
+    """
+    return (
+        tournament_teams.select_related("team")
+        .annotate(
+            avg_mmr=Coalesce(Avg("team__player__mmr"), Value(0.0), output_field=FloatField()),
+            num_players=Count("team__player"),
+        )
+        .order_by("-avg_mmr", "team_id")
+    )
+
+
+def seed_adjacent(teams):
+    """
+    Empareja los equipos de la primera ronda por MMR adyacente (1 contra 2, 3 contra 4...).
+
+    Los equipos sobrantes hasta la siguiente potencia de dos reciben un pase directo
+    a la segunda ronda; esos pases se asignan a los equipos de mayor MMR. Las parejas
+    se reparten por el cuadro con `bracket_order` para que los pases no se crucen entre sí.
+
+    Args:
+        teams (list): Equipos ordenados de mayor a menor MMR.
+
+    Returns:
+        list: Tuplas (team1, team2) en orden de posición; team2 es None en los pases directos.
+    """
+    size = bracket_size(len(teams))
+    byes = size - len(teams)
+
+    pairs = [(team, None) for team in teams[:byes]]
+    rest = teams[byes:]
+    pairs += [(rest[i], rest[i + 1]) for i in range(0, len(rest), 2)]
+
+    return [pairs[index] for index in bracket_order(size // 2)]
+
+
+def seed_snake(teams):
+    """
+    Empareja los equipos con el cuadro clásico de cabezas de serie (1 contra N, 2 contra N-1...).
+
+    Las posiciones que faltan hasta la siguiente potencia de dos son pases directos,
+    que recaen en las mejores cabezas de serie.
+
+    Args:
+        teams (list): Equipos ordenados de mayor a menor MMR.
+
+    Returns:
+        list: Tuplas (team1, team2) en orden de posición; team2 es None en los pases directos.
+    """
+    order = bracket_order(bracket_size(len(teams)))
+    seeds = teams + [None] * (len(order) - len(teams))
+    return [(seeds[order[i]], seeds[order[i + 1]]) for i in range(0, len(order), 2)]
+
+
+SEEDING_STRATEGIES = {
+    "adjacent": seed_adjacent,
+    "snake": seed_snake,
+}
+
+
+def seed_pairs(teams, strategy=None):
+    """
+    Empareja los equipos de la primera ronda con la estrategia indicada.
+
+    Args:
+        teams (list): Equipos ordenados de mayor a menor MMR.
+        strategy (str, optional): Clave de `SEEDING_STRATEGIES`. Por defecto
+                                  `settings.TOURNAMENT_SEEDING_STRATEGY`.
+
+    Returns:
+        list: Tuplas (team1, team2) en orden de posición, listas para `build_bracket`.
+
+    Raises:
+        ValueError: Si la estrategia no existe.
+    """
+    strategy = strategy or settings.TOURNAMENT_SEEDING_STRATEGY
+    if strategy not in SEEDING_STRATEGIES:
+        raise ValueError(f"Estrategia de emparejamiento desconocida: {strategy}")
+    return SEEDING_STRATEGIES[strategy](teams)
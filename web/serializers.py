@@ -79,6 +79,7 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     sender_email = serializers.CharField(allow_null=True)
     recipients = serializers.SerializerMethodField()
+    is_read = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Notification
@@ -90,9 +91,53 @@ class NotificationSerializer(serializers.ModelSerializer):
             "status",
             "created_at",
             "read_at",
+            "is_read",
             "sender_email",
             "recipients",
         ]
 
     def get_recipients(self, obj):
         return [u.username for u in obj.recipient_users.all()]
+
+
+class RatingSnapshotSerializer(serializers.ModelSerializer):
+    """Serializador para los resúmenes diarios del MMR de un jugador."""
+
+    class Meta:
+        model = RatingSnapshot
+        fields = ["date", "mmr_open", "mmr_close", "mmr_min", "mmr_max", "rank", "matches"]
+
+
+class RatingHistorySerializer(serializers.ModelSerializer):
+    """Serializador para las entradas por partido del historial de MMR de un jugador."""
+
+    class Meta:
+        model = RatingHistory
+        fields = ["created_at", "mmr", "rank", "match"]
+
+
+class MatchLogSerializer(serializers.ModelSerializer):
+    """Serializador para los logs de partidas del visor de logs de un torneo."""
+
+    round = serializers.IntegerField(source="match.round")
+    team1 = serializers.CharField(source="match.team1.name")
+    team2 = serializers.CharField(source="match.team2.name")
+    team = serializers.CharField(source="team.name", default=None)
+    player = serializers.CharField(source="player.user.username", default=None)
+    event = serializers.CharField(source="text")
+
+    class Meta:
+        model = MatchLog
+        fields = [
+            "id",
+            "match",
+            "round",
+            "team1",
+            "team2",
+            "team",
+            "player",
+            "event_type",
+            "payload",
+            "event",
+            "created_at",
+        ]
@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .functions import invalidate_staff_recipients
+from .leaderboard import remove_players, update_player_scores
+from .models import Player
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalida la lista de staff en caché cuando se guarda un usuario.
+
+    Los guardados que solo actualizan `last_login` (cada inicio de sesión) no
+    pueden cambiar la lista, así que no la invalidan.
+    """
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_staff_recipients()
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """Invalida la lista de staff en caché cuando se elimina un usuario."""
+    invalidate_staff_recipients()
+
+
+@receiver(post_save, sender=Player)
+def player_saved(sender, instance, update_fields=None, **kwargs):
+    """
+    Refleja en las clasificaciones el MMR y el país de un jugador creado o guardado, una
+    vez confirmada la transacción.
+    """
+    if update_fields and not {"mmr", "country"} & set(update_fields):
+        return
+    scores, countries = {instance.pk: instance.mmr}, {instance.pk: instance.country}
+    transaction.on_commit(lambda: update_player_scores(scores, countries=countries))
+
+
+@receiver(post_delete, sender=Player)
+def player_deleted(sender, instance, **kwargs):
+    """Quita de las clasificaciones a un jugador eliminado, una vez confirmada la transacción."""
+    player_id = instance.pk
+    transaction.on_commit(lambda: remove_players(player_id))
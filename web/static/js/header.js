@@ -23,27 +23,68 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    // Actualizar badge cada 30 segundos
-    setInterval(updateBadge, 30000);
-    // Actualizar notificaciones cada 30 segundos si el offcanvas está abierto
-    setInterval(function() {
-        if (document.getElementById('notificationOffcanvas').classList.contains('show')) {
-            loadNotifications();
-        }
-    }, 30000);
+    // Recibir las notificaciones nuevas en tiempo real en lugar de consultar cada 30 segundos
+    if (document.getElementById('notificationBell')) {
+        connectNotificationStream();
+    }
 });
 
-function loadNotifications() {
+function connectNotificationStream() {
+    // Navegadores sin Server-Sent Events: consulta larga
+    if (!window.EventSource) {
+        pollNotifications();
+        return;
+    }
+    const source = new EventSource('/api/notifications/stream/');
+    // Al (re)conectar se sincroniza el contador por si se perdió algún evento
+    source.addEventListener('open', updateBadge);
+    source.addEventListener('notification', onNotificationEvent);
+    source.addEventListener('read', onNotificationEvent);
+    source.addEventListener('error', function() {
+        // EventSource se reconecta solo; si el servidor rechaza el flujo, se pasa a consulta larga
+        if (source.readyState === EventSource.CLOSED) {
+            pollNotifications();
+        }
+    });
+}
+
+function pollNotifications() {
+    fetch('/api/notifications/poll/')
+        .then(r => {
+            if (!r.ok) throw new Error(r.status);
+            return r.json();
+        })
+        .then(data => {
+            if ((data.events || []).length > 0) onNotificationEvent();
+            pollNotifications();
+        })
+        .catch(err => {
+            console.error(err);
+            setTimeout(pollNotifications, 30000);
+        });
+}
+
+function onNotificationEvent() {
+    updateBadge();
+    const offcanvasEl = document.getElementById('notificationOffcanvas');
+    if (offcanvasEl && offcanvasEl.classList.contains('show')) {
+        loadNotifications();
+    }
+}
+
+function loadNotifications(before) {
     const container = document.getElementById('notificationList');
-    fetch('/api/notifications/')
+    // Sin cursor se recarga la primera página; con cursor se añade la siguiente al final
+    const url = before ? `/api/notifications/?before=${before}` : '/api/notifications/';
+    fetch(url)
         .then(r => r.json())
         .then(data => {
             const notifs = data.notifications || [];
-            if (notifs.length === 0) {
+            if (!before && notifs.length === 0) {
                 container.innerHTML = '<div class="notification-empty"><i class="bi bi-inbox"></i> <p>No hay notificaciones</p></div>';
                 return;
             }
-            container.innerHTML = notifs.map(n => `
+            const html = notifs.map(n => `
                 <div class="notification-item ${n.is_read ? 'opacity-50' : ''}">
                     <strong>${escapeHtml(n.title)}</strong>
                     <div class="notification-message">${escapeHtml(n.message)}</div>
@@ -53,6 +94,14 @@ function loadNotifications() {
                     </div>
                 </div>
             `).join('');
+            const moreButton = data.next_cursor
+                ? `<button class="btn btn-sm w-100 notification-more" onclick="loadMoreNotifications(this, ${data.next_cursor})">Cargar más</button>`
+                : '';
+            if (before) {
+                container.insertAdjacentHTML('beforeend', html + moreButton);
+            } else {
+                container.innerHTML = html + moreButton;
+            }
         })
         .catch(err => { 
             container.innerHTML = '<div class="notification-empty"><i class="bi bi-exclamation-circle"></i> <p>Error cargando notificaciones</p></div>';
@@ -60,6 +109,11 @@ function loadNotifications() {
         });
 }
 
+function loadMoreNotifications(button, before) {
+    button.remove();
+    loadNotifications(before);
+}
+
 function formatDate(dateStr) {
     const date = new Date(dateStr);
     const now = new Date();
@@ -93,6 +147,13 @@ function markNotification(id) {
         .catch(e => console.error(e));
 }
 
+function markAllNotifications() {
+    fetch('/api/notifications/mark-read/', {method: 'POST', headers: {'X-CSRFToken': getCSRF(), 'Content-Type':'application/json'}, body: JSON.stringify({all: true})})
+        .then(r => r.json())
+        .then(() => { loadNotifications(); updateBadge(); })
+        .catch(e => console.error(e));
+}
+
 function updateBadge() {
     fetch('/api/notifications/unread-count/')
         .then(r => r.json())
@@ -57,3 +57,67 @@ function renderPlayerChart(canvasId, gamesPlayed, gamesWon) {
         }
     });
 }
+
+function renderRatingChart(canvasId, url) {
+    // Une los resúmenes diarios y las entradas recientes en una sola curva
+    fetch(url)
+        .then(r => r.json())
+        .then(data => {
+            const points = data.snapshots.map(s => ({label: s.date, mmr: s.mmr_close, rank: s.rank}))
+                .concat(data.recent.map(h => ({label: h.created_at.slice(0, 16).replace('T', ' '), mmr: h.mmr, rank: h.rank})));
+            const ctx = document.getElementById(canvasId).getContext('2d');
+
+            new Chart(ctx, {
+                type: 'line',
+                data: {
+                    labels: points.map(p => p.label),
+                    datasets: [{
+                        label: 'MMR',
+                        data: points.map(p => p.mmr),
+                        borderColor: 'rgba(255, 193, 7, 1)',
+                        backgroundColor: 'rgba(255, 193, 7, 0.2)',
+                        tension: 0.2,
+                        fill: true
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: {
+                            display: false
+                        },
+                        tooltip: {
+                            backgroundColor: '#1a1a1a',
+                            titleColor: '#ffc107',
+                            bodyColor: '#ffffff',
+                            borderColor: '#ffc107',
+                            borderWidth: 1,
+                            callbacks: {
+                                afterLabel: item => points[item.dataIndex].rank ? `Posición: #${points[item.dataIndex].rank}` : ''
+                            }
+                        }
+                    },
+                    scales: {
+                        y: {
+                            grid: {
+                                color: 'rgba(255, 255, 255, 0.1)'
+                            },
+                            ticks: {
+                                color: '#ffffff'
+                            }
+                        },
+                        x: {
+                            grid: {
+                                display: false
+                            },
+                            ticks: {
+                                color: '#ffffff'
+                            }
+                        }
+                    }
+                }
+            });
+        })
+        .catch(e => console.error(e));
+}
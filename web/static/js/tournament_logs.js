@@ -0,0 +1,79 @@
+// Scroll infinito del visor de logs de un torneo: la primera página llega con la vista y
+// las siguientes se piden a la API con el cursor de la última recibida
+document.addEventListener('DOMContentLoaded', function() {
+    const list = document.getElementById('matchLogList');
+    const sentinel = document.getElementById('matchLogSentinel');
+    if (!list || !sentinel || !list.dataset.nextCursor) return;
+
+    let loading = false;
+    const observer = new IntersectionObserver(function(entries) {
+        if (entries[0].isIntersecting) loadNextLogs();
+    }, { rootMargin: '400px' });
+    sentinel.classList.remove('d-none');
+    observer.observe(sentinel);
+
+    function loadNextLogs() {
+        const cursor = list.dataset.nextCursor;
+        if (loading || !cursor) return;
+        loading = true;
+        fetch(`${list.dataset.url}?after=${cursor}`)
+            .then(r => {
+                if (!r.ok) throw new Error(r.status);
+                return r.json();
+            })
+            .then(data => {
+                data.logs.forEach(log => list.appendChild(renderLogCard(log)));
+                list.dataset.nextCursor = data.next_cursor || '';
+                if (!data.next_cursor) {
+                    observer.disconnect();
+                    sentinel.remove();
+                }
+            })
+            .catch(err => console.error(err))
+            .finally(() => { loading = false; });
+    }
+});
+
+function renderLogCard(log) {
+    const card = document.createElement('div');
+    card.className = 'card bg-dark log-card mb-4';
+    card.innerHTML = `
+        <div class="card-header bg-black text-warning log-header">
+            <div class="d-flex flex-column flex-md-row justify-content-between align-items-md-center">
+                <h5 class="mb-0"><i class="bi bi-joystick me-2"></i><span class="log-teams"></span></h5>
+                <span class="badge bg-dark text-warning border border-warning mt-2 mt-md-0 log-round"></span>
+            </div>
+        </div>
+        <div class="card-body p-0">
+            <ul class="list-group list-group-flush">
+                <li class="list-group-item log-item text-white">
+                    <div class="d-flex flex-column">
+                        <div class="d-flex align-items-center mb-1 log-meta">
+                            <span class="fw-medium text-info me-2 log-date"></span>
+                        </div>
+                        <div class="log-message">
+                            <i class="bi bi-arrow-right-short text-warning"></i> <span class="log-event"></span>
+                        </div>
+                    </div>
+                </li>
+            </ul>
+        </div>`;
+    // Los textos se asignan con textContent para no interpretar HTML de los datos
+    card.querySelector('.log-teams').textContent = `${log.team1} vs ${log.team2}`;
+    card.querySelector('.log-round').textContent = `Ronda ${log.round}`;
+    card.querySelector('.log-date').textContent = new Date(log.created_at).toLocaleString('es-ES');
+    card.querySelector('.log-event').textContent = log.event;
+
+    const meta = card.querySelector('.log-meta');
+    if (log.player) meta.appendChild(renderBadge('bg-primary me-2', 'bi-person', log.player));
+    if (log.team) meta.appendChild(renderBadge('bg-secondary', 'bi-people', log.team));
+    return card;
+}
+
+function renderBadge(classes, icon, text) {
+    const badge = document.createElement('span');
+    badge.className = `badge ${classes}`;
+    badge.innerHTML = `<i class="bi ${icon} me-1"></i>`;
+    badge.appendChild(document.createTextNode(text));
+    return badge;
+}
@@ -1,12 +1,25 @@
 from functools import total_ordering
 
 from celery import shared_task
+from datetime import datetime
+from django.db import transaction
+from django.db.models import Count, F, Max, Min
+from django.db.models.functions import TruncDate
 from django.utils import timezone
-from django.core.mail import send_mail
 from .models import *
 from .functions import *
+from .mailer import (
+    build_notification_email,
+    get_notification_recipients,
+    retry_delay,
+    send_notification_emails,
+)
 from django.conf import settings
+import logging
 import random
+import time
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task
@@ -48,244 +61,309 @@ def update_tournament_status():
 
 
 @shared_task
-def check_teams_ready_for_match():
+def check_teams_ready_for_match(batch_size=None):
     """
     Tarea periódica para verificar el estado de los partidos pendientes y actuar en consecuencia.
 
-    Funcionalidades principales:
-    - Si ambos equipos están listos antes de la hora programada, se marca el partido como 'ongoing'
-      y se notifica a los jugadores por correo electrónico.
-    - Si se alcanza la hora programada y uno o ambos equipos no están listos:
+    Los partidos pendientes se reparten en tres grupos, cada uno obtenido con una sola consulta:
+    - Ambos equipos listos: se marcan como 'ongoing' con una actualización en bloque
+      y se notifica a todos los jugadores con una inserción en bloque.
+    - Incomparecencia (ya es la hora programada y algún equipo no está listo):
         - Se declara ganador al equipo que esté presente.
         - Si ninguno está listo, se elige un ganador al azar.
-        - Se actualizan estadísticas y se penaliza con pérdida de renombre a jugadores ausentes.
-    - En todos los casos, se registra el resultado automáticamente mediante `record_match_result`
-      y se guarda un log del partido.
+        - Se actualizan estadísticas y se penaliza con pérdida de renombre a los equipos ausentes.
+        - Los resultados se registran en bloque mediante `record_match_results`.
+    - Aún no es la hora: no se cargan ni se modifican.
+
+    Cada ejecución procesa como máximo `batch_size` partidos por grupo (por defecto
+    `settings.MATCH_READY_BATCH_SIZE`), de forma que una ejecución de Celery Beat no
+    se solape con la siguiente cuando hay miles de partidos pendientes. Las filas se
+    bloquean con SKIP LOCKED para que dos ejecuciones simultáneas no procesen el mismo partido.
+
+    Args:
+        batch_size (int, optional): Límite de partidos por grupo en esta ejecución.
 
-    Esta tarea debe ejecutarse de forma periódica mediante Celery Beat o similar.
+    Returns:
+        dict: Número de partidos iniciados y finalizados por incomparecencia.
     """
     # Obtiene la fecha y hora actual con zona horaria
     now = timezone.now()
+    batch_size = batch_size or settings.MATCH_READY_BATCH_SIZE
 
-    # Filtra todos los partidos pendientes en la base de datos
-    matches = Match.objects.filter(status="pending")
-
-    # Procesa uno por uno
-    for match in matches:
-
-        # Caso 1: Ambos equipos están listos antes de la hora de inicio
-        if match.team1_ready and match.team2_ready:
-            # Se inicia el partido
-            match.status = "ongoing"
-            match.save()
-            create_match_log(match, "Ambos equipos listos. El partido ha comenzado.")
-
-            # Notifica a cada jugador del equipo 1 mediante el sistema de notificaciones
-            for player in match.team1.player_set.all():
-                create_notification(
-                    user=player.user,
-                    title="✅ ¡Partida Comenzada!",
-                    message=(
-                        f"Hola {player.user},\n\n"
-                        "La partida ha comenzado correctamente.\n\n"
-                        "- El equipo de ArenaGG"
-                    ),
-                    sender_email=settings.DEFAULT_FROM_EMAIL,
-                    urgency=3,
-                    send_email=True,
-                )
-
-            # Notifica a cada jugador del equipo 2 mediante el sistema de notificaciones
-            for player in match.team2.player_set.all():
-                create_notification(
-                    user=player.user,
-                    title="✅ ¡Partida Comenzada!",
-                    message=(
-                        f"Hola {player.user},\n\n"
-                        "La partida ha comenzado correctamente.\n\n"
-                        "- El equipo de ArenaGG"
-                    ),
-                    sender_email=settings.DEFAULT_FROM_EMAIL,
-                    urgency=3,
-                    send_email=True,
-                )
-
-            # Pasa al siguiente partido (no continúa evaluando condiciones)
-            continue
+    pending = (
+        Match.objects.filter(status="pending")
+        .select_related("team1", "team2", "tournament")
+        .select_for_update(skip_locked=True, of=("self",))
+        .order_by("scheduled_at", "id")
+    )
+
+    # Grupo 1: ambos equipos están listos
+    with transaction.atomic():
+        ready_matches = list(pending.filter(team1_ready=True, team2_ready=True)[:batch_size])
+        start_ready_matches(ready_matches)
 
-        # Caso 2: Ya es hora del partido y aún no se ha completado
-        if now >= match.scheduled_at and match.status != "completed":
-
-            # Subcaso: solo el equipo 1 está listo
-            if match.team1_ready and not match.team2_ready:
-                winner = match.team1
-                team1_score, team2_score = 1, 0
-                match.winner = winner
-                match.save()
-
-                # Actualiza estadísticas: equipo 1 gana, equipo 2 pierde
-                update_players_stats(match.team1, True)
-                update_players_stats(match.team2)
-
-                # Penaliza a los jugadores del equipo 2 por inasistencia
-                for player in match.team2.player_set.all():
-                    decrease_player_renombre(player, 5, "No se ha presentado")
-
-            # Subcaso: solo el equipo 2 está listo
-            elif match.team2_ready and not match.team1_ready:
-                winner = match.team2
-                team1_score, team2_score = 0, 1
-                match.winner = winner
-                match.save()
-
-                update_players_stats(match.team1)
-                update_players_stats(match.team2, True)
-
-                # Penaliza a los jugadores del equipo 1 por inasistencia
-                for player in match.team1.player_set.all():
-                    decrease_player_renombre(player, 5, "No se ha presentado")
-
-            # Subcaso: ningún equipo está listo → se elige un ganador aleatoriamente
-            else:
-                winner = random.choice([match.team1, match.team2])
-                team1_score, team2_score = (1, 0) if winner == match.team1 else (0, 1)
-                match.winner = winner
-                match.save()
-                reason = "ningún equipo estaba listo, ganador aleatorio"
-
-                # Penaliza a jugadores de ambos equipos
-                for player in match.team2.player_set.all():
-                    decrease_player_renombre(player, 5, "No se ha presentado")
-                for player in match.team1.player_set.all():
-                    decrease_player_renombre(player, 5, "No se ha presentado")
-
-                # Registra la victoria del equipo seleccionado aleatoriamente
-                if winner == match.team1:
-                    update_players_stats(match.team1, True)
-                    update_players_stats(match.team2)
-                else:
-                    update_players_stats(match.team2, True)
-                    update_players_stats(match.team1)
-
-            # Guarda resultado y genera un log del partido
-            record_match_result(match, winner, team1_score, team2_score)
-            create_match_log(
-                match, f"Partido finalizado automáticamente. Ganador: {winner.name} ({reason})."
-            )
+    # Grupo 2: ya es la hora del partido y algún equipo no está listo
+    with transaction.atomic():
+        forfeit_matches = list(
+            pending.filter(scheduled_at__lte=now).exclude(team1_ready=True, team2_ready=True)[
+                :batch_size
+            ]
+        )
+        resolve_forfeited_matches(forfeit_matches)
+
+    return {"started": len(ready_matches), "forfeited": len(forfeit_matches)}
 
 
 @shared_task
-def check_tournament_match_progress():
+def advance_tournament_bracket(tournament_id):
+    """
+    Tarea que hace avanzar el cuadro de un torneo tras completarse un partido.
+
+    Se encola desde `record_match_results` en cuanto se registra un resultado, por lo
+    que la siguiente ronda (o el cierre del torneo) no espera al siguiente ciclo de Beat.
+
+    Args:
+        tournament_id (int): ID del torneo.
+
+    Returns:
+        str | None: Resultado de `advance_tournament`.
     """
-    Tarea periódica que revisa el estado de los torneos en curso y toma decisiones
-    sobre el avance de rondas o la finalización del torneo.
-
-    Funcionalidades:
-    - Itera sobre todos los torneos con estado 'ongoing'.
-    - Cuenta partidos en curso, completados y totales.
-    - Según el número de equipos y partidos completados, decide si:
-        - Debe generarse una nueva ronda (cuartos, semifinales, final).
-        - Debe finalizarse el torneo.
-
-    Lógica aplicada por cantidad de equipos:
-    - 2 equipos:
-        - 1 partido completado → se procesa la final directamente.
-    - 4 equipos:
-        - 2 partidos completados → se genera la ronda 2 (final).
-        - 3 partidos completados → se da por jugada la final y se finaliza el torneo.
-    - 8 equipos:
-        - 4 partidos completados → se genera la ronda 2 (semifinales).
-        - 6 partidos completados → se genera la ronda 3 (final).
-        - 7 partidos completados → se finaliza el torneo.
-
-    Esta función no recibe parámetros y no retorna ningún valor,
-    pero modifica el estado de los torneos y genera partidos o los cierra según sea necesario.
+    tournament = Tournament.objects.filter(pk=tournament_id, status="ongoing").first()
+    if tournament is None:
+        return None
+    return advance_tournament(tournament)
+
+
+@shared_task
+def check_tournament_match_progress():
     """
+    Tarea periódica de reconciliación del avance de los torneos en curso.
 
-    # Obtener la hora actual con zona horaria
-    now = timezone.now()
+    El avance normal de rondas se dispara por eventos (`advance_tournament_bracket`).
+    Esta tarea solo recoge los torneos que se hayan quedado atascados, por ejemplo si
+    el broker no estaba disponible al registrar un resultado: con una única consulta
+    agregada obtiene los torneos en curso cuyos partidos generados están todos
+    completados y los hace avanzar.
 
-    # Buscar torneos que estén en curso
-    ongoing_tournaments = Tournament.objects.filter(status="ongoing")
-    if not ongoing_tournaments.exists():
-        return
-
-    # Procesar cada torneo en curso
-    for tournament in ongoing_tournaments:
-        # Obtener métricas del torneo
-        ongoing_matches = Match.objects.filter(tournament=tournament, status="ongoing").count()
-        completed_matches = Match.objects.filter(tournament=tournament, status="completed").count()
-        total_matches = Match.objects.filter(tournament=tournament).count()
-        team_count = tournament.tournamentteam_set.count()
-
-        # Obtener queryset reutilizable de partidas finalizadas
-        completed_matches_queryset = Match.objects.filter(tournament=tournament, status="completed")
-
-        # Lógica para torneos de 2 equipos (1 final directa)
-        if team_count == 2 and completed_matches == 1:
-            process_final_match(tournament, completed_matches_queryset)
-
-        # Torneos de 4 equipos:
-        # - 2 partidos completados → procesar ronda 2 (final)
-        # - 3 partidos completados → ya se jugó la final → finalizar
-        elif team_count == 4:
-            if completed_matches == 2 and total_matches != 3:
-                process_round(tournament, round_number=2)
-            elif completed_matches == 3:
-                process_final_match(tournament, completed_matches_queryset)
-
-        # Torneos de 8 equipos:
-        # - 4 partidos completados → procesar ronda 2 (semifinales)
-        # - 6 partidos completados → procesar ronda 3 (final)
-        # - 7 partidos completados → finalizar torneo
-        elif team_count == 8:
-            if completed_matches == 4 and total_matches != 6:
-                process_round(tournament, round_number=2)
-            elif completed_matches == 6 and total_matches != 7:
-                process_round(tournament, round_number=3)
-            elif completed_matches == 7:
-                process_final_match(tournament, completed_matches_queryset)
+    Returns:
+        int: Número de torneos reconciliados.
+    """
+    stalled_tournaments = (
+        Tournament.objects.filter(status="ongoing")
+        .with_progress()
+        .filter(total_matches__gt=0, completed_matches=F("total_matches"))
+    )
+
+    reconciled = 0
+    for tournament in stalled_tournaments:
+        if advance_tournament(tournament):
+            reconciled += 1
+    return reconciled
 
 
 @shared_task
-def process_notification_queue():
+def process_notification_queue(batch_size=None):
     """Procesa la cola de notificaciones: envía emails para notificaciones pendientes.
 
-    Busca notificaciones con `send_email=True` y `status='pending'`, intenta enviar
-    por correo usando Django `send_mail` y actualiza el estado y `email_sent_at`.
+    - Reserva con `claim_notifications` hasta `batch_size` notificaciones (por defecto
+      `settings.NOTIFICATION_BATCH_SIZE`) con `send_email=True`, `status='pending'` y cuyo
+      `next_attempt_at` ya ha llegado. La reserva permite ejecutar la tarea en varios
+      workers a la vez sin enviar dos veces la misma notificación.
+    - Las envía con `send_notification_emails`, que reutiliza una conexión SMTP por grupo
+      y envía los grupos en paralelo (`settings.NOTIFICATION_SEND_CONCURRENCY`).
+    - Si un envío falla, el siguiente intento se programa con espera exponencial
+      (`retry_delay`), de modo que un servidor de correo caído no acapara la cola.
+    - Estados, reintentos y `email_sent_at` se guardan con una única actualización en bloque.
+
+    Args:
+        batch_size (int, optional): Límite de notificaciones procesadas en esta ejecución.
+
+    Returns:
+        dict: Número de notificaciones enviadas y fallidas.
     """
-    notifications = (
-        Notification.objects.filter(send_email=True, status="pending")
-        .select_related("user")
-        .prefetch_related("recipient_users")[:200]
-    )
-    for notif in notifications:
-        # construir lista de destinatarios
-        recipient_qs = notif.recipient_users.all()
-        if recipient_qs.exists():
-            recipient_emails = [u.email for u in recipient_qs if u.email]
-        else:
-            recipient_emails = [notif.user.email] if notif.user and notif.user.email else []
+    notifications = claim_notifications(batch_size or settings.NOTIFICATION_BATCH_SIZE)
+    now = timezone.now()
 
+    messages = []
+    for notif in notifications:
+        notif.updated_at = now
+        recipient_emails = get_notification_recipients(notif)
         if not recipient_emails:
+            # Sin destinatarios no tiene sentido reintentar
             notif.status = "failed"
             notif.retries += 1
-            notif.save()
             continue
+        messages.append((notif, build_notification_email(notif, recipient_emails)))
 
-        subject = notif.title
-        message = notif.message
-        from_email = notif.sender_email or settings.DEFAULT_FROM_EMAIL
-
-        try:
-            send_mail(subject, message, from_email, recipient_emails, fail_silently=False)
+    sent = 0
+    for notif, ok in send_notification_emails(messages):
+        if ok:
             notif.status = "sent"
-            notif.email_sent_at = timezone.now()
-            notif.save()
-        except Exception:
+            notif.email_sent_at = now
+            sent += 1
+        else:
             notif.retries += 1
-            if notif.retries >= notif.max_retries:
-                notif.status = "failed"
-            else:
-                notif.status = "pending"
-            notif.save()
+            notif.status = "failed" if notif.retries >= notif.max_retries else "pending"
+            notif.next_attempt_at = now + retry_delay(notif.retries)
+
+    Notification.objects.bulk_update(
+        notifications, ["status", "retries", "email_sent_at", "next_attempt_at", "updated_at"]
+    )
+    return {"sent": sent, "failed": len(notifications) - sent}
+
+
+@shared_task
+def archive_old_notifications(retention_days=None, batch_size=None, max_batches=None):
+    """Retira de la tabla de notificaciones las antiguas, ya leídas y enviadas.
+
+    - Mueve a `NotificationArchive` (o borra, si `settings.NOTIFICATION_RETENTION_ARCHIVE`
+      es False) las notificaciones con más de `retention_days` días, por defecto
+      `settings.NOTIFICATION_RETENTION_DAYS`.
+    - Trabaja por lotes de `batch_size` filas (`settings.NOTIFICATION_RETENTION_BATCH_SIZE`),
+      cada uno en su propia transacción, y se detiene tras `max_batches` lotes
+      (`settings.NOTIFICATION_RETENTION_MAX_BATCHES`); el resto queda para la siguiente
+      ejecución.
+    - Mantener la tabla pequeña es lo que mantiene rápidos `notifications_api` y la
+      lectura de la cola en `process_notification_queue`.
+
+    Args:
+        retention_days (int, optional): Antigüedad mínima, en días.
+        batch_size (int, optional): Filas por lote.
+        max_batches (int, optional): Máximo de lotes en esta ejecución.
+
+    Returns:
+        dict: Filas retiradas, lotes procesados, si quedan filas pendientes y duración.
+    """
+    retention_days = retention_days or settings.NOTIFICATION_RETENTION_DAYS
+    batch_size = batch_size or settings.NOTIFICATION_RETENTION_BATCH_SIZE
+    max_batches = max_batches or settings.NOTIFICATION_RETENTION_MAX_BATCHES
+    archive = settings.NOTIFICATION_RETENTION_ARCHIVE
+    cutoff = timezone.now() - timezone.timedelta(days=retention_days)
+
+    started = time.monotonic()
+    moved = batches = 0
+    while batches < max_batches:
+        count = archive_notifications(cutoff, batch_size, archive=archive)
+        if not count:
+            break
+        moved += count
+        batches += 1
+
+    result = {
+        "moved": moved,
+        "batches": batches,
+        "pending": batches >= max_batches and retention_candidates(cutoff).exists(),
+        "seconds": round(time.monotonic() - started, 3),
+    }
+    logger.info(
+        "Retención de notificaciones: %s %s en %s lotes (%.3fs)%s",
+        result["moved"],
+        "archivadas" if archive else "borradas",
+        result["batches"],
+        result["seconds"],
+        ", quedan filas pendientes" if result["pending"] else "",
+    )
+    return result
+
+
+def _day_start(day):
+    """Inicio (00:00 en la zona horaria actual) del día indicado."""
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+@shared_task
+def compact_rating_history(retention_days=None, batch_size=None):
+    """Resume por día el historial de MMR y borra las entradas antiguas.
+
+    - Agrupa por jugador y día las entradas de `RatingHistory` de los días ya cerrados
+      (anteriores a hoy) que aún no tienen resumen, y guarda un `RatingSnapshot` por
+      grupo (MMR de apertura, cierre, mínimo y máximo, posición al cierre y partidos).
+      Apertura y cierre siguen el orden de inserción de las entradas.
+    - Borra, en lotes de `batch_size` filas (`settings.RATING_HISTORY_BATCH_SIZE`), las
+      entradas con más de `retention_days` días (`settings.RATING_HISTORY_RETENTION_DAYS`),
+      que ya están resumidas.
+    - Es idempotente: volver a ejecutarla el mismo día no cambia nada.
+
+    Args:
+        retention_days (int, optional): Días que se conservan las entradas detalladas.
+        batch_size (int, optional): Grupos o filas procesados por lote.
+
+    Returns:
+        dict: Resúmenes guardados y entradas borradas.
+    """
+    retention_days = retention_days or settings.RATING_HISTORY_RETENTION_DAYS
+    batch_size = batch_size or settings.RATING_HISTORY_BATCH_SIZE
+    today = timezone.localdate()
+
+    history = RatingHistory.objects.filter(created_at__lt=_day_start(today))
+    last_day = RatingSnapshot.objects.aggregate(last=Max("date"))["last"]
+    if last_day is not None:
+        history = history.filter(created_at__gte=_day_start(last_day + timezone.timedelta(days=1)))
+
+    groups = (
+        history.annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values("player_id", "day")
+        .annotate(
+            first_id=Min("id"),
+            last_id=Max("id"),
+            mmr_min=Min("mmr"),
+            mmr_max=Max("mmr"),
+            matches=Count("id"),
+        )
+    )
+
+    saved = 0
+    batch = []
+    for group in groups.iterator(chunk_size=batch_size):
+        batch.append(group)
+        if len(batch) >= batch_size:
+            saved += _save_snapshots(batch)
+            batch = []
+    if batch:
+        saved += _save_snapshots(batch)
+
+    cutoff = _day_start(today - timezone.timedelta(days=retention_days))
+    deleted = 0
+    while True:
+        ids = list(
+            RatingHistory.objects.filter(created_at__lt=cutoff)
+            .order_by()
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted += RatingHistory.objects.filter(pk__in=ids).delete()[0]
+
+    logger.info("Historial de MMR: %s resúmenes diarios, %s entradas borradas", saved, deleted)
+    return {"snapshots": saved, "deleted": deleted}
+
+
+def _save_snapshots(groups):
+    """Guarda los resúmenes diarios de un lote de grupos de `compact_rating_history`."""
+    ends = {
+        pk: (mmr, rank)
+        for pk, mmr, rank in RatingHistory.objects.filter(
+            pk__in=[g["first_id"] for g in groups] + [g["last_id"] for g in groups]
+        ).values_list("pk", "mmr", "rank")
+    }
+    snapshots = [
+        RatingSnapshot(
+            player_id=g["player_id"],
+            date=g["day"],
+            mmr_open=ends[g["first_id"]][0],
+            mmr_close=ends[g["last_id"]][0],
+            mmr_min=g["mmr_min"],
+            mmr_max=g["mmr_max"],
+            rank=ends[g["last_id"]][1],
+            matches=g["matches"],
+        )
+        for g in groups
+    ]
+    RatingSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=["player", "date"],
+        update_fields=["mmr_open", "mmr_close", "mmr_min", "mmr_max", "rank", "matches"],
+    )
+    return len(snapshots)
@@ -0,0 +1,134 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from ..models import *
+from ..bracket import bracket_order
+from ..functions import advance_tournament, generate_matches_by_mmr, record_match_result
+from ..seeding import annotate_team_mmr, seed_pairs
+
+
+class BracketTests(TestCase):
+    """
+    Pruebas para el cuadro de eliminatorias precalculado.
+
+    Verifica la generación del cuadro con pases directos para números de equipos
+    que no son potencia de dos y el avance de los ganadores a la casilla siguiente.
+    """
+
+    def setUp(self):
+        """
+        Crea un torneo en curso con seis equipos de un jugador con MMR creciente.
+        """
+        self.game = Game.objects.create(name="Test Game")
+        self.tournament = Tournament.objects.create(
+            name="Test Tournament",
+            game=self.game,
+            start_date=timezone.now(),
+            status="ongoing",
+            max_teams=6,
+        )
+        self.teams = []
+        for i in range(6):
+            team = Team.objects.create(name=f"Team {i}")
+            Player.objects.create(
+                user=User.objects.create_user(username=f"player{i}"), team=team, mmr=100 + i
+            )
+            TournamentTeam.objects.create(tournament=self.tournament, team=team)
+            self.teams.append(team)
+
+    def play(self, match):
+        """Registra la victoria del primer equipo del partido."""
+        record_match_result(match, match.team1, 1, 0)
+
+    def test_bracket_order(self):
+        """Las mejores cabezas de serie quedan en mitades opuestas del cuadro."""
+        self.assertEqual(bracket_order(8), [0, 7, 3, 4, 1, 6, 2, 5])
+
+    def test_seed_pairs_gives_byes_to_best_teams(self):
+        """Con seis equipos los dos mejores pasan directamente y no se cruzan en segunda ronda."""
+        pairs = seed_pairs(list(reversed(self.teams)), strategy="adjacent")
+
+        self.assertEqual(len(pairs), 4)
+        self.assertEqual(pairs[0], (self.teams[5], None))
+        self.assertEqual(pairs[2], (self.teams[4], None))
+
+    def test_seed_pairs_snake(self):
+        """Con el cuadro clásico la mejor cabeza de serie se enfrenta a la peor."""
+        teams = list(reversed(self.teams[2:]))
+
+        self.assertEqual(
+            seed_pairs(teams, strategy="snake"),
+            [(teams[0], teams[3]), (teams[1], teams[2])],
+        )
+        with self.assertRaises(ValueError):
+            seed_pairs(teams, strategy="random")
+
+    def test_annotate_team_mmr_single_query(self):
+        """El MMR medio de todos los equipos se obtiene con una única consulta."""
+        with self.assertNumQueries(1):
+            seeded = list(
+                annotate_team_mmr(TournamentTeam.objects.filter(tournament=self.tournament))
+            )
+
+        self.assertEqual([tt.team for tt in seeded], list(reversed(self.teams)))
+        self.assertEqual(seeded[0].avg_mmr, 105)
+        self.assertEqual(seeded[0].num_players, 1)
+
+    def test_generate_builds_full_bracket(self):
+        """Se generan todas las casillas y solo los partidos con ambos equipos conocidos."""
+        generate_matches_by_mmr(self.tournament.id)
+
+        self.tournament.refresh_from_db()
+        self.assertTrue(self.tournament.matches_generated)
+        self.assertEqual(BracketSlot.objects.filter(tournament=self.tournament).count(), 7)
+        self.assertEqual(Match.objects.filter(tournament=self.tournament, round=1).count(), 2)
+        self.assertEqual(
+            set(BracketSlot.objects.filter(round=2).values_list("team1", flat=True).distinct()),
+            {self.teams[5].id, self.teams[4].id},
+        )
+
+    def test_generate_is_constant_number_of_queries(self):
+        """La ronda se crea con un número fijo de consultas y un log "Ronda creada" por partido."""
+        for i in range(6, 32):
+            team = Team.objects.create(name=f"Team {i}")
+            Player.objects.create(user=User.objects.create_user(username=f"extra{i}"), team=team)
+            TournamentTeam.objects.create(tournament=self.tournament, team=team)
+
+        with self.assertNumQueries(18):
+            generate_matches_by_mmr(self.tournament.id)
+
+        self.assertEqual(Match.objects.filter(round=1).count(), 16)
+        logs = MatchLog.objects.filter(event_type=MatchLog.ROUND_CREATED).select_related(
+            "match__team1", "match__team2"
+        )
+        self.assertEqual(len(logs), 16)
+        self.assertEqual({log.text for log in logs}, {"Ronda 1 creada"})
+
+    def test_winners_fill_next_slot_until_final(self):
+        """Cada resultado coloca al ganador en su casilla y la final cierra el torneo."""
+        generate_matches_by_mmr(self.tournament.id)
+
+        for match in Match.objects.filter(round=1):
+            self.play(match)
+        self.assertEqual(Match.objects.filter(round=2).count(), 2)
+        self.assertIsNone(advance_tournament(self.tournament))
+
+        for match in Match.objects.filter(round=2):
+            self.play(match)
+        final = Match.objects.get(round=3)
+        self.play(final)
+
+        self.assertEqual(advance_tournament(self.tournament), "final")
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.status, "completed")
+        self.assertEqual(self.tournament.winner, final.team1)
+
+    def test_invalid_max_teams(self):
+        """El número de equipos permitido va de 2 a MAX_BRACKET_TEAMS."""
+        self.tournament.start_date = timezone.now() + timezone.timedelta(days=1)
+        self.tournament.max_teams = 6
+        self.tournament.clean()
+
+        self.tournament.max_teams = MAX_BRACKET_TEAMS + 1
+        with self.assertRaises(ValidationError):
+            self.tournament.clean()
@@ -0,0 +1,315 @@
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from unittest.mock import patch
+from ..models import *
+from ..functions import (
+    UNREAD_COUNT_CACHE_KEY,
+    adjust_unread_count,
+    check_cache_settings,
+    create_notification,
+    fan_out_notification,
+    generate_matches_by_mmr,
+    get_staff_recipients,
+    get_unread_count,
+    notify_staff,
+    update_match_stats,
+    update_teams_renombre,
+)
+from ..tasks import process_notification_queue
+
+
+@override_settings(RATING_ENGINE="fixed")
+class UpdateMatchStatsTests(TestCase):
+    """
+    Pruebas para la actualización en bloque de estadísticas de jugadores.
+
+    Verifica que partidas, victorias, winrate, MMR y renombre se actualizan
+    correctamente y que el número de consultas no depende del tamaño de los equipos.
+    Usa el motor de cambios fijos para que el MMR esperado no dependa del rival.
+    """
+
+    def setUp(self):
+        """
+        Crea un torneo con dos equipos de cinco jugadores y un partido entre ellos.
+        """
+        self.game = Game.objects.create(name="Test Game")
+        self.tournament = Tournament.objects.create(
+            name="Test Tournament", game=self.game, start_date=timezone.now() + timedelta(days=1)
+        )
+        self.team1 = Team.objects.create(name="Team One")
+        self.team2 = Team.objects.create(name="Team Two")
+        for i in range(5):
+            Player.objects.create(
+                user=User.objects.create_user(username=f"t1_player{i}"),
+                team=self.team1,
+                games_played=3,
+                games_won=1,
+                mmr=50,
+                renombre=98,
+            )
+            Player.objects.create(
+                user=User.objects.create_user(username=f"t2_player{i}"),
+                team=self.team2,
+                games_played=3,
+                games_won=1,
+                mmr=12,
+                renombre=50,
+            )
+        self.match = Match.objects.create(
+            tournament=self.tournament,
+            round=1,
+            team1=self.team1,
+            team2=self.team2,
+            scheduled_at=timezone.now(),
+        )
+
+    def test_winner_stats(self):
+        """Los ganadores suman partida, victoria, 10 de MMR y 5 de renombre (máximo 100)."""
+        update_match_stats(self.team1, self.team2)
+
+        for player in self.team1.player_set.all():
+            self.assertEqual(player.games_played, 4)
+            self.assertEqual(player.games_won, 2)
+            self.assertAlmostEqual(player.winrate, 50.0)
+            self.assertEqual(player.mmr, 60)
+            self.assertEqual(player.renombre, 100)
+
+    def test_loser_stats(self):
+        """Los perdedores suman partida, pierden 5 de MMR sin bajar de 10 y mantienen renombre."""
+        update_match_stats(self.team1, self.team2)
+
+        for player in self.team2.player_set.all():
+            self.assertEqual(player.games_played, 4)
+            self.assertEqual(player.games_won, 1)
+            self.assertAlmostEqual(player.winrate, 25.0)
+            self.assertEqual(player.mmr, 10)
+            self.assertEqual(player.renombre, 50)
+
+    def test_constant_number_of_queries(self):
+        """La actualización de los dos equipos no lanza una consulta por jugador."""
+        with CaptureQueriesContext(connection) as ctx:
+            update_match_stats(self.team1, self.team2, match=self.match)
+
+        # Lectura de las plantillas, UPDATE en bloque, logs de renombre, posiciones en la
+        # clasificación (sin Redis, dos consultas) e historial de MMR (más savepoints)
+        self.assertLessEqual(len(ctx.captured_queries), 8)
+        self.assertEqual(
+            MatchLog.objects.filter(
+                match=self.match, team=self.team1, player__isnull=False
+            ).count(),
+            5,
+        )
+
+    def test_update_teams_renombre_is_clamped(self):
+        """El ajuste de renombre por equipos respeta los límites 1 y 100."""
+        update_teams_renombre(
+            [self.team1, self.team2], amount=-60, reason="Prueba", match=self.match
+        )
+
+        self.assertEqual(set(self.team1.player_set.values_list("renombre", flat=True)), {38})
+        self.assertEqual(set(self.team2.player_set.values_list("renombre", flat=True)), {1})
+        self.assertEqual(MatchLog.objects.filter(match=self.match).count(), 10)
+
+
+class CancelTournamentTests(TestCase):
+    """
+    Pruebas para la cancelación de torneos al generar los partidos.
+
+    Verifica que los avisos se encolan como notificaciones en lugar de enviarse
+    por correo de forma síncrona.
+    """
+
+    def setUp(self):
+        """
+        Crea un torneo de dos jugadores por equipo con dos equipos incompletos.
+        """
+        self.game = Game.objects.create(name="Test Game")
+        self.tournament = Tournament.objects.create(
+            name="Test Tournament",
+            game=self.game,
+            start_date=timezone.now(),
+            max_player_per_team=2,
+        )
+        for i in range(2):
+            team = Team.objects.create(name=f"Team {i}")
+            Player.objects.create(
+                user=User.objects.create_user(username=f"cancel{i}", email=f"cancel{i}@a.com"),
+                team=team,
+            )
+            TournamentTeam.objects.create(tournament=self.tournament, team=team)
+
+    def test_cancellation_queues_notifications(self):
+        """Cancelar un torneo encola un aviso por jugador y no envía correos síncronos."""
+        generate_matches_by_mmr(self.tournament.id)
+
+        self.assertFalse(Tournament.objects.filter(pk=self.tournament.pk).exists())
+        self.assertEqual(len(mail.outbox), 0)
+        notifications = Notification.objects.filter(title="Torneo Cancelado")
+        self.assertEqual(notifications.count(), 2)
+        self.assertTrue(all(n.send_email and n.status == "pending" for n in notifications))
+
+        process_notification_queue()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(notifications.filter(status="sent").count(), 2)
+
+
+class BulkNotificationTests(TestCase):
+    """
+    Pruebas para la creación de notificaciones en bloque.
+
+    Verifica que el número de consultas no depende del número de destinatarios.
+    """
+
+    def setUp(self):
+        """
+        Crea diez usuarios destinatarios.
+        """
+        self.users = [User.objects.create_user(username=f"bulk{i}") for i in range(10)]
+
+    def test_create_notification_includes_owner(self):
+        """El propietario siempre figura entre los destinatarios de la notificación."""
+        notification = create_notification(
+            self.users[0], title="Hola", recipient_users=self.users[1:3]
+        )
+
+        self.assertEqual(set(notification.recipient_users.all()), set(self.users[:3]))
+
+    def test_fan_out_constant_number_of_queries(self):
+        """Se crea una notificación por usuario con un número fijo de consultas."""
+        with CaptureQueriesContext(connection) as ctx:
+            fan_out_notification(self.users, title="Aviso", message="Mensaje", urgency=4)
+
+        self.assertLessEqual(len(ctx.captured_queries), 4)
+        self.assertEqual(Notification.objects.filter(title="Aviso", urgency=4).count(), 10)
+        self.assertEqual(
+            set(Notification.objects.values_list("user", flat=True)), {u.pk for u in self.users}
+        )
+
+
+class StaffRecipientsTests(TestCase):
+    """
+    Pruebas para la lista de staff en caché usada por las alertas internas.
+    """
+
+    def setUp(self):
+        """
+        Vacía la caché y crea dos miembros del staff y un usuario normal.
+        """
+        cache.clear()
+        self.staff = [
+            User.objects.create_user(username=f"staff{i}", is_staff=True) for i in range(2)
+        ]
+        User.objects.create_user(username="regular")
+
+    def staff_ids(self):
+        """IDs de todos los miembros del staff (incluidos los de los datos iniciales)."""
+        return set(User.objects.filter(is_staff=True).values_list("pk", flat=True))
+
+    def test_staff_recipients_are_cached(self):
+        """Tras la primera llamada la lista de staff no consulta la base de datos."""
+        get_staff_recipients()
+
+        with self.assertNumQueries(0):
+            recipients = get_staff_recipients()
+        self.assertEqual({u.pk for u in recipients}, self.staff_ids())
+
+    def test_user_changes_invalidate_cache(self):
+        """Guardar o eliminar un usuario invalida la lista en caché."""
+        get_staff_recipients()
+        new_staff = User.objects.create_user(username="staff_new", is_staff=True)
+        self.assertIn(new_staff.pk, {u.pk for u in get_staff_recipients()})
+
+        new_staff.delete()
+        self.assertNotIn(new_staff.pk, {u.pk for u in get_staff_recipients()})
+
+    @override_settings(
+        DEBUG=False,
+        TESTING=False,
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    )
+    def test_production_requires_shared_cache(self):
+        """Fuera de DEBUG y de las pruebas no se arranca con la caché en memoria del proceso."""
+        with self.assertRaises(ImproperlyConfigured):
+            check_cache_settings()
+
+    def test_notify_staff_creates_one_notification_per_member(self):
+        """Cada miembro del staff recibe su propia alerta."""
+        notify_staff(title="Alerta", message="Mensaje", urgency=4)
+
+        self.assertEqual(
+            set(Notification.objects.filter(title="Alerta").values_list("user", flat=True)),
+            self.staff_ids(),
+        )
+
+
+class UnreadCountTests(TestCase):
+    """
+    Pruebas para el contador de notificaciones sin leer mantenido en caché.
+    """
+
+    def setUp(self):
+        """
+        Vacía la caché y crea un usuario con una notificación sin leer.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="unread", password="testpass")
+        create_notification(self.user, title="Primera", message="Mensaje")
+
+    def test_counter_is_computed_once(self):
+        """El COUNT solo se ejecuta cuando el contador no está en caché."""
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 1)
+
+    def test_counter_follows_creation_and_mark_read(self):
+        """Crear notificaciones incrementa el contador y marcarlas como leídas lo decrementa."""
+        get_unread_count(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            fan_out_notification([self.user, self.user], title="Nueva", message="Mensaje")
+        self.assertEqual(get_unread_count(self.user.pk), 3)
+
+        self.client.login(username="unread", password="testpass")
+        notification = Notification.objects.filter(user=self.user).first()
+        url = reverse("web:notification_mark_read_api", args=[notification.pk])
+        self.client.post(url)
+        self.client.post(url)
+
+        self.assertEqual(get_unread_count(self.user.pk), 2)
+        response = self.client.get(reverse("web:notification_unread_count_api"))
+        self.assertEqual(response.json(), {"unread_count": 2})
+
+    def test_increment_during_seed_is_not_counted_twice(self):
+        """Un incremento que llega mientras se cuenta no se suma al recuento, que ya lo incluye."""
+
+        def count_with_new_notification(queryset):
+            adjust_unread_count(self.user.pk, 1)
+            return 4
+
+        with patch.object(
+            QuerySet, "count", autospec=True, side_effect=count_with_new_notification
+        ):
+            self.assertEqual(get_unread_count(self.user.pk), 4)
+        self.assertEqual(get_unread_count(self.user.pk), 4)
+
+    def test_seed_keeps_counter_from_concurrent_seed(self):
+        """Si otro proceso siembra el contador mientras se cuenta, se usa su valor."""
+        key = UNREAD_COUNT_CACHE_KEY.format(user_id=self.user.pk)
+
+        def count_with_concurrent_seed(queryset):
+            cache.add(key, 3)
+            cache.incr(key, 1)
+            return 3
+
+        with patch.object(QuerySet, "count", autospec=True, side_effect=count_with_concurrent_seed):
+            self.assertEqual(get_unread_count(self.user.pk), 4)
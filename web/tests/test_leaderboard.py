@@ -0,0 +1,255 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from unittest.mock import patch
+from ..models import *
+from ..functions import update_match_stats
+from ..leaderboard import (
+    GLOBAL_BOARD,
+    RankedPlayers,
+    RedisLeaderboard,
+    check_leaderboard_settings,
+    country_board,
+    game_board,
+    get_leaderboard,
+    rebuild_leaderboard,
+)
+
+
+class StaleBoard:
+    """Clasificación mínima en memoria con la interfaz de `RedisLeaderboard`."""
+
+    def __init__(self, scores):
+        self.scores = {str(member): score for member, score in scores.items()}
+
+    def update(self, scores):
+        self.scores.update({str(member): score for member, score in scores.items()})
+
+    def remove(self, *members):
+        for member in members:
+            self.scores.pop(str(member), None)
+
+    def count(self):
+        return len(self.scores)
+
+    def page(self, start, stop):
+        ordered = sorted(self.scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        return ordered[start:stop]
+
+
+class FakeZsetClient:
+    """Cliente mínimo con la semántica de los ZSET de Redis, incluido el desempate."""
+
+    def __init__(self):
+        self.zsets = {}
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(
+            {member.encode(): score for member, score in mapping.items()}
+        )
+
+    def _descending(self, key):
+        # Mismo orden que ZREVRANGE: puntuación y, en los empates, miembro lexicográfico
+        return sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))[::-1]
+
+    def zrevrange(self, key, start, stop, withscores=False):
+        return self._descending(key)[start : stop + 1]
+
+    def zrevrank(self, key, member):
+        members = [m for m, _ in self._descending(key)]
+        return members.index(member.encode()) if member.encode() in members else None
+
+
+class LeaderboardTests(TestCase):
+    """
+    Pruebas para la clasificación de jugadores por MMR.
+
+    Verifica el orden y la paginación de la clasificación, su actualización al cambiar
+    el MMR y la corrección de entradas desfasadas.
+    """
+
+    def setUp(self):
+        """
+        Crea cinco jugadores con MMR creciente y reconstruye la clasificación.
+        """
+        self.team = Team.objects.create(name="Team")
+        self.players = [
+            Player.objects.create(
+                user=User.objects.create_user(username=f"ranked{i}", password="testpass"),
+                team=self.team if i == 0 else None,
+                mmr=100 + i * 10,
+            )
+            for i in range(5)
+        ]
+        Player.objects.exclude(pk__in=[p.pk for p in self.players]).delete()
+        rebuild_leaderboard()
+        self.board = get_leaderboard()
+        self.rival = Team.objects.create(name="Rival")
+
+    def test_database_leaderboard_rank_and_page(self):
+        """Sin Redis la posición y las páginas salen del MMR de la base de datos."""
+        self.assertEqual(self.board.rank(self.players[4].pk), 0)
+        self.assertEqual(self.board.rank(self.players[0].pk), 4)
+        self.assertIsNone(self.board.rank(999999))
+        self.assertEqual(
+            self.board.page(0, 2), [(str(self.players[4].pk), 140), (str(self.players[3].pk), 130)]
+        )
+
+        Player.objects.filter(pk=self.players[0].pk).update(mmr=500)
+        self.assertEqual(self.board.rank(self.players[0].pk), 0)
+        self.assertEqual(self.board.score(self.players[0].pk), 500)
+
+    def test_backends_break_ties_the_same_way(self):
+        """Con el mismo MMR, Redis y la base de datos ordenan igual aunque cambie el nº de cifras."""
+        for pk in (99999, 100000):
+            Player.objects.create(
+                pk=pk, user=User.objects.create_user(username=f"tied{pk}"), mmr=120
+            )
+        redis_board = RedisLeaderboard(GLOBAL_BOARD, FakeZsetClient())
+        redis_board.update(dict(Player.objects.values_list("pk", "mmr")))
+
+        self.assertEqual(redis_board.page(0, 10), self.board.page(0, 10))
+        for pk in (99999, 100000, self.players[2].pk):
+            self.assertEqual(redis_board.rank(pk), self.board.rank(pk))
+
+    @override_settings(DEBUG=False, TESTING=False, LEADERBOARD_REDIS_URL="")
+    def test_production_requires_redis(self):
+        """Fuera de DEBUG y de las pruebas no se arranca sin Redis para las clasificaciones."""
+        with self.assertRaises(ImproperlyConfigured):
+            check_leaderboard_settings()
+
+    def test_ranked_players_follow_leaderboard(self):
+        """Cada página devuelve los jugadores en el orden de la clasificación."""
+        ranked = RankedPlayers(self.board, Player.objects.all())
+
+        self.assertEqual(len(ranked), 5)
+        self.assertEqual(list(ranked[0:2]), [self.players[4], self.players[3]])
+        self.assertEqual(list(ranked[4:6]), [self.players[0]])
+
+    def test_stale_entries_are_repaired(self):
+        """Las entradas de jugadores borrados o con MMR desfasado se corrigen al leer la página."""
+        board = StaleBoard({player.pk: player.mmr for player in self.players})
+        board.update({999999: 1000})
+        Player.objects.filter(pk=self.players[0].pk).update(mmr=500)
+
+        page = list(RankedPlayers(board, Player.objects.all())[0:5])
+
+        self.assertEqual(page[0], self.players[0])
+        self.assertNotIn("999999", board.scores)
+        self.assertEqual(board.scores[str(self.players[0].pk)], 500)
+
+    @override_settings(RATING_ENGINE="fixed")
+    def test_match_result_updates_rank(self):
+        """Ganar un partido actualiza la posición del jugador en la clasificación."""
+        self.assertEqual(self.board.rank(self.players[0].pk), 4)
+
+        for _ in range(4):
+            update_match_stats(self.team, self.rival)
+
+        self.assertEqual(self.board.score(self.players[0].pk), 140)
+        self.assertEqual(self.board.rank(self.players[0].pk), 1)
+
+    @override_settings(RATING_ENGINE="fixed")
+    def test_scores_are_published_after_commit(self):
+        """Las clasificaciones solo reciben el MMR nuevo cuando se confirma la transacción."""
+        with patch("web.functions.update_player_scores") as mock_update_player_scores:
+            with self.captureOnCommitCallbacks() as callbacks:
+                update_match_stats(self.team, self.rival)
+            mock_update_player_scores.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+        mock_update_player_scores.assert_called_once()
+
+    def test_ranking_view_shows_my_rank(self):
+        """La vista de ranking indica la posición del jugador conectado."""
+        self.client.login(username="ranked1", password="testpass")
+
+        response = self.client.get(reverse("web:rankingView"))
+
+        self.assertEqual(response.context["my_rank"], 4)
+        self.assertEqual(response.context["my_page"], 1)
+        self.assertContains(response, "Tu posición: #4")
+
+
+class PartitionedLeaderboardTests(TestCase):
+    """
+    Pruebas para las clasificaciones por juego y por país.
+    """
+
+    def setUp(self):
+        """
+        Crea dos equipos de dos jugadores (uno de ellos de Argentina) que se enfrentan en
+        un torneo y reconstruye las clasificaciones.
+        """
+        self.game = Game.objects.create(name="Test Game")
+        self.tournament = Tournament.objects.create(
+            name="Test Tournament", game=self.game, start_date=timezone.now(), status="ongoing"
+        )
+        self.teams = [Team.objects.create(name=f"Team {i}") for i in range(2)]
+        self.players = [
+            Player.objects.create(
+                user=User.objects.create_user(username=f"board{i}", password="testpass"),
+                team=self.teams[i // 2],
+                mmr=100 + i * 10,
+                country="AR" if i == 0 else "ES",
+            )
+            for i in range(4)
+        ]
+        self.match = Match.objects.create(
+            tournament=self.tournament,
+            round=1,
+            team1=self.teams[0],
+            team2=self.teams[1],
+            scheduled_at=timezone.now(),
+        )
+        Player.objects.exclude(pk__in=[p.pk for p in self.players]).delete()
+        rebuild_leaderboard()
+
+    @override_settings(RATING_ENGINE="fixed")
+    def test_match_adds_players_to_game_board(self):
+        """Al completar un partido los jugadores entran en la clasificación del juego."""
+        board = get_leaderboard(game_board(self.game.pk))
+        self.assertIsNone(board.rank(self.players[0].pk))
+
+        Match.objects.filter(pk=self.match.pk).update(status="completed")
+        update_match_stats(self.teams[0], self.teams[1], match=self.match)
+
+        self.assertEqual(board.count(), 4)
+        self.assertEqual(board.score(self.players[0].pk), 110)
+        self.assertEqual(board.score(self.players[3].pk), 125)
+        self.assertEqual(board.rank(self.players[3].pk), 0)
+
+    def test_rebuild_derives_game_boards_from_history(self):
+        """La clasificación de cada juego incluye a los equipos con partidos completados."""
+        Match.objects.filter(pk=self.match.pk).update(status="completed")
+
+        rebuild_leaderboard()
+
+        board = get_leaderboard(game_board(self.game.pk))
+        self.assertEqual(board.count(), 4)
+        self.assertEqual(get_leaderboard(country_board("AR")).count(), 1)
+        self.assertEqual(get_leaderboard(GLOBAL_BOARD).count(), 4)
+
+    def test_country_change_moves_player(self):
+        """Al cambiar de país el jugador pasa a la clasificación del nuevo país."""
+        player = self.players[1]
+        player.country = "AR"
+        player.save(update_fields=["country"])
+
+        self.assertIsNone(get_leaderboard(country_board("ES")).rank(player.pk))
+        self.assertEqual(get_leaderboard(country_board("AR")).rank(player.pk), 0)
+
+    def test_ranking_view_filters_by_country(self):
+        """La vista de ranking muestra solo los jugadores del país elegido."""
+        self.client.login(username="board0", password="testpass")
+
+        response = self.client.get(reverse("web:rankingView"), {"board": country_board("AR")})
+
+        self.assertEqual(list(response.context["ranking_list"]), [self.players[0]])
+        self.assertEqual(response.context["my_rank"], 1)
+
+        response = self.client.get(reverse("web:rankingView"), {"board": "game:abc"})
+        self.assertRedirects(response, reverse("web:rankingView"))
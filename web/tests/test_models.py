@@ -102,6 +102,61 @@ class ModelTests(TestCase):
         )
         self.assertIn("Kill event", str(log))
 
+    def test_match_log_text_from_payload(self):
+        """El texto de los eventos estructurados se genera a partir de su tipo y sus datos."""
+        match = Match.objects.create(
+            tournament=self.tournament,
+            round=2,
+            team1=self.team1,
+            team2=self.team2,
+            scheduled_at=timezone.now() + timedelta(days=2),
+        )
+        confirmed = MatchLog.objects.create(
+            match=match,
+            team=self.team2,
+            event_type=MatchLog.RESULT_CONFIRMED,
+            payload={"team1_score": 1, "team2_score": 3},
+        )
+        completed = MatchLog(
+            match=match,
+            event_type=MatchLog.MATCH_COMPLETED,
+            payload={"winner_id": self.team2.pk, "team1_score": 1, "team2_score": 3},
+        )
+
+        self.assertEqual(
+            confirmed.text,
+            f"Equipo 2 ({self.team2.name}) ha confirmado el resultado. (1 - 3)",
+        )
+        self.assertEqual(
+            completed.text,
+            f"El partido ha sido completado. Ganador: {self.team2.name}. (1 - 3)",
+        )
+
+    def test_tournament_with_progress(self):
+        """Verifica que `with_progress` anota equipos, jugadores y partidos por estado en una consulta."""
+        Player.objects.create(user=self.user, team=self.team1)
+        Player.objects.create(user=User.objects.create_user(username="other"), team=self.team2)
+        TournamentTeam.objects.create(tournament=self.tournament, team=self.team1)
+        TournamentTeam.objects.create(tournament=self.tournament, team=self.team2)
+        for status in ("completed", "completed", "ongoing", "pending"):
+            Match.objects.create(
+                tournament=self.tournament,
+                round=1,
+                team1=self.team1,
+                team2=self.team2,
+                status=status,
+                scheduled_at=timezone.now(),
+            )
+
+        with self.assertNumQueries(1):
+            tournament = Tournament.objects.with_progress().get(pk=self.tournament.pk)
+
+        self.assertEqual(tournament.total_matches, 4)
+        self.assertEqual(tournament.ongoing_matches, 1)
+        self.assertEqual(tournament.completed_matches, 2)
+        self.assertEqual(tournament.registered_teams, 2)
+        self.assertEqual(tournament.count_registered_players(), 2)
+
     def test_reward_creation(self):
         """Crea una recompensa y verifica su representación textual con nombre y coste en monedas."""
         reward = Reward.objects.create(name="Camisa", coins_cost=300, stock=10)
@@ -0,0 +1,215 @@
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+from ..models import *
+from ..functions import update_match_stats
+from ..leaderboard import get_leaderboard, rebuild_leaderboard
+from ..rating import rate_match, recompute_ratings
+from ..tasks import compact_rating_history
+
+
+class RatingHistoryTests(TestCase):
+    """
+    Pruebas para el historial de MMR y posición de los jugadores.
+
+    Verifica la escritura del historial al actualizar las estadísticas, su compactación
+    diaria y la API con la curva de MMR de un jugador.
+    """
+
+    def setUp(self):
+        """
+        Crea dos equipos de un jugador y un partido entre ellos.
+        """
+        game = Game.objects.create(name="Test Game")
+        tournament = Tournament.objects.create(
+            name="Test Tournament", game=game, start_date=timezone.now(), status="ongoing"
+        )
+        self.teams = [Team.objects.create(name=f"Team {i}") for i in range(2)]
+        self.players = [
+            Player.objects.create(
+                user=User.objects.create_user(username=f"rated{i}", password="testpass"),
+                team=self.teams[i],
+                mmr=100,
+            )
+            for i in range(2)
+        ]
+        self.match = Match.objects.create(
+            tournament=tournament,
+            round=1,
+            team1=self.teams[0],
+            team2=self.teams[1],
+            scheduled_at=timezone.now(),
+        )
+        Player.objects.exclude(pk__in=[p.pk for p in self.players]).delete()
+        rebuild_leaderboard()
+
+    def add_history(self, player, mmr, created_at, rank=None):
+        """Crea una entrada de historial en la fecha indicada."""
+        return RatingHistory.objects.create(
+            player=player, mmr=mmr, rank=rank, created_at=created_at
+        )
+
+    @override_settings(RATING_ENGINE="fixed")
+    def test_stats_update_writes_history(self):
+        """Cada actualización de estadísticas anota el nuevo MMR y la posición del jugador."""
+        with self.captureOnCommitCallbacks(execute=True):
+            update_match_stats(self.teams[0], self.teams[1], match=self.match)
+
+        winner = RatingHistory.objects.get(player=self.players[0])
+        loser = RatingHistory.objects.get(player=self.players[1])
+        self.assertEqual((winner.mmr, winner.rank, winner.match), (110, 1, self.match))
+        self.assertEqual((loser.mmr, loser.rank), (95, 2))
+
+    def test_compaction_builds_daily_snapshots(self):
+        """Los días cerrados se resumen y las entradas fuera del periodo de retención se borran."""
+        player = self.players[0]
+        old_day = timezone.now() - timedelta(days=40)
+        yesterday = timezone.now() - timedelta(days=1)
+        self.add_history(player, 100, old_day)
+        self.add_history(player, 110, yesterday.replace(hour=10), rank=3)
+        self.add_history(player, 105, yesterday.replace(hour=11), rank=4)
+        self.add_history(player, 120, yesterday.replace(hour=12), rank=2)
+        today = self.add_history(player, 130, timezone.now())
+
+        result = compact_rating_history(retention_days=30)
+
+        self.assertEqual(result, {"snapshots": 2, "deleted": 1})
+        snapshot = RatingSnapshot.objects.get(player=player, date=timezone.localdate(yesterday))
+        self.assertEqual(
+            (snapshot.mmr_open, snapshot.mmr_close, snapshot.mmr_min, snapshot.mmr_max),
+            (110, 120, 105, 120),
+        )
+        self.assertEqual((snapshot.rank, snapshot.matches), (2, 3))
+        self.assertTrue(RatingHistory.objects.filter(pk=today.pk).exists())
+
+        # Una segunda ejecución no vuelve a resumir los mismos días
+        self.assertEqual(compact_rating_history(retention_days=30), {"snapshots": 0, "deleted": 0})
+
+    def test_rating_history_api(self):
+        """La API combina los resúmenes diarios con las entradas aún sin resumir."""
+        player = self.players[0]
+        self.add_history(player, 110, timezone.now() - timedelta(days=2))
+        self.add_history(player, 120, timezone.now())
+        compact_rating_history()
+        self.client.login(username="rated1", password="testpass")
+
+        response = self.client.get(reverse("web:player_rating_history_api", args=[player.pk]))
+
+        data = response.json()
+        self.assertEqual([s["mmr_close"] for s in data["snapshots"]], [110])
+        self.assertEqual([h["mmr"] for h in data["recent"]], [120])
+
+        response = self.client.get(
+            reverse("web:player_rating_history_api", args=[player.pk]), {"days": "x"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class RatingEngineTests(TestCase):
+    """
+    Pruebas para los motores de valoración y la actualización de los dos equipos de un
+    partido.
+    """
+
+    def setUp(self):
+        """
+        Crea dos equipos de dos jugadores, uno con más MMR que el otro, y un partido.
+        """
+        game = Game.objects.create(name="Test Game")
+        tournament = Tournament.objects.create(
+            name="Test Tournament", game=game, start_date=timezone.now(), status="ongoing"
+        )
+        self.strong, self.weak = [Team.objects.create(name=f"Team {i}") for i in range(2)]
+        self.players = [
+            Player.objects.create(
+                user=User.objects.create_user(username=f"engine{i}", password="testpass"),
+                team=self.strong if i < 2 else self.weak,
+                mmr=300 if i < 2 else 100,
+            )
+            for i in range(4)
+        ]
+        self.match = Match.objects.create(
+            tournament=tournament,
+            round=1,
+            team1=self.strong,
+            team2=self.weak,
+            scheduled_at=timezone.now(),
+        )
+        Player.objects.exclude(pk__in=[p.pk for p in self.players]).delete()
+        rebuild_leaderboard()
+
+    def test_elo_rewards_upsets(self):
+        """Con Elo, ganar a un rival más fuerte suma más que ganar a uno más débil."""
+        strong, weak = [(300, 350.0, 0.06)], [(100, 350.0, 0.06)]
+
+        favourite, _ = rate_match(strong, weak, "elo")
+        underdog, beaten = rate_match(weak, strong, "elo")
+
+        self.assertGreater(underdog.mmr[0] - 100, favourite.mmr[0] - 300)
+        self.assertLess(beaten.mmr[0], 300)
+
+    def test_glicko2_reduces_deviation(self):
+        """Con Glicko-2 cada partido reduce la incertidumbre de la valoración."""
+        winners, losers = rate_match([(200, 350.0, 0.06)], [(200, 350.0, 0.06)], "glicko2")
+
+        self.assertGreater(winners.mmr[0], 200)
+        self.assertLess(losers.mmr[0], 200)
+        self.assertLess(winners.deviation[0], 350.0)
+        self.assertLess(losers.deviation[0], 350.0)
+
+    def test_unknown_engine(self):
+        """Un motor desconocido produce un error."""
+        with self.assertRaises(ValueError):
+            rate_match([(100, 350.0, 0.06)], [(100, 350.0, 0.06)], "trueskill")
+
+    def test_match_stats_update_both_teams(self):
+        """Los jugadores de los dos equipos se actualizan con el motor configurado."""
+        with self.settings(RATING_ENGINE="elo", RATING_ELO_K_FACTOR=20.0):
+            with self.captureOnCommitCallbacks(execute=True):
+                updated = update_match_stats(self.weak, self.strong, match=self.match)
+
+        self.assertEqual(updated, 4)
+        winner, loser = Player.objects.get(pk=self.players[2].pk), Player.objects.get(
+            pk=self.players[0].pk
+        )
+        self.assertEqual((winner.mmr, winner.games_won, winner.winrate), (115, 1, 100.0))
+        self.assertEqual((loser.mmr, loser.games_played, loser.winrate), (285, 1, 0.0))
+        self.assertEqual(winner.renombre, min(self.players[2].renombre + 5, 100))
+        self.assertEqual(RatingHistory.objects.filter(match=self.match).count(), 4)
+        self.assertEqual(get_leaderboard().score(winner.pk), 115)
+
+    def test_recompute_replays_results(self):
+        """El recálculo completo parte de los valores por defecto y aplica los resultados."""
+        MatchResult.objects.create(
+            match=self.match, winner=self.strong, team1_score=1, team2_score=0
+        )
+
+        with self.settings(RATING_ENGINE="fixed"):
+            self.assertEqual(recompute_ratings(), 1)
+
+        default = Player._meta.get_field("mmr").default
+        self.assertEqual(Player.objects.get(pk=self.players[0].pk).mmr, default + 10)
+        self.assertEqual(Player.objects.get(pk=self.players[2].pk).mmr, max(default - 5, 10))
+
+    def test_replay_command_rebuilds_stats(self):
+        """El comando reproduce los resultados, incluido el renombre, y actualiza el ranking."""
+        self.match.team1_confirmed = self.match.team2_confirmed = True
+        self.match.save()
+        MatchResult.objects.create(match=self.match, winner=self.weak, team1_score=0, team2_score=1)
+        Player.objects.update(games_played=7, games_won=7, renombre=90)
+
+        out = StringIO()
+        call_command("replay_ratings", engine="fixed", renombre=True, chunk_size=1, stdout=out)
+
+        self.assertIn("1 resultados aplicados a 4 jugadores", out.getvalue())
+        winner = Player.objects.get(pk=self.players[2].pk)
+        loser = Player.objects.get(pk=self.players[0].pk)
+        self.assertEqual((winner.games_played, winner.games_won, winner.winrate), (1, 1, 100.0))
+        self.assertEqual((loser.games_played, loser.games_won, loser.winrate), (1, 0, 0.0))
+        # Victoria (+5) y participación (+5) sobre el valor por defecto (50)
+        self.assertEqual((winner.renombre, loser.renombre), (60, 55))
+        self.assertEqual(get_leaderboard().score(winner.pk), 60)
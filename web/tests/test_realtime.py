@@ -0,0 +1,132 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from unittest.mock import MagicMock, patch
+from ..models import *
+from ..functions import create_notification
+from ..realtime import (
+    LocalBroker,
+    RedisBroker,
+    check_realtime_settings,
+    get_broker,
+    stream_events,
+    wait_for_events,
+)
+import json
+
+
+class RealtimeNotificationTests(TestCase):
+    """
+    Pruebas para la entrega de notificaciones en tiempo real.
+
+    Verifica el canal de eventos en memoria, la publicación al crear notificaciones
+    y los endpoints de Server-Sent Events y consulta larga.
+    """
+
+    def setUp(self):
+        """
+        Crea un usuario con sesión iniciada.
+        """
+        self.user = User.objects.create_user(username="realtime", password="testpass")
+        self.client.login(username="realtime", password="testpass")
+
+    async def test_local_broker_delivers_only_to_subscribed_user(self):
+        """Cada suscripción recibe solo los eventos de su usuario."""
+        broker = LocalBroker()
+        with broker.subscribe(1) as first, broker.subscribe(2) as second:
+            broker.publish(1, {"type": "notification", "id": 10})
+
+            self.assertEqual(await first.get(timeout=0), {"type": "notification", "id": 10})
+            self.assertIsNone(await second.get(timeout=0))
+
+    async def test_redis_broker_shares_one_subscriber(self):
+        """Un único suscriptor de Redis reparte cada mensaje entre las conexiones del usuario."""
+        event = {"type": "notification", "id": 10}
+        client = MagicMock()
+        client.pubsub.return_value.listen.return_value = [
+            {"type": "pmessage", "channel": b"web:notifications:7", "data": json.dumps(event)},
+            {"type": "pmessage", "channel": b"web:notifications:8", "data": json.dumps(event)},
+        ]
+        broker = RedisBroker(client)
+
+        with patch.object(broker, "_ensure_listener"):
+            with broker.subscribe(7) as first, broker.subscribe(7) as second:
+                broker._consume()
+
+                self.assertEqual(await first.get(timeout=0), event)
+                self.assertEqual(await second.get(timeout=0), event)
+                self.assertIsNone(await first.get(timeout=0))
+
+        client.pubsub.assert_called_once()
+        client.pubsub.return_value.psubscribe.assert_called_once_with("web:notifications:*")
+
+    @override_settings(DEBUG=False, TESTING=False, REALTIME_REDIS_URL="")
+    def test_production_requires_redis(self):
+        """Fuera de DEBUG y de las pruebas no se arranca sin Redis para los eventos."""
+        with self.assertRaises(ImproperlyConfigured):
+            check_realtime_settings()
+
+    async def test_notification_is_published_on_commit(self):
+        """Al confirmarse la creación de una notificación se publica un evento para su usuario."""
+
+        def create():
+            with self.captureOnCommitCallbacks(execute=True):
+                return create_notification(self.user, title="Hola", message="Mensaje")
+
+        with get_broker().subscribe(self.user.pk) as subscription:
+            notification = await sync_to_async(create)()
+            event = await subscription.get(timeout=1)
+
+        self.assertEqual(event["type"], "notification")
+        self.assertEqual(event["id"], notification.pk)
+
+    async def test_stream_sends_events(self):
+        """El flujo SSE reenvía los eventos y envía latidos mientras no hay ninguno."""
+        stream = stream_events(self.user.pk, duration=5, heartbeat=0.01)
+        self.assertEqual(await anext(stream), "retry: 3000\n\n")
+        self.assertEqual(await anext(stream), ": ping\n\n")
+
+        get_broker().publish(self.user.pk, {"type": "read", "id": 3})
+        self.assertEqual(await anext(stream), 'event: read\ndata: {"type": "read", "id": 3}\n\n')
+        await stream.aclose()
+
+    def test_stream_requires_login(self):
+        """El flujo SSE no está disponible sin sesión iniciada."""
+        self.client.logout()
+
+        response = self.client.get(reverse("web:notification_stream"))
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_long_poll_returns_empty_after_timeout(self):
+        """Sin eventos, la consulta larga devuelve una lista vacía al agotarse la espera."""
+        with self.settings(NOTIFICATION_LONG_POLL_SECONDS=0):
+            response = self.client.get(reverse("web:notification_poll_api"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"events": []})
+
+    def test_long_poll_requires_login(self):
+        """La consulta larga no está disponible sin sesión iniciada."""
+        self.client.logout()
+
+        response = self.client.get(reverse("web:notification_poll_api"))
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_mark_read_publishes_event(self):
+        """Marcar una notificación como leída avisa al resto de pestañas del usuario."""
+        notification = await sync_to_async(create_notification)(
+            self.user, title="Hola", message="Mensaje"
+        )
+        url = reverse("web:notification_mark_read_api", args=[notification.pk])
+
+        with get_broker().subscribe(self.user.pk) as subscription:
+            await sync_to_async(self.client.post)(url)
+            self.assertEqual(
+                await subscription.get(timeout=1), {"type": "read", "id": notification.pk}
+            )
+
+        self.assertEqual(await wait_for_events(self.user.pk, timeout=0), [])
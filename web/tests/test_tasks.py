@@ -0,0 +1,394 @@
+from django.contrib.auth.models import User
+from django.core import mail
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from unittest.mock import patch
+from ..models import *
+from ..functions import (
+    claim_notifications,
+    create_notification,
+    record_match_result,
+    start_ready_matches,
+)
+from ..mailer import retry_delay
+from ..tasks import (
+    advance_tournament_bracket,
+    archive_old_notifications,
+    check_teams_ready_for_match,
+    check_tournament_match_progress,
+    process_notification_queue,
+)
+
+
+class CheckTeamsReadyForMatchTests(TestCase):
+    """
+    Pruebas para la tarea periódica que inicia o finaliza los partidos pendientes.
+
+    Verifica el reparto en grupos (ambos listos, incomparecencia, aún no es la hora)
+    y el límite de partidos procesados por ejecución.
+    """
+
+    def setUp(self):
+        """
+        Crea un torneo con dos equipos de dos jugadores cada uno.
+        """
+        self.game = Game.objects.create(name="Test Game")
+        self.tournament = Tournament.objects.create(
+            name="Test Tournament", game=self.game, start_date=timezone.now()
+        )
+        self.team1 = Team.objects.create(name="Team One")
+        self.team2 = Team.objects.create(name="Team Two")
+        for i in range(2):
+            Player.objects.create(
+                user=User.objects.create_user(username=f"t1_player{i}", email=f"t1_{i}@a.com"),
+                team=self.team1,
+            )
+            Player.objects.create(
+                user=User.objects.create_user(username=f"t2_player{i}", email=f"t2_{i}@a.com"),
+                team=self.team2,
+            )
+
+    def create_match(self, minutes=0, **kwargs):
+        """Crea un partido pendiente programado dentro de `minutes` minutos."""
+        return Match.objects.create(
+            tournament=self.tournament,
+            round=1,
+            team1=self.team1,
+            team2=self.team2,
+            scheduled_at=timezone.now() + timedelta(minutes=minutes),
+            **kwargs,
+        )
+
+    def test_both_ready_starts_match(self):
+        """Si ambos equipos están listos el partido pasa a 'ongoing' y se notifica a todos."""
+        match = self.create_match(minutes=5, team1_ready=True, team2_ready=True)
+
+        result = check_teams_ready_for_match()
+
+        match.refresh_from_db()
+        self.assertEqual(match.status, "ongoing")
+        self.assertEqual(result, {"started": 1, "forfeited": 0})
+        self.assertEqual(Notification.objects.filter(match=match).count(), 4)
+        self.assertEqual(Notification.recipient_users.through.objects.count(), 4)
+
+    def test_start_skips_matches_no_longer_pending(self):
+        """Un partido que otro proceso ya ha resuelto no vuelve a 'ongoing' al iniciarse."""
+        match = self.create_match(minutes=5, team1_ready=True, team2_ready=True)
+        Match.objects.filter(pk=match.pk).update(status="completed")
+
+        start_ready_matches([match])
+
+        match.refresh_from_db()
+        self.assertEqual(match.status, "completed")
+        self.assertFalse(Notification.objects.filter(match=match).exists())
+
+    def test_forfeit_gives_win_to_ready_team(self):
+        """Si solo un equipo está listo gana ese equipo y el ausente pierde renombre."""
+        match = self.create_match(minutes=-1, team1_ready=True)
+
+        check_teams_ready_for_match()
+
+        match.refresh_from_db()
+        self.assertEqual(match.status, "completed")
+        self.assertEqual(match.winner, self.team1)
+        self.assertTrue(MatchResult.objects.filter(match=match, winner=self.team1).exists())
+        self.assertEqual(set(self.team2.player_set.values_list("renombre", flat=True)), {45})
+        self.assertEqual(set(self.team1.player_set.values_list("games_won", flat=True)), {1})
+
+    def test_forfeit_is_logged_as_structured_event(self):
+        """La incomparecencia se registra con su tipo y datos, y el texto se genera al leerla."""
+        match = self.create_match(minutes=-1, team1_ready=True)
+
+        check_teams_ready_for_match()
+
+        log = MatchLog.objects.get(match=match, event_type=MatchLog.FORFEIT)
+        self.assertEqual(log.payload["winner_id"], self.team1.pk)
+        self.assertEqual(log.payload["absent"], [self.team2.pk])
+        self.assertEqual(log.event, "")
+        self.assertEqual(
+            log.text,
+            "Partido finalizado automáticamente. Ganador: Team One "
+            "(Team Two no se ha presentado).",
+        )
+        renombre = MatchLog.objects.filter(match=match, event_type=MatchLog.RENOMBRE)
+        self.assertIn(
+            "Renombre reducido en 5 por: No se ha presentado", {log.text for log in renombre}
+        )
+
+    def test_forfeits_use_constant_number_of_queries(self):
+        """Resolver varias incomparecencias no lanza consultas por partido ni por jugador."""
+        self.create_match(minutes=-1, team1_ready=True)
+        with CaptureQueriesContext(connection) as single:
+            check_teams_ready_for_match()
+
+        for _ in range(4):
+            self.create_match(minutes=-1, team2_ready=True)
+        with CaptureQueriesContext(connection) as several:
+            result = check_teams_ready_for_match()
+
+        self.assertEqual(result["forfeited"], 4)
+        self.assertEqual(len(several.captured_queries), len(single.captured_queries))
+        # Una victoria (+5) y cuatro incomparecencias (-5 cada una) sobre 50 de renombre
+        self.assertEqual(set(self.team1.player_set.values_list("games_played", flat=True)), {5})
+        self.assertEqual(set(self.team1.player_set.values_list("renombre", flat=True)), {35})
+
+    def test_not_yet_due_is_untouched(self):
+        """Los partidos cuya hora aún no ha llegado siguen pendientes."""
+        match = self.create_match(minutes=5, team1_ready=True)
+
+        check_teams_ready_for_match()
+
+        match.refresh_from_db()
+        self.assertEqual(match.status, "pending")
+
+    def test_batch_size_caps_processed_matches(self):
+        """Cada ejecución procesa como máximo `batch_size` partidos por grupo."""
+        for _ in range(3):
+            self.create_match(minutes=-1)
+
+        result = check_teams_ready_for_match(batch_size=2)
+
+        self.assertEqual(result["forfeited"], 2)
+        self.assertEqual(Match.objects.filter(status="pending").count(), 1)
+
+
+class TournamentProgressTests(TestCase):
+    """
+    Pruebas para el avance del cuadro de los torneos.
+
+    Verifica el avance disparado al registrar un resultado y el barrido
+    periódico de reconciliación.
+    """
+
+    def setUp(self):
+        """
+        Crea un torneo en curso de cuatro equipos con un jugador cada uno.
+        """
+        self.game = Game.objects.create(name="Test Game")
+        self.tournament = Tournament.objects.create(
+            name="Test Tournament",
+            game=self.game,
+            start_date=timezone.now(),
+            status="ongoing",
+            max_teams=4,
+            matches_generated=True,
+        )
+        self.teams = []
+        for i in range(4):
+            team = Team.objects.create(name=f"Team {i}")
+            Player.objects.create(user=User.objects.create_user(username=f"player{i}"), team=team)
+            TournamentTeam.objects.create(tournament=self.tournament, team=team)
+            self.teams.append(team)
+
+    def create_match(self, round, team1, team2, winner=None):
+        """Crea un partido de la ronda indicada, completado si se indica ganador."""
+        return Match.objects.create(
+            tournament=self.tournament,
+            round=round,
+            team1=team1,
+            team2=team2,
+            winner=winner,
+            status="completed" if winner else "pending",
+            scheduled_at=timezone.now(),
+        )
+
+    @patch("web.tasks.advance_tournament_bracket.delay")
+    def test_record_match_result_enqueues_advance(self, mock_delay):
+        """Registrar un resultado encola el avance del torneo al confirmar la transacción."""
+        match = self.create_match(1, self.teams[0], self.teams[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_match_result(match, self.teams[0], 1, 0)
+
+        mock_delay.assert_called_once_with(self.tournament.id)
+
+    def test_reconciliation_generates_next_round(self):
+        """Con la primera ronda completada, el barrido genera la final."""
+        self.create_match(1, self.teams[0], self.teams[1], winner=self.teams[0])
+        self.create_match(1, self.teams[2], self.teams[3], winner=self.teams[3])
+
+        self.assertEqual(check_tournament_match_progress(), 1)
+
+        final = Match.objects.get(tournament=self.tournament, round=2)
+        self.assertEqual({final.team1, final.team2}, {self.teams[0], self.teams[3]})
+
+    def test_reconciliation_skips_rounds_in_progress(self):
+        """Si queda algún partido sin completar, el barrido no hace nada."""
+        self.create_match(1, self.teams[0], self.teams[1], winner=self.teams[0])
+        self.create_match(1, self.teams[2], self.teams[3])
+
+        self.assertEqual(check_tournament_match_progress(), 0)
+        self.assertFalse(Match.objects.filter(round=2).exists())
+
+    def test_advance_after_final_completes_tournament(self):
+        """Completada la final, el torneo se cierra con el ganador de la final."""
+        self.create_match(1, self.teams[0], self.teams[1], winner=self.teams[0])
+        self.create_match(1, self.teams[2], self.teams[3], winner=self.teams[3])
+        self.create_match(2, self.teams[0], self.teams[3], winner=self.teams[3])
+
+        self.assertEqual(advance_tournament_bracket(self.tournament.id), "final")
+
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.status, "completed")
+        self.assertEqual(self.tournament.winner, self.teams[3])
+        self.assertEqual(
+            Notification.objects.filter(tournament=self.tournament, send_email=True).count(), 1
+        )
+
+
+class ProcessNotificationQueueTests(TestCase):
+    """
+    Pruebas para el envío de la cola de notificaciones por correo.
+
+    Verifica el envío en paralelo por grupos, el límite por ejecución y la gestión
+    de reintentos cuando falla el servidor de correo.
+    """
+
+    def setUp(self):
+        """
+        Crea cinco notificaciones pendientes de envío por correo.
+        """
+        self.users = [
+            User.objects.create_user(username=f"notified{i}", email=f"notified{i}@a.com")
+            for i in range(5)
+        ]
+        for user in self.users:
+            create_notification(user, title="Aviso", message="Mensaje", send_email=True)
+
+    def test_sends_all_pending_notifications(self):
+        """Todas las notificaciones se envían y se marcan como enviadas en bloque."""
+        with self.settings(NOTIFICATION_SEND_CONCURRENCY=2):
+            result = process_notification_queue()
+
+        self.assertEqual(result, {"sent": 5, "failed": 0})
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(Notification.objects.filter(email_sent_at__isnull=True).exists())
+
+    def test_batch_size_caps_processed_notifications(self):
+        """Cada ejecución procesa como máximo `batch_size` notificaciones."""
+        process_notification_queue(batch_size=3)
+
+        self.assertEqual(Notification.objects.filter(status="sent").count(), 3)
+        self.assertEqual(Notification.objects.filter(status="pending").count(), 2)
+
+    @patch("web.mailer.get_connection")
+    def test_failed_delivery_is_retried(self, mock_get_connection):
+        """Si el envío falla la notificación suma un reintento y sigue pendiente."""
+        connection = mock_get_connection.return_value.__enter__.return_value
+        connection.send_messages.side_effect = ConnectionError("SMTP caído")
+
+        result = process_notification_queue()
+
+        self.assertEqual(result, {"sent": 0, "failed": 5})
+        self.assertEqual(
+            set(Notification.objects.values_list("status", "retries")), {("pending", 1)}
+        )
+        self.assertFalse(Notification.objects.filter(next_attempt_at__lte=timezone.now()).exists())
+
+    def test_only_due_notifications_are_processed(self):
+        """Las notificaciones con el siguiente intento programado en el futuro se omiten."""
+        Notification.objects.filter(user__in=self.users[:2]).update(
+            next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+
+        result = process_notification_queue()
+
+        self.assertEqual(result, {"sent": 3, "failed": 0})
+        self.assertEqual(Notification.objects.filter(status="pending").count(), 2)
+
+    def test_retry_delay_grows_exponentially(self):
+        """La espera entre reintentos se duplica, con jitter, hasta el máximo configurado."""
+        with self.settings(NOTIFICATION_RETRY_BASE_SECONDS=60, NOTIFICATION_RETRY_MAX_SECONDS=600):
+            self.assertTrue(30 <= retry_delay(1).total_seconds() <= 60)
+            self.assertTrue(120 <= retry_delay(3).total_seconds() <= 240)
+            self.assertTrue(300 <= retry_delay(10).total_seconds() <= 600)
+
+    def test_claimed_notifications_are_not_claimed_twice(self):
+        """Una notificación reservada no la reserva otro worker hasta que vence la reserva."""
+        claimed = claim_notifications(batch_size=3)
+
+        self.assertEqual({n.status for n in claimed}, {"processing"})
+        self.assertEqual(len(claim_notifications(batch_size=10)), 2)
+        self.assertEqual(claim_notifications(batch_size=10), [])
+
+        # Reserva vencida (el worker murió): vuelve a poder reservarse
+        Notification.objects.filter(pk=claimed[0].pk).update(next_attempt_at=timezone.now())
+        self.assertEqual([n.pk for n in claim_notifications(batch_size=10)], [claimed[0].pk])
+
+    def test_expired_lease_counts_as_attempt(self):
+        """Una notificación cuya reserva nunca se libera acaba fallida tras `max_retries`."""
+        claimed = claim_notifications(batch_size=1)[0]
+
+        for retries in (1, 2):
+            Notification.objects.filter(pk=claimed.pk).update(next_attempt_at=timezone.now())
+            reclaimed = claim_notifications(batch_size=10)
+            self.assertIn(claimed.pk, [n.pk for n in reclaimed])
+            self.assertEqual(Notification.objects.get(pk=claimed.pk).retries, retries)
+
+        Notification.objects.filter(pk=claimed.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(claim_notifications(batch_size=10), [])
+        claimed.refresh_from_db()
+        self.assertEqual((claimed.status, claimed.retries), ("failed", 3))
+
+
+class ArchiveOldNotificationsTests(TestCase):
+    """
+    Pruebas para la tarea de retención que vacía la tabla de notificaciones antiguas.
+    """
+
+    def setUp(self):
+        """
+        Crea un usuario con notificaciones antiguas y recientes en distintos estados.
+        """
+        self.user = User.objects.create_user(username="retention")
+        old = timezone.now() - timedelta(days=60)
+        now = timezone.now()
+
+        def notify(title, created_at, **fields):
+            notification = create_notification(self.user, title=title, message="Mensaje")
+            Notification.objects.filter(pk=notification.pk).update(created_at=created_at, **fields)
+            return notification
+
+        self.expired = [
+            notify(f"Leída {i}", old, read_at=now, status="sent", send_email=True) for i in range(5)
+        ]
+        self.kept = [
+            notify("Sin leer", old, status="sent"),
+            notify("Pendiente de envío", old, read_at=now, status="pending", send_email=True),
+            notify("Reciente", now, read_at=now, status="sent"),
+        ]
+
+    def test_moves_expired_notifications_to_archive(self):
+        """Solo las antiguas, leídas y con el envío terminado pasan al archivo."""
+        result = archive_old_notifications(retention_days=30, batch_size=2)
+
+        self.assertEqual(result["moved"], 5)
+        self.assertEqual(result["batches"], 3)
+        self.assertFalse(result["pending"])
+        self.assertEqual(
+            set(Notification.objects.values_list("pk", flat=True)), {n.pk for n in self.kept}
+        )
+        self.assertEqual(
+            set(NotificationArchive.objects.values_list("notification_id", flat=True)),
+            {n.pk for n in self.expired},
+        )
+
+    def test_stops_after_max_batches(self):
+        """Cada ejecución procesa como mucho `max_batches` lotes y avisa si quedan filas."""
+        result = archive_old_notifications(retention_days=30, batch_size=2, max_batches=1)
+
+        self.assertEqual(result["moved"], 2)
+        self.assertTrue(result["pending"])
+        self.assertEqual(NotificationArchive.objects.count(), 2)
+
+    def test_delete_without_archive(self):
+        """Con el archivo desactivado las notificaciones se borran sin copiarse."""
+        with self.settings(NOTIFICATION_RETENTION_ARCHIVE=False):
+            result = archive_old_notifications(retention_days=30)
+
+        self.assertEqual(result["moved"], 5)
+        self.assertFalse(NotificationArchive.objects.exists())
+        self.assertEqual(Notification.objects.count(), len(self.kept))
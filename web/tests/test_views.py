@@ -3,7 +3,9 @@ from rest_framework.test import APITestCase
 from django.test import TestCase, Client
 from rest_framework import status
 from django.urls import reverse
+from django.core.cache import cache
 from ..models import *
+from ..functions import create_notification, get_unread_count
 from ..serializers import PlayerStatsSerializer
 from unittest.mock import patch
 from ..forms import *
@@ -548,11 +550,12 @@ class SupportViewTests(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertIn("/accounts/login/", response.url)
 
-    @patch("web.views.create_notification")
-    def test_successful_form_submission_sends_email(self, mock_create_notification):
+    @patch("web.views.notify_staff")
+    def test_successful_form_submission_sends_email(self, mock_notify_staff):
         """
         Simula el envío exitoso de un formulario de soporte y verifica
-        que se haya llamado a create_notification y la respuesta sea exitosa.
+        que se haya avisado al staff con notify_staff (una notificación por
+        miembro) y la respuesta sea exitosa.
         """
         self.client.login(username="testuser", password="testpass")
         form_data = {
@@ -563,10 +566,10 @@ class SupportViewTests(TestCase):
         response = self.client.post(self.url, form_data, follow=True)
 
         self.assertEqual(response.status_code, 200)
-        self.assertTrue(mock_create_notification.called)
+        self.assertTrue(mock_notify_staff.called)
 
-    @patch("web.views.create_notification", side_effect=Exception("Error creating notification"))
-    def test_form_submission_error_shows_error_message(self, mock_create_notification):
+    @patch("web.views.notify_staff", side_effect=Exception("Error creating notification"))
+    def test_form_submission_error_shows_error_message(self, mock_notify_staff):
         """
         Simula un error en el envío del formulario de soporte y verifica
         que la vista maneja la excepción correctamente.
@@ -580,7 +583,7 @@ class SupportViewTests(TestCase):
         response = self.client.post(self.url, form_data, follow=True)
 
         self.assertEqual(response.status_code, 200)
-        self.assertTrue(mock_create_notification.called)
+        self.assertTrue(mock_notify_staff.called)
 
     def tearDown(self):
         """
@@ -696,3 +699,178 @@ class TournamentCreateViewTests(TestCase):
         Player.objects.all().delete()
         Game.objects.all().delete()
         Tournament.objects.all().delete()
+
+
+class TournamentLogsViewTests(TestCase):
+    """
+    Pruebas para el visor paginado de logs de un torneo.
+
+    Verifica que la vista envía solo la primera página y que la API recorre el resto
+    con el cursor, en orden de partido y fecha y sin repetir logs.
+    """
+
+    def setUp(self):
+        """
+        Crea un torneo con dos partidos y varios logs en cada uno.
+        """
+        self.user = User.objects.create_user(username="logs", password="pass")
+        Player.objects.create(user=self.user)
+        self.client.login(username="logs", password="pass")
+        game = Game.objects.create(name="Game Logs")
+        self.tournament = Tournament.objects.create(
+            name="Logs Tournament", game=game, start_date=timezone.now()
+        )
+        teams = [Team.objects.create(name=f"Logs Team {i}") for i in range(2)]
+        matches = [
+            Match.objects.create(
+                tournament=self.tournament,
+                round=1,
+                team1=teams[0],
+                team2=teams[1],
+                scheduled_at=timezone.now(),
+            )
+            for _ in range(2)
+        ]
+        # Los logs del segundo partido se crean antes, pero deben salir después
+        self.logs = [
+            MatchLog.objects.create(match=matches[1], team=teams[0], event=f"Evento B{i}")
+            for i in range(3)
+        ]
+        self.logs = [
+            MatchLog.objects.create(match=matches[0], event=f"Evento A{i}") for i in range(4)
+        ] + self.logs
+        self.api_url = reverse("web:tournament_logs_api", args=[self.tournament.pk])
+
+    def test_view_renders_first_page(self):
+        """La vista solo incluye la primera página y el cursor de la siguiente."""
+        with patch("web.views.MATCH_LOGS_PAGE_SIZE", 5):
+            response = self.client.get(reverse("web:tournamentLogsView", args=[self.tournament.pk]))
+
+        self.assertEqual(list(response.context["match_logs"]), self.logs[:5])
+        self.assertEqual(response.context["next_cursor"], self.logs[4].pk)
+
+    def test_api_pages_follow_cursor(self):
+        """Recorrer la API con `after` devuelve todos los logs en orden y una sola vez."""
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "after": cursor} if cursor else {"limit": 2}
+            data = self.client.get(self.api_url, params).json()
+            seen += [log["event"] for log in data["logs"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(seen, [log.event for log in self.logs])
+
+    def test_api_rejects_foreign_cursor(self):
+        """Un cursor que no es un log del torneo devuelve un error 400."""
+        response = self.client.get(self.api_url, {"after": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(self.api_url, {"after": 999999})
+        self.assertEqual(response.status_code, 400)
+
+
+class NotificationsApiPaginationTests(TestCase):
+    """
+    Pruebas para la paginación por cursor del listado de notificaciones.
+    """
+
+    def setUp(self):
+        """
+        Crea un usuario con sesión iniciada y cinco notificaciones.
+        """
+        self.user = User.objects.create_user(username="paged", password="testpass")
+        self.client.login(username="paged", password="testpass")
+        for i in range(5):
+            create_notification(self.user, title=f"Aviso {i}", message="Mensaje")
+
+    def test_pages_follow_cursor_without_repeats(self):
+        """Recorrer las páginas con `before` devuelve todas las notificaciones una sola vez."""
+        url = reverse("web:notifications_api")
+        first = self.client.get(url, {"limit": 2}).json()
+        self.assertEqual([n["title"] for n in first["notifications"]], ["Aviso 4", "Aviso 3"])
+
+        seen = [n["id"] for n in first["notifications"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = self.client.get(url, {"limit": 2, "before": cursor}).json()
+            seen += [n["id"] for n in page["notifications"]]
+            cursor = page["next_cursor"]
+
+        self.assertEqual(seen, sorted(seen, reverse=True))
+        self.assertEqual(len(seen), 5)
+
+    def test_invalid_cursor(self):
+        """Un cursor que no pertenece al usuario devuelve un error 400."""
+        response = self.client.get(reverse("web:notifications_api"), {"before": "abc"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class NotificationMarkReadBatchTests(TestCase):
+    """
+    Pruebas para el marcado de varias notificaciones como leídas en una sola petición.
+    """
+
+    def setUp(self):
+        """
+        Crea un usuario con sesión iniciada y tres notificaciones sin leer.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="batch", password="testpass")
+        self.client.login(username="batch", password="testpass")
+        self.notifications = [
+            create_notification(self.user, title=f"Aviso {i}", message="Mensaje") for i in range(3)
+        ]
+        self.url = reverse("web:notification_mark_read_batch_api")
+
+    def test_mark_ids_updates_counter(self):
+        """Solo se marcan las notificaciones indicadas y el contador baja en la misma cantidad."""
+        self.assertEqual(get_unread_count(self.user.pk), 3)
+        ids = [self.notifications[0].pk, self.notifications[1].pk]
+
+        # Sesión + usuario + un único UPDATE
+        with self.assertNumQueries(3):
+            response = self.client.post(self.url, {"ids": ids}, content_type="application/json")
+
+        self.assertEqual(response.json(), {"success": True, "updated": 2})
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+        # Repetir la petición no vuelve a descontar las ya leídas
+        response = self.client.post(self.url, {"ids": ids}, content_type="application/json")
+        self.assertEqual(response.json()["updated"], 0)
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+    def test_mark_all_and_before(self):
+        """Se pueden marcar las anteriores a una fecha o todas a la vez."""
+        first = self.notifications[0]
+        response = self.client.post(
+            self.url, {"before": first.created_at.isoformat()}, content_type="application/json"
+        )
+        self.assertGreaterEqual(response.json()["updated"], 1)
+
+        response = self.client.post(self.url, {"all": True}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Notification.objects.filter(user=self.user, read_at__isnull=True).exists())
+        self.assertEqual(get_unread_count(self.user.pk), 0)
+
+    def test_other_users_notifications_untouched(self):
+        """Las notificaciones de otros usuarios no se marcan aunque se indiquen sus IDs."""
+        other = User.objects.create_user(username="other")
+        foreign = create_notification(other, title="Ajena", message="Mensaje")
+
+        response = self.client.post(
+            self.url, {"ids": [foreign.pk]}, content_type="application/json"
+        )
+
+        self.assertEqual(response.json()["updated"], 0)
+        foreign.refresh_from_db()
+        self.assertIsNone(foreign.read_at)
+
+    def test_invalid_body(self):
+        """Un cuerpo sin criterio o con valores no válidos devuelve un error 400."""
+        for body in ({}, {"ids": "1,2"}, {"before": "ayer"}):
+            response = self.client.post(self.url, body, content_type="application/json")
+            self.assertEqual(response.status_code, 400)
@@ -12,6 +12,16 @@ urlpatterns = [
     path(
         "api/player-stats/", views.PlayerStatsListAPI.as_view(), name="playerStatsListApi"
     ),  # Api para el gráfico con las estadísticas de cada jugador
+    path(
+        "api/players/<int:player_id>/rating-history/",
+        views.player_rating_history_api,
+        name="player_rating_history_api",
+    ),  # Evolución del MMR y la posición de un jugador
+    path(
+        "api/tournaments/<int:pk>/logs/",
+        views.tournament_logs_api,
+        name="tournament_logs_api",
+    ),  # Página siguiente de los logs de un torneo (scroll infinito)
     path(
         "api/support/chat/", views.support_chat_api, name="support_chat_api"
     ),  # API para chat de soporte IA (subirEC2)
@@ -21,6 +31,21 @@ urlpatterns = [
         views.notification_unread_count_api,
         name="notification_unread_count_api",
     ),
+    path(
+        "api/notifications/stream/",
+        views.notification_stream,
+        name="notification_stream",
+    ),  # Server-Sent Events con las notificaciones nuevas
+    path(
+        "api/notifications/poll/",
+        views.notification_poll_api,
+        name="notification_poll_api",
+    ),  # Consulta larga para navegadores sin Server-Sent Events
+    path(
+        "api/notifications/mark-read/",
+        views.notification_mark_read_batch_api,
+        name="notification_mark_read_batch_api",
+    ),  # Marcar varias (o todas) las notificaciones como leídas
     path(
         "api/notifications/<int:notification_id>/mark-read/",
         views.notification_mark_read_api,
@@ -8,8 +8,9 @@ from django.db.models import Q, F, Count
 from web.forms import *
 from django.urls import reverse
 from django.shortcuts import redirect
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.views.decorators.http import require_GET
 from django.views.generic import (
     ListView,
     TemplateView,
@@ -29,10 +30,21 @@ import requests
 from .functions import (
     record_match_result,
     create_match_log,
-    update_players_stats,
-    increase_player_renombre,
+    update_match_stats,
+    update_teams_renombre,
     create_notification,
+    notify_staff,
+    get_unread_count,
+    adjust_unread_count,
 )
+from .leaderboard import (
+    GLOBAL_BOARD,
+    RankedPlayers,
+    country_board,
+    ensure_leaderboard,
+    game_board,
+)
+from .realtime import publish_event, stream_events, wait_for_events
 from .serializers import *
 from web.models import *
 from django.shortcuts import get_object_or_404
@@ -41,6 +53,7 @@ from django.contrib import messages
 from django.db.models import Prefetch
 from .serializers import NotificationSerializer
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -228,13 +241,17 @@ class RankingView(LoginRequiredMixin, ListView):
     Vista que muestra el ranking de jugadores ordenado por MMR (Match Making Rating).
 
     Requiere autenticación (LoginRequiredMixin) y muestra una lista paginada de jugadores
-    ordenados por su puntuación MMR de mayor a menor.
+    ordenados por su puntuación MMR de mayor a menor, en la clasificación global o en la de
+    un juego o un país. El orden sale de las clasificaciones precalculadas (`leaderboard`),
+    por lo que cada página cuesta lo mismo sin importar su número ni el filtro.
 
     Atributos:
         template_name (str): Ruta al template que muestra el ranking (web/ranking.html)
 
     Métodos:
-        get_context_data: Añade al contexto la lista de jugadores ordenada y paginada
+        get_board: Obtiene la clasificación elegida con el parámetro GET 'board'
+        get_queryset: Devuelve los jugadores en el orden de la clasificación
+        get_context_data: Añade al contexto los filtros y la posición del jugador conectado
     """
 
     model = Player
@@ -242,15 +259,67 @@ class RankingView(LoginRequiredMixin, ListView):
     context_object_name = "ranking_list"
     paginate_by = 10
 
+    def get_board(self):
+        """
+        Clasificación elegida con el parámetro GET 'board': la global (por defecto), la de
+        un juego (`game:<id>`) o la de un país (`country:<código>`).
+
+        Returns:
+            tuple: Nombre de la clasificación y QuerySet de los jugadores que pueden aparecer
+                   en ella, o (None, None) si el parámetro no es válido.
+        """
+        players = Player.objects.select_related("user")
+        board = self.request.GET.get("board") or GLOBAL_BOARD
+        if board == GLOBAL_BOARD:
+            return board, players
+
+        kind, _, value = board.partition(":")
+        if kind == "game" and value.isdigit() and Game.objects.filter(pk=value).exists():
+            return game_board(int(value)), players
+        if kind == "country" and value in dict(Player.COUNTRY_CHOICES):
+            return country_board(value), players.filter(country=value)
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        """Redirige a la clasificación global si la elegida no existe."""
+        self.board, self.players = self.get_board()
+        if self.board is None:
+            return redirect("web:rankingView")
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         """
-        Devuelve los jugadores ordenados por MMR descendente y optimiza
-        el acceso al usuario relacionado.
+        Devuelve los jugadores en el orden de la clasificación elegida, con el usuario
+        relacionado precargado. Cada página se carga por clave primaria al paginar.
 
         Returns:
-            QuerySet: Jugadores ordenados por MMR
+            RankedPlayers: Jugadores ordenados por MMR
         """
-        return Player.objects.order_by("-mmr").select_related("user")
+        self.leaderboard = ensure_leaderboard(self.board)
+        return RankedPlayers(self.leaderboard, self.players)
+
+    def get_context_data(self, **kwargs):
+        """
+        Añade al contexto la clasificación elegida, las clasificaciones disponibles y la
+        posición (desde 1) del jugador conectado en ella, o None si no aparece.
+
+        Returns:
+            dict: Contexto con `board`, `game_boards`, `country_boards`, `my_rank` y `my_page`
+        """
+        context = super().get_context_data(**kwargs)
+        player = getattr(self.request.user, "player", None)
+        rank = self.leaderboard.rank(player.pk) if player else None
+        context["board"] = self.board
+        context["game_boards"] = [
+            (game_board(pk), name)
+            for pk, name in Game.objects.order_by("name").values_list("pk", "name")
+        ]
+        context["country_boards"] = [
+            (country_board(code), name) for code, name in Player.COUNTRY_CHOICES
+        ]
+        context["my_rank"] = rank + 1 if rank is not None else None
+        context["my_page"] = rank // self.paginate_by + 1 if rank is not None else None
+        return context
 
 
 class TournamentListView(LoginRequiredMixin, ListView):
@@ -287,24 +356,13 @@ class TournamentListView(LoginRequiredMixin, ListView):
 
         Además, optimiza las relaciones:
         - `select_related('game')`: para acceder eficientemente al juego asociado al torneo
-        - `prefetch_related('tournamentteam_set')`: para cargar en bloque los equipos del torneo
-        - `prefetch_related('team__player_set')`: para cargar también los jugadores de cada equipo
+        - `with_progress()`: anota jugadores inscritos y partidos completados de todos
+          los torneos en la misma consulta, sin una consulta adicional por torneo
 
         Returns:
             QuerySet: Torneos filtrados según los parámetros recibidos
         """
-        queryset = (
-            Tournament.objects.all()
-            .select_related("game")
-            .prefetch_related(
-                Prefetch(
-                    "tournamentteam_set",
-                    queryset=TournamentTeam.objects.select_related("team").prefetch_related(
-                        Prefetch("team__player_set")
-                    ),
-                )
-            )
-        )
+        queryset = Tournament.objects.with_progress().select_related("game")
 
         # Filtrar por nombre de torneo
         search_term = self.request.GET.get("search", "")
@@ -435,6 +493,16 @@ class TournamentDetailView(LoginRequiredMixin, DetailView):
     template_name = "web/tournament_detail.html"
     context_object_name = "tournament"
 
+    def get_queryset(self):
+        """
+        Obtiene el torneo anotado con sus contadores de progreso (equipos inscritos y
+        partidos completados) mediante la misma consulta agregada que el listado.
+
+        Returns:
+            QuerySet: Torneos con los contadores de progreso anotados
+        """
+        return Tournament.objects.with_progress().select_related("game", "created_by", "winner")
+
     def get_context_data(self, **kwargs):
         """
         Extiende el contexto base con información sobre si el usuario actual
@@ -1484,21 +1552,17 @@ class MatchConfirmView(LoginRequiredMixin, View):
 
         # Verificar que el puntaje sea coherente con el ganador
         if winner == "team1" and team1_score <= team2_score:
-            support_users = list(User.objects.filter(is_staff=True))
-            if support_users:
-                create_notification(
-                    user=support_users[0],
-                    recipient_users=support_users[1:] if len(support_users) > 1 else None,
-                    title="Inconsistencia en el puntaje del partido",
-                    message=(
-                        f"El equipo 1 no puede ganar con un puntaje inferior o igual al del equipo 2. Partido ID: {match.id}\n\n"
-                        f"Puntaje del equipo 1: {team1_score}, Puntaje del equipo 2: {team2_score}"
-                    ),
-                    urgency=4,
-                    sender_email=settings.DEFAULT_FROM_EMAIL,
-                    send_email=False,
-                    match=match,
-                )
+            notify_staff(
+                title="Inconsistencia en el puntaje del partido",
+                message=(
+                    f"El equipo 1 no puede ganar con un puntaje inferior o igual al del equipo 2. Partido ID: {match.id}\n\n"
+                    f"Puntaje del equipo 1: {team1_score}, Puntaje del equipo 2: {team2_score}"
+                ),
+                urgency=4,
+                sender_email=settings.DEFAULT_FROM_EMAIL,
+                send_email=False,
+                match=match,
+            )
             messages.error(
                 request,
                 "El equipo 1 no puede ganar con un puntaje inferior o igual al del equipo 2. El administrador ha sido notificado.",
@@ -1506,21 +1570,17 @@ class MatchConfirmView(LoginRequiredMixin, View):
             return render(request, "web/match_detail.html", {"form": form, "match": match})
 
         elif winner == "team2" and team2_score <= team1_score:
-            support_users = list(User.objects.filter(is_staff=True))
-            if support_users:
-                create_notification(
-                    user=support_users[0],
-                    recipient_users=support_users[1:] if len(support_users) > 1 else None,
-                    title="Inconsistencia en el puntaje del partido",
-                    message=(
-                        f"El equipo 2 no puede ganar con un puntaje inferior o igual al del equipo 1. Partido ID: {match.id}\n\n"
-                        f"Puntaje del equipo 1: {team1_score}, Puntaje del equipo 2: {team2_score}"
-                    ),
-                    urgency=4,
-                    sender_email=settings.DEFAULT_FROM_EMAIL,
-                    send_email=False,
-                    match=match,
-                )
+            notify_staff(
+                title="Inconsistencia en el puntaje del partido",
+                message=(
+                    f"El equipo 2 no puede ganar con un puntaje inferior o igual al del equipo 1. Partido ID: {match.id}\n\n"
+                    f"Puntaje del equipo 1: {team1_score}, Puntaje del equipo 2: {team2_score}"
+                ),
+                urgency=4,
+                sender_email=settings.DEFAULT_FROM_EMAIL,
+                send_email=False,
+                match=match,
+            )
             messages.error(
                 request,
                 "El equipo 2 no puede ganar con un puntaje inferior o igual al del equipo 1. El administrador ha sido notificado.",
@@ -1533,8 +1593,10 @@ class MatchConfirmView(LoginRequiredMixin, View):
             match.team1_winner = winner == "team1"
             create_match_log(
                 match,
-                f"Equipo 1 ({match.team1.name}) ha confirmado el resultado. ({team1_score} - {team2_score})",
+                MatchLog.RESULT_CONFIRMED,
                 team=match.team1,
+                team1_score=team1_score,
+                team2_score=team2_score,
             )
 
         elif user_team == match.team2:
@@ -1542,30 +1604,28 @@ class MatchConfirmView(LoginRequiredMixin, View):
             match.team2_winner = winner == "team2"
             create_match_log(
                 match,
-                f"Equipo 2 ({match.team2.name}) ha confirmado el resultado. ({team1_score} - {team2_score})",
+                MatchLog.RESULT_CONFIRMED,
                 team=match.team2,
+                team1_score=team1_score,
+                team2_score=team2_score,
             )
 
         # Verificar si ambos equipos han confirmado el resultado
         if match.team1_confirmed and match.team2_confirmed:
             # Comparar si ambos equipos están de acuerdo con el ganador
             if match.team1_winner == match.team2_winner:
-                support_users = list(User.objects.filter(is_staff=True))
-                if support_users:
-                    create_notification(
-                        user=support_users[0],
-                        recipient_users=support_users,
-                        title="Inconsistencia en el resultado del partido",
-                        message=(
-                            f"El partido {match.id} tiene un desacuerdo entre los equipos sobre el ganador.\n\n"
-                            f"Equipo 1 seleccionado como ganador: {match.team1_winner}\n"
-                            f"Equipo 2 seleccionado como ganador: {match.team2_winner}"
-                        ),
-                        urgency=4,
-                        sender_email=settings.DEFAULT_FROM_EMAIL,
-                        send_email=False,
-                        match=match,
-                    )
+                notify_staff(
+                    title="Inconsistencia en el resultado del partido",
+                    message=(
+                        f"El partido {match.id} tiene un desacuerdo entre los equipos sobre el ganador.\n\n"
+                        f"Equipo 1 seleccionado como ganador: {match.team1_winner}\n"
+                        f"Equipo 2 seleccionado como ganador: {match.team2_winner}"
+                    ),
+                    urgency=4,
+                    sender_email=settings.DEFAULT_FROM_EMAIL,
+                    send_email=False,
+                    match=match,
+                )
                 # Agregar el mensaje de error al formulario
                 messages.error(
                     request,
@@ -1576,34 +1636,29 @@ class MatchConfirmView(LoginRequiredMixin, View):
             # Si ambos equipos han confirmado y los resultados son coherentes
             if match.team1_winner:
                 match.winner = match.team1
-                update_players_stats(match.team1, is_winner=True)
-                update_players_stats(
-                    match.team2
-                )  # Los jugadores del equipo perdedor también se actualizan
+                # Se actualizan a la vez los jugadores de los dos equipos
+                update_match_stats(match.team1, match.team2, match=match)
 
             elif match.team2_winner:
                 match.winner = match.team2
-                update_players_stats(match.team2, is_winner=True)
-                update_players_stats(
-                    match.team1
-                )  # Los jugadores del equipo perdedor también se actualizan
+                update_match_stats(match.team2, match.team1, match=match)
 
             # Aumentar el renombre a todos los jugadores del partido
-            for player in match.team1.player_set.all():
-                increase_player_renombre(
-                    player, amount=5, reason="Participación en partido completado con éxito"
-                )
-
-            for player in match.team2.player_set.all():
-                increase_player_renombre(
-                    player, amount=5, reason="Participación en partido completado con éxito"
-                )
+            update_teams_renombre(
+                [match.team1, match.team2],
+                amount=5,
+                reason="Participación en partido completado con éxito",
+                match=match,
+            )
 
             # Llamar a la función `record_match_result` para guardar el resultado
             record_match_result(match, match.winner, team1_score, team2_score)
             create_match_log(
                 match,
-                f"El partido ha sido completado. Ganador: {match.winner.name}. ({team1_score} - {team2_score})",
+                MatchLog.MATCH_COMPLETED,
+                winner_id=match.winner.pk,
+                team1_score=team1_score,
+                team2_score=team2_score,
             )
 
         match.save()
@@ -1739,17 +1794,13 @@ class SupportView(LoginRequiredMixin, FormView):
 
         # Enviar el correo electrónico
         try:
-            support_users = list(User.objects.filter(is_staff=True))
-            if support_users:
-                create_notification(
-                    user=support_users[0],
-                    recipient_users=support_users,
-                    title=f"[Contacto ArenaGG] {subject}",
-                    message=message,
-                    urgency=3,
-                    sender_email=user_email,
-                    send_email=False,
-                )
+            notify_staff(
+                title=f"[Contacto ArenaGG] {subject}",
+                message=message,
+                urgency=3,
+                sender_email=user_email,
+                send_email=False,
+            )
 
             messages.success(
                 self.request,
@@ -1766,19 +1817,107 @@ class SupportView(LoginRequiredMixin, FormView):
         return super().form_valid(form)
 
 
+# Días de historial de MMR que devuelve la API por defecto y como máximo
+RATING_HISTORY_DEFAULT_DAYS = 90
+RATING_HISTORY_MAX_DAYS = 365
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def player_rating_history_api(request, player_id):
+    """
+    Devuelve la evolución del MMR y de la posición de un jugador.
+
+    Los días ya compactados salen de los resúmenes diarios (RatingSnapshot) y los más
+    recientes de las entradas por partido (RatingHistory), de modo que la curva completa
+    se obtiene con dos consultas por índice, sin recorrer MatchResult ni MatchLog.
+    `?days=<n>` limita el periodo (máximo RATING_HISTORY_MAX_DAYS).
+
+    Returns:
+        Response: {"player": id, "snapshots": [...], "recent": [...]}
+    """
+    player = get_object_or_404(Player, pk=player_id)
+    try:
+        days = int(request.GET.get("days", RATING_HISTORY_DEFAULT_DAYS))
+    except ValueError:
+        return Response({"error": "Parámetro days no válido"}, status=400)
+    days = max(1, min(days, RATING_HISTORY_MAX_DAYS))
+    first_day = timezone.localdate() - timedelta(days=days - 1)
+
+    snapshots = list(player.rating_snapshots.filter(date__gte=first_day).order_by("date"))
+    if snapshots:
+        # Las entradas de días ya resumidos no se repiten
+        first_day = snapshots[-1].date + timedelta(days=1)
+    recent = player.rating_history.filter(
+        created_at__gte=timezone.make_aware(datetime.combine(first_day, datetime.min.time()))
+    )
+
+    return Response(
+        {
+            "player": player.pk,
+            "snapshots": RatingSnapshotSerializer(snapshots, many=True).data,
+            "recent": RatingHistorySerializer(recent.order_by("created_at", "pk"), many=True).data,
+        }
+    )
+
+
+# Tamaño (y máximo) de página del listado de notificaciones
+NOTIFICATIONS_PAGE_SIZE = 50
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def notifications_api(request):
-    notifications = Notification.objects.filter(user=request.user).order_by("-created_at")[:50]
-    serializer = NotificationSerializer(notifications, many=True)
-    return Response({"notifications": serializer.data})
+    """
+    Devuelve las notificaciones del usuario, de la más reciente a la más antigua.
+
+    Usa paginación por cursor (keyset) en lugar de OFFSET: `?before=<id>` devuelve las
+    notificaciones anteriores a esa, apoyándose en el índice (user, -created_at).
+    `?limit=<n>` fija el tamaño de página (máximo NOTIFICATIONS_PAGE_SIZE).
+
+    Returns:
+        Response: {"notifications": [...], "next_cursor": id o None si no hay más}
+    """
+    try:
+        limit = int(request.GET.get("limit", NOTIFICATIONS_PAGE_SIZE))
+        before = request.GET.get("before")
+        before = int(before) if before else None
+    except ValueError:
+        return Response({"error": "Parámetros de paginación no válidos"}, status=400)
+    limit = max(1, min(limit, NOTIFICATIONS_PAGE_SIZE))
+
+    notifications = Notification.objects.filter(user=request.user)
+    if before is not None:
+        cursor = notifications.filter(pk=before).values("created_at", "pk").first()
+        if cursor is None:
+            return Response({"error": "Cursor no válido"}, status=400)
+        notifications = notifications.filter(
+            Q(created_at__lt=cursor["created_at"])
+            | Q(created_at=cursor["created_at"], pk__lt=cursor["pk"])
+        )
+
+    # Se pide un elemento de más para saber si hay otra página
+    page = list(
+        notifications.prefetch_related("recipient_users").order_by("-created_at", "-pk")[
+            : limit + 1
+        ]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    serializer = NotificationSerializer(page, many=True)
+    return Response(
+        {
+            "notifications": serializer.data,
+            "next_cursor": page[-1].pk if has_more else None,
+        }
+    )
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def notification_unread_count_api(request):
-    count = Notification.objects.filter(user=request.user, read_at__isnull=True).count()
-    return Response({"unread_count": count})
+    return Response({"unread_count": get_unread_count(request.user.pk)})
 
 
 @api_view(["POST"])
@@ -1788,12 +1927,102 @@ def notification_mark_read_api(request, notification_id):
         notif = Notification.objects.get(id=notification_id, user=request.user)
     except Notification.DoesNotExist:
         return Response({"success": False, "error": "Not found"}, status=404)
-    if notif.read_at is None:
-        notif.read_at = timezone.now()
-        notif.save()
+    # Solo la petición que cambia read_at descuenta la notificación del contador
+    if Notification.objects.filter(pk=notif.pk, read_at__isnull=True).update(
+        read_at=timezone.now(), updated_at=timezone.now()
+    ):
+        adjust_unread_count(request.user.pk, -1)
+        # Actualiza el resto de pestañas abiertas del usuario
+        publish_event(request.user.pk, {"type": "read", "id": notif.pk})
     return Response({"success": True})
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def notification_mark_read_batch_api(request):
+    """
+    Marca como leídas varias notificaciones del usuario con una única actualización.
+
+    El cuerpo indica qué notificaciones marcar:
+    - `{"ids": [1, 2, 3]}`: las notificaciones indicadas.
+    - `{"before": "<fecha ISO 8601>"}`: las creadas hasta esa fecha.
+    - `{"all": true}`: todas.
+
+    El contador de no leídas se descuenta con el número de filas realmente actualizadas.
+
+    Returns:
+        Response: {"success": True, "updated": n}, o 400 si el cuerpo no es válido.
+    """
+    notifications = Notification.objects.filter(user=request.user, read_at__isnull=True)
+    ids = request.data.get("ids")
+    before = request.data.get("before")
+
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response(
+                {"success": False, "error": "ids debe ser una lista de enteros"}, status=400
+            )
+        notifications = notifications.filter(pk__in=ids)
+    elif before is not None:
+        before = parse_datetime(str(before))
+        if before is None:
+            return Response({"success": False, "error": "Fecha no válida"}, status=400)
+        if timezone.is_naive(before):
+            before = timezone.make_aware(before)
+        notifications = notifications.filter(created_at__lte=before)
+    elif request.data.get("all") is not True:
+        return Response({"success": False, "error": "Indica ids, before o all"}, status=400)
+
+    now = timezone.now()
+    updated = notifications.update(read_at=now, updated_at=now)
+    if updated:
+        adjust_unread_count(request.user.pk, -updated)
+        publish_event(request.user.pk, {"type": "read", "count": updated})
+    return Response({"success": True, "updated": updated})
+
+
+async def notification_stream(request):
+    """
+    Flujo Server-Sent Events con las notificaciones nuevas del usuario.
+
+    Sustituye al sondeo periódico del contador: el navegador mantiene una conexión
+    abierta y recibe un evento "notification" al crearse una notificación y un evento
+    "read" al marcarse como leída. La conexión se cierra tras
+    `settings.NOTIFICATION_STREAM_SECONDS` y EventSource se reconecta solo.
+
+    La vista es asíncrona: servida con ASGI, una conexión abierta no ocupa un hilo.
+
+    Returns:
+        StreamingHttpResponse: Flujo text/event-stream, o 401 si no hay sesión iniciada.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    response = StreamingHttpResponse(stream_events(user.pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Evita que nginx acumule el flujo
+    return response
+
+
+@require_GET
+async def notification_poll_api(request):
+    """
+    Consulta larga (long polling) para navegadores sin Server-Sent Events.
+
+    La petición queda abierta hasta que llega un evento o se agota
+    `settings.NOTIFICATION_LONG_POLL_SECONDS`. Es asíncrona por el mismo motivo que
+    `notification_stream`.
+
+    Returns:
+        JsonResponse: {"events": [...]}, o 401 si no hay sesión iniciada.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"detail": "Autenticación requerida"}, status=401)
+    return JsonResponse({"events": await wait_for_events(user.pk)})
+
+
 class RewardRedemptionView(LoginRequiredMixin, View):
     """
     Vista para canjear recompensas por monedas del jugador.
@@ -1832,17 +2061,13 @@ class RewardRedemptionView(LoginRequiredMixin, View):
             reward.stock -= 1
             reward.save()
             if reward.stock == 0:
-                support_users = list(User.objects.filter(is_staff=True))
-                if support_users:
-                    create_notification(
-                        user=support_users[0],
-                        recipient_users=support_users,
-                        title="Recompensa acabada",
-                        message=f"Se ha acabado el stock de la recompensa: {reward.name}",
-                        urgency=2,
-                        sender_email=settings.DEFAULT_FROM_EMAIL,
-                        send_email=False,
-                    )
+                notify_staff(
+                    title="Recompensa acabada",
+                    message=f"Se ha acabado el stock de la recompensa: {reward.name}",
+                    urgency=2,
+                    sender_email=settings.DEFAULT_FROM_EMAIL,
+                    send_email=False,
+                )
 
             # Crear la redención
             Redemption.objects.create(user=request.user, reward=reward)
@@ -1886,12 +2111,58 @@ class RedemptionListView(LoginRequiredMixin, ListView):
         return Redemption.objects.filter(user=self.request.user).order_by("-redeemed_at")
 
 
+# Tamaño (y máximo) de página de los logs de un torneo
+MATCH_LOGS_PAGE_SIZE = 50
+
+
+def match_logs_page(tournament, after=None, limit=None):
+    """
+    Obtiene una página de los logs de partidas de un torneo, ordenados por partido y fecha.
+
+    Usa paginación por cursor (keyset) sobre (match, created_at, id) en lugar de OFFSET,
+    apoyándose en el índice compuesto de MatchLog, por lo que el coste de cada página no
+    depende de cuántas se hayan leído antes.
+
+    Args:
+        tournament (Tournament): Torneo cuyos logs se obtienen.
+        after (int, optional): ID del último log de la página anterior.
+        limit (int, optional): Tamaño de página. Por defecto MATCH_LOGS_PAGE_SIZE.
+
+    Returns:
+        tuple: (lista de MatchLog, ID del último log si hay más páginas o None)
+
+    Raises:
+        MatchLog.DoesNotExist: Si el cursor no es un log del torneo.
+    """
+    limit = limit or MATCH_LOGS_PAGE_SIZE
+    logs = MatchLog.objects.filter(match__tournament=tournament)
+    if after is not None:
+        cursor = logs.values("match_id", "created_at", "pk").get(pk=after)
+        logs = logs.filter(
+            Q(match_id__gt=cursor["match_id"])
+            | Q(match_id=cursor["match_id"], created_at__gt=cursor["created_at"])
+            | Q(match_id=cursor["match_id"], created_at=cursor["created_at"], pk__gt=cursor["pk"])
+        )
+
+    # Se pide un elemento de más para saber si hay otra página
+    page = list(
+        logs.select_related("match__team1", "match__team2", "player__user", "team").order_by(
+            "match_id", "created_at", "pk"
+        )[: limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+    return page, page[-1].pk if has_more else None
+
+
 class TournamentLogsView(LoginRequiredMixin, DetailView):
     """
     Vista que muestra los registros de actividad (logs) de un torneo específico.
 
     Requiere autenticación y muestra los registros de partidas asociadas
     al torneo seleccionado, incluyendo información detallada de cada evento.
+    Solo se envía la primera página; el resto se carga al hacer scroll desde
+    `tournament_logs_api`.
 
     Atributos:
         model (Model): Modelo Tournament que contiene los datos del torneo
@@ -1908,10 +2179,11 @@ class TournamentLogsView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         """
-        Extiende el contexto base con los logs de partidas del torneo:
-        1. Obtiene todos los logs relacionados con partidas del torneo
+        Extiende el contexto base con la primera página de logs de partidas del torneo:
+        1. Obtiene los primeros logs relacionados con partidas del torneo
         2. Incluye relaciones con partidos, jugadores y equipos
         3. Ordena por partido y fecha de creación
+        4. Añade el cursor de la página siguiente
 
         Args:
             **kwargs: Argumentos clave variables
@@ -1921,16 +2193,40 @@ class TournamentLogsView(LoginRequiredMixin, DetailView):
         """
         context = super().get_context_data(**kwargs)
 
-        # Obtener todos los logs de partidas relacionados con este torneo
-        context["match_logs"] = (
-            MatchLog.objects.filter(match__tournament=self.object)
-            .select_related("match", "player", "team")
-            .order_by("match", "created_at")
-        )
+        context["match_logs"], context["next_cursor"] = match_logs_page(self.object)
 
         return context
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def tournament_logs_api(request, pk):
+    """
+    Devuelve una página de los logs de partidas de un torneo para el scroll infinito.
+
+    `?after=<id>` devuelve los logs posteriores a ese y `?limit=<n>` fija el tamaño de
+    página (máximo MATCH_LOGS_PAGE_SIZE).
+
+    Returns:
+        Response: {"logs": [...], "next_cursor": id o None si no hay más}
+    """
+    tournament = get_object_or_404(Tournament, pk=pk)
+    try:
+        limit = int(request.GET.get("limit", MATCH_LOGS_PAGE_SIZE))
+        after = request.GET.get("after")
+        after = int(after) if after else None
+    except ValueError:
+        return Response({"error": "Parámetros de paginación no válidos"}, status=400)
+    limit = max(1, min(limit, MATCH_LOGS_PAGE_SIZE))
+
+    try:
+        page, next_cursor = match_logs_page(tournament, after, limit)
+    except MatchLog.DoesNotExist:
+        return Response({"error": "Cursor no válido"}, status=400)
+
+    return Response({"logs": MatchLogSerializer(page, many=True).data, "next_cursor": next_cursor})
+
+
 class PlayerTeamDetailView(LoginRequiredMixin, DetailView):
     """
     Vista que muestra los detalles del equipo de un jugador.